@@ -5,27 +5,78 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import time
+import numpy as np
 import pandas as pd
 import importlib
 import src.scraper2
 importlib.reload(src.scraper2)
-from src.scraper2 import scrape_remoteok_jobs
-from src.ranker import rank_leads
+from src.ranker import warm_up
+from src.job_runner import DONE, FAILED, get_default_runner, submit_scrape_and_rank
+from src.lead_store import RANKED_PATH, load_leads
+from src.result_cache import get_default_result_cache
+from src.lead_index import LEAD_INDEX_DIR, search_leads
+from src.instrumentation import INSTRUMENT_BY_DEFAULT, latest_report, summarize
+
+# Start loading the ranking model in the background while the user sets filters
+warm_up()
 
 st.set_page_config(page_title="AI Leadgen Tool", layout="wide")
 
-st.title("🚀 AI-Driven Lead Prioritization Tool")
 
-# --- Initialize session state ---
-if "df_scraped" not in st.session_state:
-    st.session_state.df_scraped = pd.DataFrame()
+def file_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_ranked_leads(path, mtime):
+    """
+    Load ranked leads once per file version (mtime), sorted by score, highest first
+
+    Also returns the negated scores (ascending) so a score threshold becomes a
+    binary search for the length of the matching prefix instead of a full scan.
+    The cached frame is shared between reruns and must not be modified.
+    """
+    df = load_leads(path)
+    if "relevance_score" not in df.columns:
+        return df, None
+    df = df.sort_values("relevance_score", ascending=False, kind="stable", na_position="last")
+    df = df.reset_index(drop=True)
+    return df, -df["relevance_score"].to_numpy(dtype=np.float64)
+
 
-if "df_ranked" not in st.session_state:
-    st.session_state.df_ranked = pd.DataFrame()
+def count_at_or_above(neg_scores, threshold):
+    """Number of leads with relevance_score >= threshold"""
+    return int(np.searchsorted(neg_scores, -threshold, side="right"))
 
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def leads_csv_bytes(path, mtime):
+    """CSV download for a lead file, built on first use and reused until the file changes"""
+    if path.endswith(".csv"):
+        with open(path, "rb") as f:
+            return f.read()
+    return load_leads(path).to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def filtered_csv_bytes(path, mtime, count):
+    df, _ = load_ranked_leads(path, mtime)
+    return df.iloc[:count].to_csv(index=False).encode("utf-8")
+
+
+st.title("🚀 AI-Driven Lead Prioritization Tool")
+
+# How often the page refreshes while a scrape & rank job is in flight
+JOB_POLL_SECONDS = 1.0
+
+# --- Initialize session state ---
 if "step" not in st.session_state:
     st.session_state.step = "Not Started"
 
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+
 # --- Search Filters Section ---
 st.header("🔍 Search Filters")
 st.markdown("Configure your search criteria before scraping leads:")
@@ -69,8 +120,83 @@ if selected_experience:
 
 st.info(" | ".join(filter_text))
 
+incremental = st.checkbox(
+    "⚡ Only fetch new or changed leads",
+    value=False,
+    help="Uses conditional requests and remembers leads already scraped for these filters; "
+         "new leads are ranked and merged into the existing results."
+)
+
+use_cache = st.checkbox(
+    "🗄️ Reuse recent scrape results",
+    value=True,
+    help="Serves the keyword's jobs from the scrape cache while they are fresh and applies the "
+         "filters to them; untick to force a new fetch. Ignored for incremental refreshes."
+)
+
+instrument = st.checkbox(
+    "⏱️ Record run timings",
+    value=INSTRUMENT_BY_DEFAULT,
+    help="Times every stage and source (network, parsing, classification, encoding, file I/O) "
+         "and saves a JSON run report under data/run_reports/."
+)
+
 st.divider()
 
+# --- Main Action Button ---
+# Scrape & rank runs on the shared background runner; identical in-flight filters join the same job
+runner = get_default_runner()
+if st.button("🔄 Scrape & Rank Leads"):
+    job = submit_scrape_and_rank(
+        keyword=search_keyword,
+        location=selected_location,
+        field=selected_field,
+        experience=selected_experience,
+        incremental=incremental,
+        use_cache=use_cache,
+        instrument=instrument
+    )
+    st.session_state.job_id = job.id
+
+job = runner.get(st.session_state.job_id) if st.session_state.job_id else None
+job_in_flight = job is not None and job.in_flight()
+
+
+def end_run():
+    """Finish this script run; while the job is in flight, rerun shortly to poll its progress"""
+    if job_in_flight:
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+    st.stop()
+
+
+if job is not None:
+    snapshot = job.snapshot()
+    counters = snapshot["counters"]
+    if job_in_flight:
+        st.session_state.step = "Scraping" if snapshot["stage"] == "Queued" else snapshot["stage"]
+        st.info(
+            f"⏳ {snapshot['stage']}... "
+            f"pages fetched: {counters.get('pages_fetched', 0)} | "
+            f"leads parsed: {counters.get('leads_parsed', 0)} | "
+            f"leads scored: {counters.get('leads_scored', 0)}"
+        )
+    elif snapshot["status"] == FAILED:
+        st.session_state.step = "Not Started"
+        st.error(f"❌ Scrape & rank failed: {snapshot['error']}")
+    elif snapshot["status"] == DONE:
+        outcome = job.result["outcome"]
+        if outcome == "empty":
+            st.session_state.step = "Not Started"
+            st.error("❌ No jobs found matching your criteria. Try adjusting your filters.")
+        else:
+            st.session_state.step = "Ranked"
+            if outcome == "unchanged":
+                # Incremental refresh found nothing new; the filters' ranked leads were put back in place
+                st.info("✅ No new or changed leads since the last refresh.")
+            else:
+                st.success("🎉 Leads successfully scraped and ranked!")
+
 # --- Sidebar: Flow Chart ---
 with st.sidebar:
     st.header("🧭 Execution Flow")
@@ -89,63 +215,67 @@ with st.sidebar:
     st.header("📂 Download CSV Files")
 
     if os.path.exists("data/leads_raw.csv"):
-        st.download_button("📥 Download Raw Leads", open("data/leads_raw.csv", "rb"), file_name="leads_raw.csv")
+        raw_download = leads_csv_bytes("data/leads_raw.csv", file_mtime("data/leads_raw.csv"))
+        st.download_button("📥 Download Raw Leads", raw_download, file_name="leads_raw.csv")
     else:
         st.warning("❌ Raw CSV not found.")
 
-    if os.path.exists("data/leads_ranked.csv"):
-        st.download_button("📥 Download Ranked Leads", open("data/leads_ranked.csv", "rb"), file_name="leads_ranked.csv")
+    if os.path.exists(RANKED_PATH):
+        ranked_download = leads_csv_bytes(RANKED_PATH, file_mtime(RANKED_PATH))
+        st.download_button("📥 Download Ranked Leads", ranked_download, file_name="leads_ranked.csv")
     else:
         st.warning("❌ Ranked CSV not found.")
 
-    st.markdown("---")
-    score_threshold = st.slider("🎯 Minimum Score Filter", 0.0, 3.0, 0.0, 0.1)
-
-# --- Main Action Button ---
-if st.button("🔄 Scrape & Rank Leads"):
-    st.session_state.step = "Scraping"
-    with st.spinner("Scraping remote jobs..."):
-        df_scraped = scrape_remoteok_jobs(
-            keyword=search_keyword,
-            location=selected_location,
-            field=selected_field,
-            experience=selected_experience
+    st.divider()
+    st.header("🗄️ Scrape Cache")
+    cache_stats = get_default_result_cache().stats()
+    st.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+    st.caption(
+        f"Memory hits: {cache_stats['memory_hits']} | Disk hits: {cache_stats['disk_hits']} | "
+        f"Misses: {cache_stats['misses']}"
+    )
+
+    run_report = latest_report()
+    if run_report is not None:
+        st.divider()
+        st.header("⏱️ Last Run")
+        run_summary = summarize(run_report)
+        st.metric("Duration", f"{run_summary['duration_secs']:.1f}s")
+        st.caption(" | ".join(f"{stage}: {secs:.1f}s" for stage, secs in run_summary["stages"].items()))
+        encode_rate = run_summary["encode_rows_per_sec"]
+        st.caption(
+            f"HTTP requests: {run_summary['http_requests']} | "
+            f"Fetched: {run_summary['bytes_fetched'] / 1024:,.0f} KB | "
+            f"Rows parsed: {run_summary['rows_parsed']} | Dropped by filters: {run_summary['rows_dropped']} | "
+            f"Encoding: {f'{encode_rate:,.0f} rows/s' if encode_rate else 'n/a'}"
         )
-        if not df_scraped.empty:
-            df_scraped.to_csv("data/leads_raw.csv", index=False)
-            st.session_state.df_scraped = df_scraped
-            st.session_state.step = "Scraped"
-        else:
-            st.error("❌ No jobs found matching your criteria. Try adjusting your filters.")
-            st.session_state.step = "Not Started"
-            st.stop()
-
-    st.session_state.step = "Ranking"
-    with st.spinner("Ranking job titles based on AI relevance..."):
-        df_ranked = rank_leads("data/leads_raw.csv")
-        st.session_state.df_ranked = df_ranked
-    st.session_state.step = "Ranked"
+        with st.expander("Slowest spans"):
+            st.dataframe(pd.DataFrame(run_report["spans"]).head(10)[["name", "source", "calls", "total_secs"]],
+                         use_container_width=True)
 
-    st.success("🎉 Leads successfully scraped and ranked!")
+    st.markdown("---")
+    score_threshold = st.slider("🎯 Minimum Score Filter", 0.0, 3.0, 0.0, 0.1)
 
 # --- Display Results ---
 st.header("📈 Ranked Leads Overview")
 
 import pandas as pd
 
-ranked_csv_path = "data/leads_ranked.csv"
-if not os.path.exists(ranked_csv_path):
+if not os.path.exists(RANKED_PATH):
     st.info("No ranked leads found. Click 'Scrape & Rank Leads' to begin.")
-    st.stop()
+    end_run()
 
-df_ranked = pd.read_csv(ranked_csv_path)
+# Cached per file version; the lead store already types relevance_score as float32
+ranked_mtime = file_mtime(RANKED_PATH)
+df_ranked, neg_scores = load_ranked_leads(RANKED_PATH, ranked_mtime)
 
-if df_ranked.empty or "relevance_score" not in df_ranked.columns:
+if df_ranked.empty or neg_scores is None:
     st.warning("No ranked leads found or 'relevance_score' column missing.")
-    st.stop()
+    end_run()
 
-df_ranked["relevance_score"] = pd.to_numeric(df_ranked["relevance_score"], errors='coerce')
-df_filtered = df_ranked[df_ranked["relevance_score"] >= score_threshold].copy()
+# Leads are sorted by score, so the filtered set is a prefix found by binary search
+filtered_count = count_at_or_above(neg_scores, score_threshold)
+df_filtered = df_ranked.iloc[:filtered_count]
 
 st.subheader(f"📊 Top {len(df_filtered)} Leads (Score ≥ {score_threshold})")
 
@@ -161,18 +291,48 @@ if "experience" in df_filtered.columns:
 st.dataframe(df_filtered[display_columns], use_container_width=True, height=500)
 
 st.markdown("### 🔗 Clickable Job Links")
-for _, row in df_filtered.iterrows():
-    st.markdown(f"- [{row['title']} @ {row['company']}]({row['link']})")
+link_col1, link_col2 = st.columns(2)
+with link_col1:
+    links_per_page = st.selectbox("Links per page", [25, 50, 100, 250], index=1)
+page_count = max(1, -(-len(df_filtered) // links_per_page))
+with link_col2:
+    links_page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+
+# One markdown call for the whole page of links instead of one per row
+page_rows = df_filtered.iloc[(links_page - 1) * links_per_page:links_page * links_per_page]
+st.markdown("\n".join(
+    f"- [{title} @ {company}]({link})"
+    for title, company, link in zip(page_rows["title"], page_rows["company"], page_rows["link"])
+))
+st.caption(f"Page {links_page} of {page_count}")
 
 st.download_button(
     "⬇️ Download Filtered Results",
-    df_filtered.to_csv(index=False),
+    filtered_csv_bytes(RANKED_PATH, ranked_mtime, filtered_count),
     file_name="leads_filtered.csv"
 )
 
 st.markdown("### 📈 Relevance Score Distribution")
 st.bar_chart(df_filtered["relevance_score"])
 
+# --- Similar Lead Search ---
+if os.path.exists(LEAD_INDEX_DIR):
+    st.markdown("### 🔎 Find Similar Leads")
+    search_col1, search_col2 = st.columns([4, 1])
+    with search_col1:
+        similar_query = st.text_input("Describe the lead you are looking for (title, role or company):",
+                                      placeholder="e.g. Founding ML engineer at a seed-stage startup")
+    with search_col2:
+        similar_k = st.number_input("Results", min_value=1, max_value=100, value=10, step=1)
+    if similar_query:
+        similar = search_leads(similar_query, k=int(similar_k))
+        if similar.empty:
+            st.info("The lead index is empty. Scrape & rank leads to fill it.")
+        else:
+            st.dataframe(similar, use_container_width=True)
+
 # --- Footer ---
 st.markdown("---")
 st.markdown("Made with ❤️ by [Rannjih Surinei](https://www.linkedin.com/)")
+
+end_run()
@@ -0,0 +1,82 @@
+"""
+Benchmark: Playwright Indeed scraper against a local fixture server
+
+Serves benchmarks/fixtures/indeed.html as every results page through the
+shared FixtureServer (with an optional per-response delay to stand in for
+network latency) and compares the sync one-page-at-a-time scraper with the
+async browser pool at several concurrency levels. Each run's leads are
+checked against parse_listings on the same fixture. scrape_leads is also
+called from inside a running event loop, where asyncio.run cannot be used.
+
+Usage:
+    python -m benchmarks.bench_browser --pages 8 --delay 0.5 --concurrency 1 4 8
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.fixture_server import FIXTURES_DIR, FixtureServer
+from src.html_parser import parse_listings
+from src.scraper import BrowserPool, iter_leads, scrape_leads
+
+
+async def run_pool(base_url, pages, concurrency):
+    async with BrowserPool(concurrency=concurrency) as pool:
+        # Reuse the started pool: time the scrape, not the browser launch
+        start = time.perf_counter()
+        leads = [lead async for lead in pool.iter_leads(pages=pages, base_url=base_url)]
+        return time.perf_counter() - start, leads
+
+
+def in_running_loop(base_url, pages):
+    """Call the sync scrape_leads from a coroutine, as Streamlit or Jupyter would"""
+    async def scrape():
+        return scrape_leads(pages=pages, base_url=base_url)
+
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_browser_") as scratch:
+        # scrape_leads saves data/leads_raw.csv; keep the real one untouched
+        os.chdir(scratch)
+        os.makedirs("data")
+        try:
+            start = time.perf_counter()
+            df = asyncio.run(scrape())
+            return time.perf_counter() - start, df.to_dict("records")
+        finally:
+            os.chdir(previous_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds the server waits before each response")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES_DIR, "indeed.html"), encoding="utf-8") as f:
+        html = f.read()
+    expected = [(row["title"], row["company"]) for row in parse_listings(html, "indeed")] * args.pages
+
+    with FixtureServer(pages=args.pages, delay=args.delay) as server:
+        base_url = f"{server.url}/www.indeed.com/jobs"
+        start = time.perf_counter()
+        leads = list(iter_leads(pages=args.pages, base_url=base_url))
+        elapsed = time.perf_counter() - start
+        match = [(lead["title"].strip(), lead["company"].strip()) for lead in leads] == expected
+        print(f"[BENCH] sync, one page at a time : {elapsed:6.2f}s, {len(leads)} leads, matches fixture: {match}")
+
+        for concurrency in args.concurrency:
+            elapsed, leads = asyncio.run(run_pool(base_url, args.pages, concurrency))
+            match = [(lead["title"].strip(), lead["company"].strip()) for lead in leads] == expected
+            print(f"[BENCH] async pool, concurrency {concurrency:<2}: {elapsed:6.2f}s, {len(leads)} leads, "
+                  f"matches fixture: {match}")
+
+        elapsed, leads = in_running_loop(base_url, args.pages)
+        match = [(lead["title"].strip(), lead["company"].strip()) for lead in leads] == expected
+        print(f"[BENCH] scrape_leads in a running loop: {elapsed:6.2f}s, {len(leads)} leads, matches fixture: {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: compiled JobClassifier vs. the original nested keyword scans
+
+Generates synthetic jobs from the seed leads file, checks that the compiled
+classifier (per-row and DataFrame batch API) agrees with the original rules on
+every row, and reports rows/sec for each.
+
+Usage:
+    python -m benchmarks.bench_classifier --rows 100000
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.classifier import EXPERIENCE_KEYWORDS, FIELD_KEYWORDS, LOCATION_KEYWORDS, default_classifier
+
+
+def legacy_classify(title, tags, location="Remote"):
+    """The original MultiWebsiteScraper._process_job_data rules"""
+    title_lower = title.lower()
+    tags_lower = [tag.lower() for tag in tags]
+
+    job_location = location
+    for tag in tags:
+        if any(loc in tag.lower() for loc in LOCATION_KEYWORDS):
+            job_location = tag
+            break
+
+    job_experience = "Not specified"
+    for exp_level, keywords in EXPERIENCE_KEYWORDS.items():
+        if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
+            job_experience = exp_level
+            break
+
+    job_field = "General"
+    for field_name, keywords in FIELD_KEYWORDS.items():
+        if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
+            job_field = field_name
+            break
+
+    return job_location, job_experience, job_field
+
+
+def synthetic_jobs(rows, seed_csv="data/leads_raw.csv", seed=0):
+    """Recombine seed titles and tags into `rows` random jobs"""
+    rng = random.Random(seed)
+    seed_df = pd.read_csv(seed_csv).fillna("")
+    titles = seed_df["title"].tolist()
+    tag_pool = sorted({tag.strip() for tags in seed_df["tags"] for tag in tags.split(",") if tag.strip()})
+    tag_pool += ["US", "Europe", "Worldwide", "Intern", "Staff", "5+ years", "Kubernetes", "SEO"]
+    return [(rng.choice(titles), rng.sample(tag_pool, rng.randint(0, 8))) for _ in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.rows)
+    df = pd.DataFrame({"title": [title for title, _ in jobs], "tags": [", ".join(tags) for _, tags in jobs]})
+
+    start = time.perf_counter()
+    expected = [legacy_classify(title, tags) for title, tags in jobs]
+    legacy_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [default_classifier.classify(title, tags) for title, tags in jobs]
+    compiled_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = default_classifier.classify_frame(df)
+    batch_secs = time.perf_counter() - start
+    batch_rows = list(zip(batch["location"], batch["experience"], batch["field"]))
+
+    print(f"[BENCH] legacy   : {args.rows / legacy_secs:,.0f} rows/sec")
+    print(f"[BENCH] compiled : {args.rows / compiled_secs:,.0f} rows/sec")
+    print(f"[BENCH] batch    : {args.rows / batch_secs:,.0f} rows/sec")
+    print(f"[BENCH] mismatches: per-row {sum(a != b for a, b in zip(expected, compiled))}, "
+          f"batch {sum(a != b for a, b in zip(expected, batch_rows))}")
+
+
+if __name__ == "__main__":
+    main()
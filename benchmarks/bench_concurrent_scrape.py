@@ -0,0 +1,100 @@
+"""
+Benchmark: concurrent vs sequential scrape_all_websites through the rate-limited client
+
+Both paths run against the local fixture server with a real per-host token
+bucket (--rate requests per second, --burst) and paginated boards (--pages
+result pages each), so every sweep walks the pages under the rate limit the
+scrapers get in production. The fixture server adds --delay seconds per
+response to stand in for network latency. Checks that:
+
+- both paths return identical leads
+- no host was sent requests faster than its token bucket allows
+- with a --deadline shorter than the slowest site, the concurrent sweep
+  returns at the deadline with the sites that finished, instead of stalling
+
+Usage:
+    python -m benchmarks.bench_concurrent_scrape --rate 2 --pages 3 --delay 0.05
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.fixture_server import FixtureServer, route_client
+from src.http_client import HttpClient
+from src.multi_scraper import DEFAULT_WEBSITES, MultiWebsiteScraper
+
+# Scheduling slack allowed when checking request spacing against the token bucket
+TOLERANCE_SECS = 0.05
+
+
+def rate_limited_client(server, rate, burst, sent):
+    """HttpClient routed to `server` that records when each request was sent, per board host"""
+    client = route_client(HttpClient(rate=rate, burst=burst, max_retries=0), server)
+
+    def record(response, *args, **kwargs):
+        # Fixture URLs look like http://127.0.0.1:<port>/<board host>/<path>
+        host = urlsplit(response.url).path.split("/")[1]
+        sent[host].append(time.monotonic() - response.elapsed.total_seconds())
+
+    client.session.hooks["response"].append(record)
+    return client
+
+
+def within_rate(times, rate, burst):
+    """True if no window of requests to one host ran ahead of a `rate`/`burst` token bucket"""
+    times = sorted(times)
+    for j in range(len(times)):
+        for i in range(j):
+            allowed = burst + rate * (times[j] - times[i] + TOLERANCE_SECS)
+            if j - i + 1 > allowed:
+                return False
+    return True
+
+
+def sweep(server, args, concurrent, deadline=None):
+    sent = defaultdict(list)
+    client = rate_limited_client(server, args.rate, args.burst, sent)
+    scraper = MultiWebsiteScraper(client=client, use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        start = time.perf_counter()
+        jobs = scraper.scrape_all_websites(args.keyword, concurrent=concurrent, deadline=deadline)
+        elapsed = time.perf_counter() - start
+    client.session.close()
+    return elapsed, jobs, sent, log.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keyword", default="python")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second per host")
+    parser.add_argument("--burst", type=int, default=1, help="Token bucket size per host")
+    parser.add_argument("--pages", type=int, default=3, help="Result pages served per paged site")
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds added to every fixture response")
+    parser.add_argument("--deadline", type=float, default=1.0, help="Deadline for the last concurrent sweep")
+    args = parser.parse_args()
+
+    with FixtureServer(pages=args.pages, delay=args.delay) as server:
+        sequential_secs, sequential, sequential_sent, _ = sweep(server, args, concurrent=False)
+        concurrent_secs, concurrent, concurrent_sent, _ = sweep(server, args, concurrent=True)
+        deadline_secs, partial, _, deadline_log = sweep(server, args, concurrent=True, deadline=args.deadline)
+
+    same = json.dumps(sequential, sort_keys=True) == json.dumps(concurrent, sort_keys=True)
+    respected = all(within_rate(times, args.rate, args.burst)
+                    for sent in (sequential_sent, concurrent_sent) for times in sent.values())
+    requests = {host: len(times) for host, times in sorted(concurrent_sent.items())}
+    skipped = [website for website in DEFAULT_WEBSITES if f"{website}: No response within" in deadline_log]
+
+    print(f"[BENCH] {args.rate:g} req/s per host, burst {args.burst}, {args.pages} pages, requests {requests}")
+    print(f"[BENCH] sequential: {sequential_secs:6.2f}s  {len(sequential)} leads")
+    print(f"[BENCH] concurrent: {concurrent_secs:6.2f}s  {len(concurrent)} leads "
+          f"({sequential_secs / concurrent_secs:4.1f}x), same leads: {same}, rate limit respected: {respected}")
+    print(f"[BENCH] deadline {args.deadline:g}s: {deadline_secs:6.2f}s  {len(partial)} leads, "
+          f"skipped {skipped or 'nothing'}")
+
+
+if __name__ == "__main__":
+    main()
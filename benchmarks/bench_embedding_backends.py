@@ -0,0 +1,90 @@
+"""
+Benchmark: latency, throughput and memory of each ranker embedding backend
+
+Each backend runs in its own fresh process, so peak RSS reflects that backend
+alone: model load time and peak RSS after loading, per-batch encode latency
+(p50/p95), rows/sec over synthetic titles and peak RSS after encoding. The
+parity check (Spearman rank correlation of relevance_score against the torch
+fp32 baseline on data/leads_raw.csv) runs afterwards unless skipped.
+
+Usage:
+    python -m benchmarks.bench_embedding_backends --rows 5000 --batch-size 64
+    python -m benchmarks.bench_embedding_backends --backends onnx onnx-int8 --skip-parity
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.embedding_backends import available_backends, parity_check
+
+
+def synthetic_titles(rows, seed_csv="data/leads_raw.csv"):
+    """Seed titles with a numeric suffix (bench_ranker's generator, without its torch import)"""
+    seed = pd.read_csv(seed_csv)["title"].fillna("").tolist()
+    return [f"{seed[i % len(seed)]} {i // len(seed)}" for i in range(rows)]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, rows, batch_size, threads):
+    from src import ranker
+
+    start_rss = peak_rss_mb()
+    ranker.set_backend(backend, threads)
+    start = time.perf_counter()
+    model = ranker.get_model()
+    load_secs = time.perf_counter() - start
+    load_rss = peak_rss_mb()
+
+    titles = synthetic_titles(rows)
+    model.encode(titles[:batch_size], batch_size=batch_size)  # first call allocates buffers
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch_start = time.perf_counter()
+        model.encode(titles[offset:offset + batch_size], batch_size=batch_size, convert_to_numpy=True)
+        latencies.append(time.perf_counter() - batch_start)
+    encode_secs = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "load_secs": load_secs,
+        "load_rss": load_rss - start_rss,
+        "p50": np.percentile(latencies, 50),
+        "p95": np.percentile(latencies, 95),
+        "rows_per_sec": rows / encode_secs,
+        "peak_rss": peak_rss_mb() - start_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=available_backends())
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--skip-parity", action="store_true")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            result = pool.apply(measure, (backend, args.rows, args.batch_size, args.threads))
+        print(f"[BENCH] {backend:<9}: load {result['load_secs']:5.2f}s (+{result['load_rss']:6.0f} MB), "
+              f"batch of {args.batch_size} p50 {result['p50']:6.1f} ms / p95 {result['p95']:6.1f} ms, "
+              f"{result['rows_per_sec']:8,.0f} rows/sec, peak +{result['peak_rss']:6.0f} MB")
+
+    compared = [backend for backend in args.backends if backend != "torch"]
+    if not args.skip_parity and compared:
+        parity_check(backends=compared)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: cost of `import src.ranker`
+
+Runs the import in a fresh interpreter so nothing is already cached, and checks
+that the embedding model stack was not pulled in.
+
+Usage:
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import src.ranker\n"
+    "elapsed = time.perf_counter() - start\n"
+    "heavy = [m for m in ('sentence_transformers', 'torch') if m in sys.modules]\n"
+    "print(f'{elapsed}|{\",\".join(heavy)}')\n"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+        elapsed, heavy = out.stdout.strip().split("|")
+        timings.append(float(elapsed))
+        if heavy:
+            print(f"[WARN] import src.ranker loaded: {heavy}")
+
+    print(f"[BENCH] import src.ranker: median {statistics.median(timings) * 1000:.1f}ms "
+          f"(min {min(timings) * 1000:.1f}ms over {args.repeat} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: cost of the instrumentation hooks, off and on
+
+Runs the scrapers' per-row hot path (parse the Indeed fixture, classify and
+filter every card, which opens one span and may bump one counter per row)
+with no run recording and inside a recording run, and times a bare span()
+and count() call in both modes.
+
+Usage:
+    python -m benchmarks.bench_instrumentation --repeat 200
+"""
+import argparse
+import os
+import time
+import timeit
+
+from src.instrumentation import count, recording, span
+from src.multi_scraper import MultiWebsiteScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def hot_path(scraper, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scraper._parse_indeed_page(html, location="US", field="Backend", experience="Senior")
+    return time.perf_counter() - start
+
+
+def call_costs(number=1_000_000):
+    def open_span():
+        with span("bench"):
+            pass
+
+    def bump():
+        count("bench")
+
+    return (timeit.timeit(open_span, number=number) / number * 1e9,
+            timeit.timeit(bump, number=number) / number * 1e9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES_DIR, "indeed.html"), encoding="utf-8") as f:
+        html = f.read()
+    scraper = MultiWebsiteScraper(use_cache=False)
+
+    hot_path(scraper, html, 5)  # warm up the parser and classifier
+    off = hot_path(scraper, html, args.repeat)
+    span_off, count_off = call_costs()
+    with recording("bench", save=False):
+        on = hot_path(scraper, html, args.repeat)
+        span_on, count_on = call_costs()
+
+    print(f"[BENCH] span(): {span_off:6.0f} ns off, {span_on:6.0f} ns on | "
+          f"count(): {count_off:6.0f} ns off, {count_on:6.0f} ns on")
+    print(f"[BENCH] parse+classify+filter, {args.repeat} pages: {off * 1000:7.1f} ms off, "
+          f"{on * 1000:7.1f} ms on ({(on / off - 1):+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: lead index insert throughput and top-k query latency
+
+Fills a LeadIndex with synthetic MiniLM-sized (384 dim) unit vectors in
+scrape-sized batches, then times top-k queries on each available backend.
+Vectors are drawn around a few thousand centres, as job titles cluster by
+role; uniformly random vectors would be an unrealistic worst case for HNSW.
+For HNSW, recall@k against exact search is reported too. No model is loaded.
+
+Usage:
+    python -m benchmarks.bench_lead_index --rows 100000 500000 --k 10
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.lead_index import LeadIndex, available_backends
+
+DIM = 384
+CLUSTERS = 2_000
+NOISE = 0.5
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def clustered_unit_vectors(rng, centres, rows):
+    noise = rng.standard_normal((rows, DIM), dtype=np.float32) * (NOISE / np.sqrt(DIM))
+    return normalize(centres[rng.integers(len(centres), size=rows)] + noise)
+
+
+def next_batch(offset, size, rng, centres):
+    leads = pd.DataFrame({
+        "title": [f"Job {offset + i}" for i in range(size)],
+        "company": "Acme",
+        "link": [f"https://example.com/job/{offset + i}" for i in range(size)]
+    })
+    return leads, clustered_unit_vectors(rng, centres, size)
+
+
+def fill(index, rows, batch, rng, centres):
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        index.add(*next_batch(offset, min(batch, rows - offset), rng, centres))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000])
+    parser.add_argument("--batch", type=int, default=5_000, help="Leads inserted per add() call")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centres = normalize(rng.standard_normal((CLUSTERS, DIM), dtype=np.float32))
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as index_dir:
+            index = LeadIndex("bench", DIM, index_dir=index_dir)
+            elapsed = fill(index, rows, args.batch, rng, centres)
+            print(f"[BENCH] {rows:>9,} leads: inserted at {rows / elapsed:,.0f} leads/sec")
+
+            start = time.perf_counter()
+            index.save()
+            print(f"[BENCH] {rows:>9,} leads: saved in {time.perf_counter() - start:.2f}s")
+
+            # A scrape's worth of new leads: only they should be written
+            index.add(*next_batch(rows, args.batch, rng, centres))
+            start = time.perf_counter()
+            index.save()
+            print(f"[BENCH] {rows:>9,} leads: saved {args.batch:,} more in {time.perf_counter() - start:.2f}s")
+
+            queries = clustered_unit_vectors(rng, centres, args.queries)
+            exact = []
+            for backend in available_backends():
+                index.backend = backend
+                index.search(queries[0], args.k)  # builds the HNSW graph on first use
+                latencies = []
+                found = []
+                for query in queries:
+                    start = time.perf_counter()
+                    results = index.search(query, args.k)
+                    latencies.append(time.perf_counter() - start)
+                    found.append(set(results["link"]))
+                latencies = np.array(latencies) * 1000
+                line = (f"[BENCH] {rows:>9,} leads, {backend:<5}: p50 {np.percentile(latencies, 50):6.1f} ms, "
+                        f"p95 {np.percentile(latencies, 95):6.1f} ms")
+                if backend == "exact":
+                    exact = found
+                else:
+                    recall = np.mean([len(a & b) / args.k for a, b in zip(found, exact)])
+                    line += f", recall@{args.k} {recall:.3f}"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
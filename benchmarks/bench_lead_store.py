@@ -0,0 +1,62 @@
+"""
+Benchmark: CSV vs. Parquet vs. Arrow IPC for ranked leads
+
+Builds a synthetic ranked-leads frame from data/leads_ranked.csv, writes it in
+each format and reports file size plus write / load times. CSV loads include
+the pd.to_numeric coercion the dashboard used to do on every rerun.
+
+Usage:
+    python -m benchmarks.bench_lead_store --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.lead_store import HAS_PYARROW, load_leads, save_leads
+
+
+def synthetic_ranked(rows, seed_csv="data/leads_ranked.csv", seed=0):
+    seed_df = pd.read_csv(seed_csv)
+    df = seed_df.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+    df["link"] = df["link"] + "-" + df.index.astype(str)
+    df["source"] = np.random.default_rng(seed).choice(["RemoteOK", "Indeed", "We Work Remotely"], rows)
+    df["relevance_score"] = np.random.default_rng(seed).random(rows)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    df = synthetic_ranked(args.rows)
+    formats = ["csv"] + (["parquet", "arrow"] if HAS_PYARROW else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = os.path.join(tmp, f"leads_ranked.{fmt}")
+
+            start = time.perf_counter()
+            save_leads(df, path)
+            write_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if fmt == "csv":
+                # What app.py did before the lead store
+                loaded = pd.read_csv(path)
+                loaded["relevance_score"] = pd.to_numeric(loaded["relevance_score"], errors="coerce")
+            else:
+                loaded = load_leads(path)
+            load_secs = time.perf_counter() - start
+
+            print(f"[BENCH] {fmt:<8}: {os.path.getsize(path) / 1e6:7.2f} MB, "
+                  f"write {write_secs * 1000:7.1f}ms, load {load_secs * 1000:7.1f}ms, "
+                  f"memory {loaded.memory_usage(deep=True).sum() / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: multi-keyword scrape with request coalescing vs one scrape per keyword
+
+Scrapes a nightly-style keyword list against the local fixture server, first
+with scrape_all_websites per keyword (the original approach), then with one
+scrape_many call that fetches and parses every distinct page once. The
+fixture server adds --delay seconds per request to stand in for network
+latency. Reports wall time, requests and bytes served, and checks that every
+keyword gets the same leads both ways.
+
+Usage:
+    python -m benchmarks.bench_multi_keyword --delay 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from benchmarks.fixture_server import FixtureServer, serving
+from src.multi_scraper import WE_WORK_REMOTELY_CATEGORIES, MultiWebsiteScraper
+
+KEYWORDS = sorted(WE_WORK_REMOTELY_CATEGORIES) + ["golang", "rust", "devops", "data", "product", "sales"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keywords", nargs="+", default=KEYWORDS)
+    parser.add_argument("--delay", type=float, default=0.1, help="Seconds added to every fixture response")
+    parser.add_argument("--pages", type=int, default=3, help="Result pages served per paged site")
+    args = parser.parse_args()
+
+    with FixtureServer(pages=args.pages, delay=args.delay) as server, serving(server) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            per_keyword = {keyword: MultiWebsiteScraper(client=client, use_cache=False).scrape_all_websites(keyword)
+                           for keyword in args.keywords}
+            per_keyword_secs = time.perf_counter() - start
+        per_keyword_requests, per_keyword_bytes = server.requests, server.bytes_served
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            coalesced = MultiWebsiteScraper(client=client, use_cache=False).scrape_many(args.keywords)
+            coalesced_secs = time.perf_counter() - start
+        coalesced_requests = server.requests - per_keyword_requests
+        coalesced_bytes = server.bytes_served - per_keyword_bytes
+
+    same = all(json.dumps(per_keyword[keyword], sort_keys=True) == json.dumps(coalesced[keyword], sort_keys=True)
+               for keyword in args.keywords)
+    print(f"[BENCH] {len(args.keywords)} keywords")
+    print(f"[BENCH] per keyword: {per_keyword_secs:6.2f}s  {per_keyword_requests:4d} requests  "
+          f"{per_keyword_bytes / 1e6:6.1f} MB")
+    print(f"[BENCH] scrape_many: {coalesced_secs:6.2f}s  {coalesced_requests:4d} requests  "
+          f"{coalesced_bytes / 1e6:6.1f} MB  ({per_keyword_secs / coalesced_secs:4.1f}x), same leads: {same}")
+
+
+if __name__ == "__main__":
+    main()
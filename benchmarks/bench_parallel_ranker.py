@@ -0,0 +1,70 @@
+"""
+Benchmark: parallel ranking throughput from 1 to N cores
+
+Writes a synthetic raw-leads file (seed titles from data/leads_raw.csv with a
+numeric suffix, so nothing is served from a cache) and ranks it with
+rank_leads_parallel for each worker x thread split whose total stays within
+the core count. The single-process rank_leads path is timed as the baseline.
+
+Usage:
+    python -m benchmarks.bench_parallel_ranker --rows 200000 --threads 1 2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src import ranker
+from src.parallel_ranker import rank_leads_parallel
+
+
+def synthetic_leads(rows, seed_csv="data/leads_raw.csv"):
+    seed = pd.read_csv(seed_csv)
+    df = seed.iloc[[i % len(seed) for i in range(rows)]].reset_index(drop=True)
+    df["title"] = df["title"].fillna("") + " " + (df.index // len(seed)).astype(str)
+    return df
+
+
+def worker_counts(cores):
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2], help="torch threads per worker to try")
+    parser.add_argument("--chunk-rows", type=int, default=20_000)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "leads_raw.csv")
+        synthetic_leads(args.rows).to_csv(input_path, index=False)
+
+        baseline = None
+        if not args.skip_baseline:
+            start = time.perf_counter()
+            ranker.rank_leads(input_path, use_cache=False, output_path=os.path.join(tmp_dir, "baseline.csv"))
+            baseline = args.rows / (time.perf_counter() - start)
+            print(f"[BENCH] rank_leads, 1 process          : {baseline:8,.0f} rows/sec")
+
+        for threads in args.threads:
+            for workers in worker_counts(max(1, cores // threads)):
+                start = time.perf_counter()
+                rank_leads_parallel(input_path, os.path.join(tmp_dir, "ranked.csv"), workers, threads,
+                                    args.chunk_rows, sort=False)
+                rate = args.rows / (time.perf_counter() - start)
+                speedup = f", {rate / baseline:4.1f}x baseline" if baseline else ""
+                print(f"[BENCH] {workers:>3} workers x {threads} threads      : {rate:8,.0f} rows/sec{speedup}")
+
+
+if __name__ == "__main__":
+    main()
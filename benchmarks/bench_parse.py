@@ -0,0 +1,70 @@
+"""
+Benchmark: HTML parse throughput per backend on the saved site fixtures
+
+Compares the original approach (full BeautifulSoup/html.parser tree plus
+find/find_all walks per row) against parse_listings on every installed backend.
+
+Usage:
+    python -m benchmarks.bench_parse --repeat 20
+"""
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from src.html_parser import available_backends, parse_listings
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SITES = ["remoteok", "indeed", "we_work_remotely"]
+
+
+def legacy_parse(html, site):
+    """The per-site find/find_all walks the scrapers used before html_parser"""
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    if site == "remoteok":
+        for tr in soup.find_all("tr", class_="job"):
+            rows.append((tr.find("h2").text.strip(), tr.find("h3").text.strip(),
+                         [tag.text.strip() for tag in tr.find_all("div", class_="tag")], tr["data-href"]))
+    elif site == "indeed":
+        for card in soup.find_all("div", class_="job_seen_beacon"):
+            rows.append((card.find("h2", class_="jobTitle").get_text(strip=True),
+                         card.find("span", class_="companyName").get_text(strip=True),
+                         card.find("div", class_="companyLocation").get_text(strip=True),
+                         card.find("a", class_="jcs-JobTitle")["href"],
+                         card.find("div", class_="job-snippet").get_text()))
+    else:
+        for listing in soup.find_all("li", class_="feature"):
+            rows.append((listing.find("span", class_="title").get_text(strip=True),
+                         listing.find("span", class_="company").get_text(strip=True),
+                         listing.find("a")["href"]))
+    return rows
+
+
+def time_it(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for site in SITES:
+        with open(os.path.join(FIXTURES_DIR, f"{site}.html"), encoding="utf-8") as f:
+            html = f.read()
+        size_mb = len(html.encode("utf-8")) / 1e6
+
+        secs, rows = time_it(lambda: legacy_parse(html, site), args.repeat)
+        print(f"[BENCH] {site:<17} legacy      : {size_mb / secs:6.2f} MB/s, {len(rows) / secs:8,.0f} rows/sec")
+        for backend in available_backends():
+            secs, rows = time_it(lambda: parse_listings(html, site, backend), args.repeat)
+            print(f"[BENCH] {site:<17} {backend:<12}: {size_mb / secs:6.2f} MB/s, {len(rows) / secs:8,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
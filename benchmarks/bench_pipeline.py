@@ -0,0 +1,76 @@
+"""
+Benchmark: streaming pipeline vs scrape-then-rank, against the local fixture server
+
+The baseline is what the app does: scrape_all_websites for every site, save
+the raw leads, then rank_leads on the whole set. The pipeline overlaps the
+same work across bounded stage queues. The fixture server adds --delay
+seconds per request to stand in for network latency; both runs must produce
+the same set of leads.
+
+Usage:
+    python -m benchmarks.bench_pipeline --delay 0.2 --stub-model
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_suite import StubEncoder
+from benchmarks.fixture_server import FixtureServer, serving
+from src import ranker
+from src.multi_scraper import MultiWebsiteScraper
+from src.pipeline import DEFAULT_FETCH_WORKERS, run_pipeline
+
+
+def lead_keys(df):
+    return set(zip(df["title"].str.lower(), df["company"].str.lower()))
+
+
+def scrape_then_rank(client, keyword):
+    df = pd.DataFrame(MultiWebsiteScraper(client=client, use_cache=False).scrape_all_websites(keyword))
+    df.to_csv("data/leads_raw.csv", index=False)
+    return ranker.rank_leads("data/leads_raw.csv", use_cache=False, output_path="data/leads_ranked.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keyword", default="python")
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds added to every fixture response")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--stub-model", action="store_true", help="Score with a hashed bag of words, not the model")
+    args = parser.parse_args()
+
+    if args.stub_model:
+        ranker._model = StubEncoder()
+
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as scratch:
+        os.chdir(scratch)
+        os.makedirs("data")
+        try:
+            with FixtureServer(delay=args.delay) as server, serving(server) as client:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    baseline = scrape_then_rank(client, args.keyword)
+                    baseline_secs = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    run_pipeline(args.keyword, output_path="data/pipeline_ranked.csv",
+                                 raw_path=None, store_run=False, fetch_workers=args.fetch_workers,
+                                 use_cache=False, client=client)
+                    pipeline_secs = time.perf_counter() - start
+            streamed = pd.read_csv("data/pipeline_ranked.csv")
+        finally:
+            os.chdir(previous_dir)
+
+    print(f"[BENCH] scrape then rank: {baseline_secs:6.2f}s  {len(baseline)} leads")
+    print(f"[BENCH] pipeline:         {pipeline_secs:6.2f}s  {len(streamed)} leads "
+          f"({baseline_secs / pipeline_secs:4.1f}x), same leads: {lead_keys(baseline) == lead_keys(streamed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: peak memory and time of out-of-core vs in-memory sorting of ranked leads
+
+Scored chunks are generated on the fly (random relevance scores, so no model is
+loaded) and sorted into a ranked file two ways, each in a fresh process:
+concatenating everything and sorting in memory as rank_leads does, and
+sort_scored_chunks' sorted runs plus k-way merge. The top-N path (top_leads)
+is timed too. Peak RSS of the out-of-core paths should stay flat as rows grow,
+including the tied case, where every row has the same score (repeated titles
+score identically, so long runs of equal scores are common).
+
+Usage:
+    python -m benchmarks.bench_streaming_ranker --rows 1000000 5000000 --chunk-rows 50000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.lead_store import STORE_FORMAT, save_leads
+from src.streaming_ranker import sort_scored_chunks, top_leads
+
+
+def scored_chunks(rows, chunk_rows, seed=0, tied=False):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        size = min(chunk_rows, rows - start)
+        index = np.arange(start, start + size)
+        yield pd.DataFrame({
+            "title": [f"Senior Engineer {i % 5000}" for i in index],
+            "company": [f"Company {i % 800}" for i in index],
+            "link": [f"https://jobs.example/{i}" for i in index],
+            "relevance_score": np.full(size, 0.5, dtype=np.float32) if tied else rng.random(size, dtype=np.float32)
+        })
+
+
+def measure(mode, rows, chunk_rows, top_n):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, f"ranked.{STORE_FORMAT}")
+        start = time.perf_counter()
+        if mode == "in-memory":
+            df = pd.concat(scored_chunks(rows, chunk_rows), ignore_index=True)
+            df.sort_values(by="relevance_score", ascending=False, inplace=True)
+            save_leads(df, output_path)
+        elif mode == "out-of-core":
+            sort_scored_chunks(scored_chunks(rows, chunk_rows), output_path)
+        elif mode == "out-of-core tied":
+            sort_scored_chunks(scored_chunks(rows, chunk_rows, tied=True), output_path)
+        else:
+            top_leads(scored_chunks(rows, chunk_rows), top_n)
+        elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--skip-in-memory", action="store_true")
+    args = parser.parse_args()
+
+    modes = ["out-of-core", "out-of-core tied", "top-n"]
+    if not args.skip_in_memory:
+        modes.insert(0, "in-memory")
+    context = multiprocessing.get_context("spawn")
+    for rows in args.rows:
+        for mode in modes:
+            with context.Pool(1) as pool:
+                elapsed, peak = pool.apply(measure, (mode, rows, args.chunk_rows, args.top_n))
+            print(f"[BENCH] {rows:>10,} rows, {mode:<16}: {elapsed:6.1f}s, "
+                  f"{rows / elapsed:9,.0f} rows/sec, peak RSS {peak:6.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Benchmark suite: every stage of the pipeline, offline and reproducible
+
+Runs fetch, parse, classify, dedupe, embed, rank and dashboard-load
+benchmarks without touching the internet or the real data/ directory:
+
+- fetch: every scraper entry point (MultiWebsiteScraper.scrape_*, both
+  scrape_remoteok_jobs, and with --browser scraper.scrape_leads) against
+  the recorded fixtures served by benchmarks/fixture_server.py
+- parse: parse_listings on each board's fixture and the RemoteOK JSON feed
+- classify / dedupe / embed / rank / dashboard: synthetic leads
+  (benchmarks/synthetic.py) at each --sizes row count
+
+Each case is timed --repeat times; the median and best are kept. Results are
+saved as JSON under benchmarks/results/, named after the current commit, and
+--compare prints the change against another commit's results.
+
+With --stub-model the embedding model is replaced by a deterministic
+hashed bag-of-words encoder, so embed and rank time the pipeline around the
+model on machines without it; compare such results only with other stub runs.
+
+Usage:
+    python -m benchmarks.bench_suite --sizes 1k 100k 1m
+    python -m benchmarks.bench_suite --only parse fetch --compare HEAD~1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from benchmarks.fixture_server import FIXTURES_DIR, FixtureServer, serving
+from benchmarks.synthetic import parse_size, synthetic_leads, synthetic_ranked
+
+BENCHMARKS = ["fetch", "parse", "classify", "dedupe", "embed", "rank", "dashboard"]
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+APP_PATH = os.path.join(REPO_DIR, "app", "app.py")
+PARSE_FIXTURES = {"remoteok": "remoteok.html", "indeed": "indeed.html", "stackoverflow": "stackoverflow.html",
+                  "angelco": "angelco.html", "we_work_remotely": "we_work_remotely.html"}
+STUB_DIM = 384
+
+
+class StubEncoder:
+    """Deterministic stand-in for the sentence model: hashed bag of words, L2-normalized"""
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.zeros((len(texts), STUB_DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                vectors[row, zlib.crc32(token.encode("utf-8")) % STUB_DIM] += 1.0
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[0] if single else vectors
+
+
+def time_case(func, repeat, warmup=False):
+    """Run func `repeat` times (plus one untimed run with warmup); returns (seconds list, last result)"""
+    if warmup:
+        func()
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+@contextlib.contextmanager
+def quiet(verbose):
+    """Swallow the pipeline's [INFO] output while timing, unless --verbose"""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class Suite:
+    def __init__(self, args):
+        self.args = args
+        self.results = {}
+
+    def run(self, benchmark, case, func, rows=None, warmup=False):
+        """Time one case and record it as "<benchmark>/<case>"; rows(result) gives the rows processed"""
+        key = f"{benchmark}/{case}"
+        try:
+            with quiet(self.args.verbose):
+                timings, result = time_case(func, self.args.repeat, warmup)
+        except Exception as e:
+            print(f"[WARN] {key} failed: {e}")
+            return None
+        entry = {"median_secs": statistics.median(timings), "best_secs": min(timings), "repeat": len(timings)}
+        if rows is not None:
+            entry["rows"] = rows(result) if callable(rows) else rows
+            entry["rows_per_sec"] = entry["rows"] / entry["median_secs"] if entry["median_secs"] else None
+        self.results[key] = entry
+        throughput = f", {entry['rows_per_sec']:12,.0f} rows/sec" if entry.get("rows_per_sec") else ""
+        print(f"[BENCH] {key:<40} {entry['median_secs'] * 1000:10.1f} ms (best {entry['best_secs'] * 1000:.1f})"
+              f"{throughput}")
+        return result
+
+    def sizes(self, limit=None):
+        for size in self.args.sizes:
+            rows = parse_size(size)
+            if limit is not None and rows > limit:
+                print(f"[INFO] Skipping {size} rows (over --max-model-rows {limit})")
+                continue
+            yield size, rows
+
+    def bench_fetch(self):
+        from src.multi_scraper import DEFAULT_WEBSITES, MultiWebsiteScraper
+        from src import scraper2
+
+        with FixtureServer(pages=self.args.pages, delay=self.args.delay) as server, serving(server) as client:
+            for website in DEFAULT_WEBSITES:
+                scrape = lambda website=website: getattr(
+                    MultiWebsiteScraper(client=client, use_cache=False), f"scrape_{website}")(self.args.keyword)
+                self.run("fetch", f"multi_scraper/{website}", scrape, rows=len, warmup=True)
+            self.run("fetch", "multi_scraper/all",
+                     lambda: MultiWebsiteScraper(client=client, use_cache=False).scrape_all_websites(
+                         self.args.keyword, websites=DEFAULT_WEBSITES),
+                     rows=len)
+            self.run("fetch", "scraper2/remoteok",
+                     lambda: scraper2.scrape_remoteok_jobs(self.args.keyword, use_cache=False), rows=len)
+
+            if self.args.browser:
+                from src.scraper import scrape_leads
+                base_url = f"{server.url}/www.indeed.com/jobs"
+                self.run("fetch", "scraper/indeed_browser",
+                         lambda: scrape_leads(self.args.keyword, pages=self.args.pages, base_url=base_url), rows=len)
+
+    def bench_parse(self):
+        from src.html_parser import parse_listings
+        from src.remoteok_feed import iter_json_array
+
+        for site, fixture in PARSE_FIXTURES.items():
+            with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+                html = f.read()
+            self.run("parse", site, lambda html=html, site=site: parse_listings(html, site), rows=len, warmup=True)
+
+        with open(os.path.join(FIXTURES_DIR, "remoteok_api.json"), "rb") as f:
+            feed = f.read()
+        chunks = [feed[start:start + 64 * 1024] for start in range(0, len(feed), 64 * 1024)]
+        self.run("parse", "remoteok_feed", lambda: list(iter_json_array(chunks)), rows=len, warmup=True)
+
+    def bench_classify(self):
+        from src.classifier import default_classifier
+
+        for size, rows in self.sizes():
+            df = synthetic_leads(rows)
+            self.run("classify", size, lambda df=df: default_classifier.classify_frame(df), rows=rows)
+
+    def bench_dedupe(self):
+        from src.dedupe import near_duplicate_labels
+
+        for size, rows in self.sizes():
+            df = synthetic_leads(rows)
+            titles, companies, links = df["title"].tolist(), df["company"].tolist(), df["link"].tolist()
+            self.run("dedupe", size,
+                     lambda titles=titles, companies=companies, links=links:
+                     near_duplicate_labels(titles, companies, links), rows=rows)
+
+    def bench_embed(self):
+        from src import ranker
+
+        ranker.get_keyword_embeddings()
+        for size, rows in self.sizes(self.args.max_model_rows):
+            titles = synthetic_leads(rows)["title"].tolist()
+            self.run("embed", size, lambda titles=titles: ranker.score_titles(titles), rows=rows)
+
+    def bench_rank(self):
+        from src import ranker
+        from src.lead_store import STORE_FORMAT, save_leads
+
+        ranker.get_keyword_embeddings()
+        for size, rows in self.sizes(self.args.max_model_rows):
+            raw_path = os.path.join("data", f"bench_raw_{size}.{STORE_FORMAT}")
+            save_leads(synthetic_leads(rows).drop(columns="source"), raw_path)
+            ranked_path = os.path.join("data", f"bench_ranked_{size}.{STORE_FORMAT}")
+            self.run("rank", size,
+                     lambda raw_path=raw_path, ranked_path=ranked_path:
+                     ranker.rank_leads(raw_path, use_cache=False, output_path=ranked_path), rows=rows)
+
+    def bench_dashboard(self):
+        import streamlit as st
+        from streamlit.testing.v1 import AppTest
+
+        from src.lead_store import RANKED_PATH, save_leads
+
+        def run_app(app):
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].message)
+            return app
+
+        def cold_load():
+            # A fresh session with Streamlit's caches cleared: the first page view after a restart
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            return run_app(AppTest.from_file(APP_PATH, default_timeout=self.args.app_timeout))
+
+        for size, rows in self.sizes():
+            save_leads(synthetic_ranked(rows), RANKED_PATH)
+            self.run("dashboard", f"{size}/cold", cold_load, rows=rows)
+            # Reruns of one session (every widget interaction) reuse the cached leads
+            app = AppTest.from_file(APP_PATH, default_timeout=self.args.app_timeout)
+            self.run("dashboard", f"{size}/rerun", lambda app=app: run_app(app), rows=rows, warmup=True)
+
+    def run_all(self, only):
+        for benchmark in BENCHMARKS:
+            if benchmark in only:
+                getattr(self, f"bench_{benchmark}")()
+
+
+def git_label():
+    """Short commit hash of the working tree, suffixed with -dirty when it has uncommitted changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime("run-%Y%m%dT%H%M%S")
+    return f"{commit}-dirty" if dirty else commit
+
+
+def results_path(ref):
+    """Saved results for a file path, a label, or any git revision (its plain or -dirty run)"""
+    if os.path.exists(ref):
+        return ref
+    candidates = [ref]
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", ref], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        candidates += [commit, f"{commit}-dirty"]
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    for label in candidates:
+        path = os.path.join(RESULTS_DIR, f"{label}.json")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def compare(baseline, current, threshold):
+    """Print each case's median time against the baseline; returns the number of regressions"""
+    model_keys = [key for key in current["results"] if key.startswith(("embed/", "rank/"))]
+    if model_keys and baseline["meta"].get("model") != current["meta"].get("model"):
+        print(f"[WARN] Model differs ({baseline['meta'].get('model')} vs {current['meta'].get('model')}), "
+              f"embed and rank timings are not comparable")
+    regressions = 0
+    print(f"[INFO] Compared with {baseline['meta']['label']}:")
+    for key, entry in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"  {key:<40} {'new':>10}")
+            continue
+        change = entry["median_secs"] / before["median_secs"] - 1 if before["median_secs"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"  {key:<40} {before['median_secs'] * 1000:10.1f} ms -> {entry['median_secs'] * 1000:10.1f} ms "
+              f"({change:+.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="Synthetic row counts (1k, 100k, 1m, ...)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keyword", default="python")
+    parser.add_argument("--pages", type=int, default=3, help="Result pages the paginated fixture boards serve")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds the fixture server waits per response")
+    parser.add_argument("--browser", action="store_true", help="Also run the Playwright scraper (needs Chromium)")
+    parser.add_argument("--stub-model", action="store_true", help="Replace the embedding model with a hashed stub")
+    parser.add_argument("--max-model-rows", type=int, default=100_000,
+                        help="Largest size the embed and rank benchmarks run at")
+    parser.add_argument("--app-timeout", type=float, default=120)
+    parser.add_argument("--label", help="Name of the saved results (default: current commit)")
+    parser.add_argument("--compare", metavar="REF", help="Commit, label or results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown reported as a regression")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    from src import ranker
+    if args.stub_model:
+        ranker._model = StubEncoder()
+        model = "stub"
+    else:
+        model = ranker.embedding_key()
+        if {"embed", "rank", "dashboard"} & set(args.only):
+            try:
+                ranker.get_model()
+            except Exception as e:
+                print(f"[WARN] Embedding model unavailable ({e}); skipping embed and rank (see --stub-model)")
+                args.only = [name for name in args.only if name not in ("embed", "rank")]
+
+    label = args.label or git_label()
+    suite = Suite(args)
+    # Benchmarks write data/ files (raw/ranked leads, caches); keep them out of the real data/ directory
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as scratch:
+        os.makedirs(os.path.join(scratch, "data"))
+        os.chdir(scratch)
+        try:
+            suite.run_all(args.only)
+        finally:
+            os.chdir(previous_dir)
+
+    report = {
+        "meta": {
+            "label": label,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "model": model,
+            "argv": sys.argv[1:],
+        },
+        "results": suite.results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{label}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[SUCCESS] Results saved to {path}")
+
+    if args.compare:
+        path = results_path(args.compare)
+        if path is None:
+            print(f"[ERROR] No saved results for {args.compare} in {RESULTS_DIR}")
+            sys.exit(2)
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: bulk email verification vs one validate_email call per address
+
+Synthetic contacts spread over a fixed number of company domains are checked
+two ways: the original approach (validate_email per address, one DNS check
+each) and verify_emails (syntax per distinct domain, DNS per distinct domain
+through the domain cache). DNS is answered by an in-process stub resolver that
+sleeps --dns-latency seconds per query, so no network is needed. Runs both
+with and without deliverability checks, and checks the two agree.
+
+Usage:
+    python -m benchmarks.bench_verifier --rows 100000 --domains 5000 --dns-latency 0.02
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from email_validator import EmailNotValidError, validate_email
+
+from src.verifier import DomainCache, verify_emails
+
+FIRST_NAMES = ["alex", "sam", "jordan", "taylor", "morgan", "casey", "riley", "jamie", "drew", "quinn"]
+
+
+class StubResolver:
+    """Answers every MX query with one mail server after a fixed delay, counting queries"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.queries = 0
+
+    def resolve(self, qname, rdtype):
+        self.queries += 1
+        time.sleep(self.latency)
+        return [SimpleNamespace(preference=10, exchange=f"mx.{qname}.")]
+
+
+def synthetic_contacts(rows, domains, seed=0):
+    rng = random.Random(seed)
+    companies = [f"company{i}.com" for i in range(domains)]
+    contacts = [f"{rng.choice(FIRST_NAMES)}.{i}@{rng.choice(companies)}" for i in range(rows)]
+    # A few malformed entries, as scraped contact lists have
+    for i in range(0, rows, 97):
+        contacts[i] = contacts[i].replace("@", " at ")
+    return contacts
+
+
+def legacy_verify(emails, check_deliverability, resolver):
+    valid = []
+    for email in emails:
+        try:
+            if check_deliverability:
+                validate_email(email, dns_resolver=resolver)
+            else:
+                validate_email(email, check_deliverability=False)
+            valid.append(True)
+        except EmailNotValidError:
+            valid.append(False)
+    return valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--domains", type=int, default=5_000)
+    parser.add_argument("--dns-latency", type=float, default=0.02)
+    parser.add_argument("--legacy-rows", type=int, default=5_000,
+                        help="Rows timed for the per-address approach (extrapolated to --rows)")
+    args = parser.parse_args()
+
+    emails = synthetic_contacts(args.rows, args.domains)
+    sample = emails[:args.legacy_rows]
+
+    for check_deliverability in (False, True):
+        mode = "syntax + DNS" if check_deliverability else "syntax only "
+        resolver = StubResolver(args.dns_latency)
+        start = time.perf_counter()
+        legacy = legacy_verify(sample, check_deliverability, resolver)
+        legacy_secs = (time.perf_counter() - start) * args.rows / len(sample)
+
+        resolver = StubResolver(args.dns_latency)
+        start = time.perf_counter()
+        results = verify_emails(emails, check_deliverability, resolver=resolver, cache=DomainCache())
+        bulk_secs = time.perf_counter() - start
+        match = [result["valid"] for result in results[:len(sample)]] == legacy
+        print(f"[BENCH] {mode}: per address {legacy_secs:8.1f}s (extrapolated), bulk {bulk_secs:6.1f}s "
+              f"({legacy_secs / bulk_secs:5.1f}x), {resolver.queries} DNS queries, matches: {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Local HTTP stand-in for the job boards, serving the recorded fixtures
+
+FixtureServer answers on 127.0.0.1 with benchmarks/fixtures/*: the RemoteOK
+feed and page, Indeed, Stack Overflow, AngelList and We Work Remotely result
+pages. Paginated boards serve `pages` pages of listings and then an empty
+page, so the scrapers stop as they do on the real sites. An optional delay
+per response stands in for network latency.
+
+route_client points an HttpClient at the server: requests for the boards'
+hosts are rewritten to http://127.0.0.1:<port>/<host><path>, so the scrapers
+run unmodified, URLs and all.
+
+Usage:
+    with FixtureServer(pages=3, delay=0.05) as server, serving(server) as client:
+        MultiWebsiteScraper(client=client, use_cache=False).scrape_all_websites("python")
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from src import http_client
+from src.http_client import HttpClient
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+EMPTY_PAGE = b"<html><body><p>No more jobs</p></body></html>"
+
+# host -> [(path prefix, fixture, content type, paginated)]; the first matching prefix wins
+ROUTES = {
+    "remoteok.com": [("/api", "remoteok_api.json", "application/json", False),
+                     ("/remote-", "remoteok.html", "text/html", False)],
+    "www.indeed.com": [("/jobs", "indeed.html", "text/html", True)],
+    "stackoverflow.com": [("/jobs", "stackoverflow.html", "text/html", False)],
+    "angel.co": [("/talent/jobs", "angelco.html", "text/html", False)],
+    "weworkremotely.com": [("/categories/", "we_work_remotely.html", "text/html", True)],
+}
+
+
+def _page_number(path):
+    """Zero-based result page of a request (Indeed pages by ?start=, We Work Remotely by ?page=)"""
+    query = parse_qs(urlparse(path).query)
+    if "start" in query:
+        return int(query["start"][0]) // 10
+    return int(query.get("page", ["1"])[0]) - 1
+
+
+def _make_handler(server):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            host, _, path = self.path.lstrip("/").partition("/")
+            route = server.route(host, "/" + path)
+            if route is None:
+                self._reply(404, b"not found", "text/plain")
+                return
+            fixture, content_type, paginated = route
+            body = server.fixture(fixture)
+            if paginated and _page_number(self.path) >= server.pages:
+                body = EMPTY_PAGE
+            server.record(len(body))
+            if server.delay:
+                time.sleep(server.delay)
+            self._reply(200, body, content_type)
+
+        def _reply(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """
+    Serve the recorded fixtures from a background thread
+
+    Args:
+        pages (int): Result pages the paginated boards serve before an empty page
+        delay (float): Seconds to wait before each response
+    """
+
+    def __init__(self, pages=3, delay=0.0, fixtures_dir=FIXTURES_DIR):
+        self.pages = pages
+        self.delay = delay
+        self.fixtures_dir = fixtures_dir
+        self.requests = 0
+        self.bytes_served = 0
+        self._fixtures = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def route(self, host, path):
+        for prefix, fixture, content_type, paginated in ROUTES.get(host, []):
+            if path.startswith(prefix):
+                return fixture, content_type, paginated
+        return None
+
+    def fixture(self, name):
+        body = self._fixtures.get(name)
+        if body is None:
+            with open(os.path.join(self.fixtures_dir, name), "rb") as f:
+                body = self._fixtures[name] = f.read()
+        return body
+
+    def record(self, size):
+        with self._lock:
+            self.requests += 1
+            self.bytes_served += size
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_served = 0
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class FixtureAdapter(HTTPAdapter):
+    """Transport adapter that sends a board's requests to the FixtureServer instead"""
+
+    def __init__(self, server_url, **kwargs):
+        super().__init__(**kwargs)
+        self.server_url = server_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        query = f"?{parts.query}" if parts.query else ""
+        request.url = f"{self.server_url}/{parts.netloc}{parts.path}{query}"
+        return super().send(request, **kwargs)
+
+
+def route_client(client, server):
+    """Mount FixtureAdapters on `client` for every host the server has fixtures for"""
+    for host in ROUTES:
+        adapter = FixtureAdapter(server.url, pool_connections=16, pool_maxsize=16)
+        client.session.mount(f"https://{host}", adapter)
+        client.session.mount(f"http://{host}", adapter)
+    return client
+
+
+@contextmanager
+def serving(server):
+    """
+    Route a fresh, unthrottled HttpClient to `server` and make it the shared default client
+
+    Scrapers that fall back to get_default_client() (scraper2, the RemoteOK feed)
+    then hit the stand-in too. The previous default client is restored on exit.
+    """
+    client = route_client(HttpClient(rate=0, max_retries=0), server)
+    previous = http_client._default_client
+    http_client._default_client = client
+    try:
+        yield client
+    finally:
+        http_client._default_client = previous
+        client.session.close()
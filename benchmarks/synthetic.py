@@ -0,0 +1,98 @@
+"""
+Synthetic lead tables of any size, seeded from data/leads_raw.csv
+
+Rows recombine the seed file's titles, tags, locations, fields and experience
+levels with a seniority prefix, a stack, a team and a numbered company, so they look
+like scraped leads and keep realistic title lengths. There are about 160k
+distinct titles: small tables are mostly distinct, large ones repeat titles as
+big scrapes do. Output depends only on the row count and the seed.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+SEED_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "leads_raw.csv")
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+PREFIXES = ["", "Senior", "Junior", "Lead", "Staff", "Principal", "Sr.", "Remote"]
+STACKS = ["", "Python", "Go", "React", "Rust", "Java", "Kotlin", "Node", "AWS", "Django", "Swift", "ML",
+          "Data", "Cloud", "Platform", "Payments"]
+TEAMS = ["", "Growth", "Search", "Billing", "Identity", "Infra", "Mobile", "Web", "Core", "Ads", "Risk", "Fraud",
+         "Checkout", "Onboarding", "Analytics", "Messaging", "Maps", "Video", "Audio", "Storage", "Compute",
+         "Networking", "Security", "Privacy", "Compliance", "Support Tools", "Developer Experience", "Observability",
+         "Reliability", "Data Platform", "ML Platform", "Recommendations", "Personalization", "Pricing", "Logistics",
+         "Marketplace", "Integrations", "API", "SDK", "Firmware", "Robotics", "Hardware", "Research", "Labs",
+         "Healthcare", "Fintech", "Crypto", "Gaming", "Education", "Travel", "Retail", "Insurance", "Energy",
+         "Climate", "Automotive", "Media", "Social", "Enterprise", "SMB", "Partnerships", "Localization",
+         "Accessibility", "Performance", "Experimentation"]
+LINK_HOSTS = ["https://remoteok.com/remote-jobs/", "https://www.indeed.com/viewjob?jk=",
+              "https://weworkremotely.com/remote-jobs/", "https://angel.co/jobs/", "https://stackoverflow.com/jobs/"]
+SOURCES = ["RemoteOK", "Indeed", "We Work Remotely", "AngelList", "Stack Overflow"]
+
+
+def parse_size(size):
+    """'100k' / '1m' / '2500' -> row count"""
+    size = str(size).lower()
+    if size in SIZES:
+        return SIZES[size]
+    if size[-1:] in ("k", "m"):
+        return int(float(size[:-1]) * (1_000 if size[-1] == "k" else 1_000_000))
+    return int(size)
+
+
+def _seed_frame(seed_csv):
+    return pd.read_csv(seed_csv, dtype=str).fillna("")
+
+
+def _pick(rng, values, rows):
+    return np.asarray(values, dtype=object)[rng.integers(len(values), size=rows)]
+
+
+def synthetic_leads(rows, seed_csv=SEED_CSV, seed=0):
+    """
+    Raw leads shaped like data/leads_raw.csv (plus a source column)
+
+    Args:
+        rows (int): Number of leads
+        seed_csv (str): Scraped leads whose values are recombined
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: title, company, tags, link, location, field, experience and source columns
+    """
+    rng = np.random.default_rng(seed)
+    seed_df = _seed_frame(seed_csv)
+    tag_pool = sorted({tag.strip() for tags in seed_df["tags"] for tag in tags.split(",") if tag.strip()})
+
+    seed_rows = rng.integers(len(seed_df), size=rows)
+    titles = seed_df["title"].to_numpy(dtype=object)[seed_rows]
+    prefixes = _pick(rng, PREFIXES, rows)
+    stacks = _pick(rng, STACKS, rows)
+    teams = _pick(rng, TEAMS, rows)
+    company_ids = rng.integers(max(rows // 4, 1), size=rows)
+    companies = seed_df["company"].to_numpy(dtype=object)[rng.integers(len(seed_df), size=rows)]
+    tag_counts = rng.integers(1, 9, size=rows)
+    tag_ids = rng.integers(len(tag_pool), size=(rows, 8))
+    hosts = rng.integers(len(LINK_HOSTS), size=rows)
+
+    return pd.DataFrame({
+        "title": [" ".join(part for part in (prefix, stack, title) if part) + (f", {team}" if team else "")
+                  for prefix, stack, title, team in zip(prefixes, stacks, titles, teams)],
+        "company": [f"{company} {company_id}" for company, company_id in zip(companies, company_ids)],
+        "tags": [", ".join(tag_pool[i] for i in ids[:n]) for ids, n in zip(tag_ids, tag_counts)],
+        "link": [f"{LINK_HOSTS[host]}{row}" for row, host in enumerate(hosts)],
+        "location": seed_df["location"].to_numpy(dtype=object)[seed_rows],
+        "field": seed_df["field"].to_numpy(dtype=object)[seed_rows],
+        "experience": seed_df["experience"].to_numpy(dtype=object)[seed_rows],
+        "source": np.asarray(SOURCES, dtype=object)[hosts],
+    })
+
+
+def synthetic_ranked(rows, seed_csv=SEED_CSV, seed=0):
+    """synthetic_leads with a relevance_score column, sorted highest first as rank_leads writes them"""
+    df = synthetic_leads(rows, seed_csv, seed)
+    rng = np.random.default_rng(seed + 1)
+    df["relevance_score"] = rng.beta(2, 5, size=rows).astype(np.float32)
+    return df.sort_values("relevance_score", ascending=False, kind="stable").reset_index(drop=True)
+
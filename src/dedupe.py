@@ -0,0 +1,366 @@
+"""
+Near-duplicate lead detection with MinHash and LSH banding
+
+The same posting often appears on several boards with slightly different
+titles ("Sr. Backend Engineer" vs "Senior Backend Engineer"), which the exact
+(title, company) key in scrape_all_websites does not catch. Titles are
+normalized (abbreviations expanded, punctuation dropped), cut into character
+shingles and MinHashed; company names are normalized too (legal suffixes
+dropped). LSH band buckets are keyed on the title's band *and* the company, so
+only postings of the same company whose titles share a band are compared and
+the cost grows roughly linearly with the number of leads instead of
+quadratically. Leads whose links point at the same posting once tracking
+parameters are removed are always merged.
+
+Work is done once per distinct title and vectorized with NumPy, so the full
+historical lead store can be clustered in one pass.
+"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+# Words expanded before shingling so common abbreviations shingle the same way
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "jnr": "junior",
+    "eng": "engineer", "engr": "engineer", "dev": "developer", "devs": "developers",
+    "mgr": "manager", "mgmt": "management", "swe": "software engineer", "sde": "software engineer",
+    "vp": "vice president", "dir": "director", "assoc": "associate", "admin": "administrator",
+    "ml": "machine learning"
+}
+COMPOUNDS = {"front end": "frontend", "back end": "backend", "full stack": "fullstack"}
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "gmbh", "corp", "co", "plc", "limited", "incorporated", "bv", "sa"}
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"ref", "referrer", "source", "src", "from", "fbclid", "gclid", "trk"}
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.9
+SHINGLE_SIZE = 3
+CHUNK_ROWS = 100_000
+
+_EMPTY_SIGNATURE = np.iinfo(np.uint32).max
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_COMPOUND_PATTERN = re.compile(r"\b(" + "|".join(COMPOUNDS) + r")\b")
+
+
+def canonical_link(link):
+    """
+    Reduce a job link to a form shared by every copy of the same posting
+
+    Lowercases the host, drops "www.", the fragment, a trailing slash and
+    tracking parameters (utm_*, ref, ...). Other query parameters are kept
+    because some boards identify the posting with them (Indeed's ?jk=).
+    """
+    if not link or link == "#":
+        return None
+    parts = urlsplit(str(link).strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+def normalize_job_title(title):
+    """Lowercase, drop punctuation and expand abbreviations ("Sr. Back-end Eng" -> "senior backend engineer")"""
+    title = _COMPOUND_PATTERN.sub(lambda m: COMPOUNDS[m.group(1)], _NON_WORD.sub(" ", str(title or "").lower()))
+    return " ".join(ABBREVIATIONS.get(word, word) for word in title.split())
+
+
+def normalize_company(company):
+    """Lowercase and drop punctuation and legal suffixes ("Acme, Inc." -> "acme")"""
+    return " ".join(word for word in _NON_WORD.sub(" ", str(company or "").lower()).split()
+                    if word not in COMPANY_SUFFIXES)
+
+
+def _factorize_normalized(values, normalize):
+    """Codes of the normalized values, normalizing each distinct raw value once"""
+    raw_codes, raw_uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+    codes, uniques = pd.factorize(pd.Series([normalize(value) for value in raw_uniques], dtype=object))
+    if not len(raw_codes):
+        return np.array([], dtype=np.int64), uniques
+    return codes[raw_codes], uniques
+
+
+def _first_positions(codes, count):
+    """Index of the first element carrying each code"""
+    first = np.empty(count, dtype=np.int64)
+    # With repeated indices the last assignment wins, so assign in reverse
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first
+
+
+def _hash_params(num_perm, seed):
+    # Multiply-shift hashing: odd 64-bit multipliers, keep the top 32 bits of a*x + b (mod 2^64)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64, endpoint=True)
+    return a, b
+
+
+def minhash_signatures(texts, num_perm=DEFAULT_NUM_PERM, seed=1):
+    """
+    MinHash signatures over byte-level character shingles
+
+    Args:
+        texts (list): Normalized texts
+        num_perm (int): Signature length (hash functions)
+
+    Returns:
+        tuple: (uint32 array of shape (len(texts), num_perm), bool array marking texts with shingles)
+    """
+    a, b = _hash_params(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), _EMPTY_SIGNATURE, dtype=np.uint32)
+    has_shingles = np.zeros(len(texts), dtype=bool)
+
+    for start in range(0, len(texts), CHUNK_ROWS):
+        encoded = [f" {text} ".encode("utf-8") for text in texts[start:start + CHUNK_ROWS]]
+        lengths = np.fromiter((len(item) for item in encoded), dtype=np.int64, count=len(encoded))
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        row_of_byte = np.repeat(np.arange(len(encoded)), lengths)
+
+        # Shingle codes at every position whose SHINGLE_SIZE bytes lie in one text
+        last = len(buffer) - SHINGLE_SIZE + 1
+        if last <= 0:
+            continue
+        codes = np.zeros(last, dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            codes = (codes << np.uint64(8)) | buffer[offset:offset + last]
+        valid = row_of_byte[:last] == row_of_byte[SHINGLE_SIZE - 1:]
+        codes, rows = codes[valid], row_of_byte[:last][valid]
+        if not len(codes):
+            continue
+
+        # Shingles are grouped by row already (texts were concatenated in order)
+        row_ids, row_starts = np.unique(rows, return_index=True)
+        chunk_signatures = np.empty((len(row_ids), num_perm), dtype=np.uint32)
+        hashed = np.empty(len(codes), dtype=np.uint64)
+        for perm in range(num_perm):
+            np.multiply(codes, a[perm], out=hashed)
+            np.add(hashed, b[perm], out=hashed)
+            np.right_shift(hashed, np.uint64(32), out=hashed)
+            chunk_signatures[:, perm] = np.minimum.reduceat(hashed, row_starts)
+        signatures[start + row_ids] = chunk_signatures
+        has_shingles[start + row_ids] = True
+
+    return signatures, has_shingles
+
+
+def _band_codes(signatures, bands):
+    """Per row and band, a code shared by exactly the rows with identical band values"""
+    rows_per_band = signatures.shape[1] // bands
+    keys = np.empty((len(signatures), bands), dtype=np.uint64)
+    multiplier = np.uint64(1_000_003)
+    with np.errstate(over="ignore"):
+        for band in range(bands):
+            key = np.full(len(signatures), band, dtype=np.uint64)
+            for column in range(band * rows_per_band, (band + 1) * rows_per_band):
+                key = key * multiplier + signatures[:, column].astype(np.uint64)
+            keys[:, band] = key
+    return np.stack([pd.factorize(keys[:, band])[0] for band in range(bands)], axis=1)
+
+
+def _connected_components(count, left, right):
+    """Label every row with the smallest row index in its component (min-label propagation)"""
+    labels = np.arange(count)
+    if not len(left):
+        return labels
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        # Pointer jumping: follow labels until every label is its own root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels[left], labels[right]):
+            return labels
+
+
+def near_duplicate_labels(titles, companies, links=None, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                          bands=DEFAULT_BANDS):
+    """
+    Cluster leads that are near duplicates of each other
+
+    Args:
+        titles (list): Job titles
+        companies (list): Company names
+        links (list): Job links; leads with the same canonical link are always merged
+        threshold (float): Minimum estimated Jaccard similarity of the normalized title
+            shingles for two postings of the same (normalized) company to count as duplicates
+        num_perm (int): MinHash signature length (must be divisible by `bands`)
+        bands (int): LSH bands; more bands find lower-similarity candidates
+
+    Returns:
+        np.ndarray: Cluster label per lead, equal to the index of the cluster's first lead
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    count = len(titles)
+    title_codes, unique_titles = _factorize_normalized(titles, normalize_job_title)
+    company_codes, unique_companies = _factorize_normalized(companies, normalize_company)
+    signatures, has_shingles = minhash_signatures(list(unique_titles), num_perm)
+    band_codes = _band_codes(signatures, bands)
+
+    # Leads with the same normalized title and company collapse onto one item first
+    rows = np.flatnonzero(has_shingles[title_codes]) if count else np.array([], dtype=np.int64)
+    item_codes, _ = pd.factorize(title_codes[rows].astype(np.int64) * len(unique_companies) + company_codes[rows])
+    item_rows = rows[_first_positions(item_codes, item_codes.max() + 1 if len(item_codes) else 0)]
+    left, right = [rows], [item_rows[item_codes]]
+
+    item_titles, item_companies = title_codes[item_rows], company_codes[item_rows]
+    for band in range(bands):
+        # Bucket on (title band, company) and compare each member with the bucket's first member only
+        keys, _ = pd.factorize(band_codes[item_titles, band].astype(np.int64) * len(unique_companies) + item_companies)
+        heads = _first_positions(keys, keys.max() + 1 if len(keys) else 0)[keys]
+        members = np.flatnonzero(heads != np.arange(len(keys)))
+        if not len(members):
+            continue
+        heads = heads[members]
+        similarity = (signatures[item_titles[members]] == signatures[item_titles[heads]]).mean(axis=1)
+        keep = similarity >= threshold
+        left.append(item_rows[members[keep]])
+        right.append(item_rows[heads[keep]])
+
+    if links is not None:
+        canonical = pd.Series([canonical_link(link) for link in links], dtype=object)
+        linked = np.flatnonzero(canonical.notna().to_numpy())
+        codes, uniques = pd.factorize(canonical.iloc[linked])
+        left.append(linked)
+        right.append(linked[_first_positions(codes, len(uniques))[codes]])
+
+    return _connected_components(count, np.concatenate(left), np.concatenate(right))
+
+
+def drop_near_duplicates(jobs, threshold=DEFAULT_THRESHOLD):
+    """
+    Keep the first lead of every near-duplicate cluster
+
+    Args:
+        jobs (list): Lead dicts with title, company and link
+
+    Returns:
+        list: Leads in their original order, without near duplicates
+    """
+    if len(jobs) < 2:
+        return jobs
+    labels = near_duplicate_labels([job["title"] for job in jobs], [job["company"] for job in jobs],
+                                   [job.get("link") for job in jobs], threshold)
+    unique_jobs = [job for row, job in enumerate(jobs) if labels[row] == row]
+    if len(unique_jobs) < len(jobs):
+        print(f"[INFO] Removed {len(jobs) - len(unique_jobs)} near-duplicate leads")
+    return unique_jobs
+
+
+class NearDuplicateFilter:
+    """
+    Streaming counterpart of scrape_all_websites' exact + near-duplicate removal
+
+    Leads arrive in batches and each batch comes back without the leads that
+    duplicate one seen before, in this batch or an earlier one: the same
+    (title, company), the same canonical link, or a near-duplicate title at the
+    same company. Every lead is decided on arrival, so a lead connected to an
+    earlier one only through a later lead is kept, where the batch clustering
+    would merge all three. State grows with the number of distinct leads seen.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.dropped = 0
+        self._exact = set()
+        self._links = set()
+        self._items = set()
+        # (band, band values, normalized company) -> signature of the bucket's first lead
+        self._buckets = {}
+
+    def filter(self, jobs):
+        """
+        Args:
+            jobs (list): Lead dicts with title, company and link
+
+        Returns:
+            list: The leads that duplicate nothing seen so far, in order
+        """
+        if not jobs:
+            return []
+        titles = [normalize_job_title(job["title"]) for job in jobs]
+        signatures, has_shingles = minhash_signatures(titles, self.num_perm)
+        rows_per_band = self.num_perm // self.bands
+
+        kept = []
+        for job, title, signature, shingled in zip(jobs, titles, signatures, has_shingles):
+            exact = (job["title"].lower(), job["company"].lower())
+            if exact in self._exact:
+                self.dropped += 1
+                continue
+            self._exact.add(exact)
+
+            link = canonical_link(job.get("link"))
+            duplicate = link is not None and link in self._links
+            if link is not None:
+                self._links.add(link)
+
+            company = normalize_company(job["company"])
+            if shingled and (title, company) in self._items:
+                duplicate = True
+            elif shingled:
+                self._items.add((title, company))
+                for band in range(self.bands):
+                    key = (band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes(), company)
+                    head = self._buckets.get(key)
+                    if head is None:
+                        self._buckets[key] = signature
+                    elif not duplicate and (signature == head).mean() >= self.threshold:
+                        duplicate = True
+
+            if duplicate:
+                self.dropped += 1
+            else:
+                kept.append(job)
+        return kept
+
+
+def duplicate_clusters(df, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+    """
+    Report near-duplicate clusters in a lead table
+
+    Args:
+        df (pd.DataFrame): Leads with title and company (and optionally link, source)
+
+    Returns:
+        pd.DataFrame: One row per lead that belongs to a cluster of two or more,
+            with `cluster` (index of the cluster's first lead) and `cluster_size`, largest clusters first
+    """
+    links = df["link"].tolist() if "link" in df.columns else None
+    labels = near_duplicate_labels(df["title"].fillna("").tolist(), df["company"].fillna("").tolist(), links,
+                                   threshold, num_perm, bands)
+    sizes = np.bincount(labels, minlength=len(labels))[labels]
+    columns = [column for column in ["title", "company", "link", "source"] if column in df.columns]
+    report = df[columns].reset_index(drop=True).assign(cluster=labels, cluster_size=sizes)
+    report = report[report["cluster_size"] > 1]
+    return report.sort_values(["cluster_size", "cluster"], ascending=[False, True], kind="stable")
+
+
+if __name__ == "__main__":
+    from src.lead_store import load_runs
+
+    leads = load_runs()
+    if leads.empty:
+        print("[WARNING] The lead store is empty.")
+    else:
+        clusters = duplicate_clusters(leads)
+        clusters.to_csv("data/duplicate_clusters.csv", index=False)
+        print(f"[SUCCESS] {clusters['cluster'].nunique()} duplicate clusters covering {len(clusters)} of "
+              f"{len(leads)} stored leads → data/duplicate_clusters.csv")
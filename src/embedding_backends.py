@@ -0,0 +1,253 @@
+"""
+Embedding backends for the ranker
+
+"torch" is the SentenceTransformer model as published. "onnx" runs the same
+transformer exported to ONNX on ONNX Runtime, and "onnx-int8" runs a copy of
+that export with dynamically int8-quantized weights. Both ONNX backends
+reproduce SentenceTransformer's mean pooling and normalization in numpy and
+expose the same encode() call, so the ranker does not care which one it has.
+
+The export needs torch and sentence-transformers once; afterwards the ONNX
+backends only need onnxruntime and transformers' tokenizer.
+
+Usage:
+    python -m src.embedding_backends export
+    python -m src.embedding_backends check --backends onnx onnx-int8
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "torch"
+ONNX_DIR = "data/onnx"
+ONNX_OPSET = 17
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+META_FILE = "export.json"
+
+
+def available_backends():
+    """Backends usable in this environment (ONNX ones may still need a one-off export)"""
+    backends = []
+    if importlib.util.find_spec("sentence_transformers") is not None:
+        backends.append("torch")
+    if importlib.util.find_spec("onnxruntime") is not None and importlib.util.find_spec("transformers") is not None:
+        backends.extend(["onnx", "onnx-int8"])
+    return backends
+
+
+def onnx_model_dir(model_name, onnx_dir=ONNX_DIR):
+    return os.path.join(onnx_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+
+
+def export_onnx(model_name, onnx_dir=ONNX_DIR, quantize=True, opset=ONNX_OPSET):
+    """
+    Export a SentenceTransformer's transformer to ONNX, plus an int8 copy
+
+    Args:
+        model_name (str): SentenceTransformer model to export
+        onnx_dir (str): Parent directory; files go to <onnx_dir>/<model_name>/
+        quantize (bool): Also write the dynamically int8-quantized model
+        opset (int): ONNX opset version
+
+    Returns:
+        str: Directory holding model.onnx, model.int8.onnx, the tokenizer and export.json
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = model[1]
+    if not getattr(pooling, "pooling_mode_mean_tokens", False):
+        raise ValueError(f"{model_name} does not use mean pooling, which the ONNX backends assume")
+
+    output_dir = onnx_model_dir(model_name, onnx_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, FP32_FILE)
+
+    print(f"[INFO] Exporting {model_name} to {fp32_path}")
+    sample = transformer.tokenizer(["export sample title"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    auto_model = transformer.auto_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(auto_model, tuple(sample[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=opset)
+    transformer.tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"[INFO] Quantizing weights to int8 → {INT8_FILE}")
+        quantize_dynamic(fp32_path, os.path.join(output_dir, INT8_FILE), weight_type=QuantType.QInt8)
+
+    meta = {
+        "model": model_name,
+        "dim": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.get_max_seq_length(),
+        "normalize": any(type(module).__name__ == "Normalize" for module in model),
+        "opset": opset
+    }
+    with open(os.path.join(output_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    print(f"[SUCCESS] Exported {model_name} to {output_dir}")
+    return output_dir
+
+
+class OnnxEncoder:
+    """
+    SentenceTransformer-compatible encode() on an ONNX Runtime session
+
+    Args:
+        model_dir (str): Directory written by export_onnx
+        quantized (bool): Load the int8 model instead of the fp32 one
+        threads (int): ONNX Runtime intra-op threads (default: runtime's choice)
+    """
+
+    def __init__(self, model_dir, quantized=False, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.max_seq_length = meta["max_seq_length"]
+        self.normalize = meta["normalize"]
+        self.dim = meta["dim"]
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        model_path = os.path.join(model_dir, INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length,
+                                return_tensors="np")
+        feeds = {}
+        for name in self.input_names:
+            values = tokens.get(name)
+            feeds[name] = (values if values is not None else np.zeros_like(tokens["input_ids"])).astype(np.int64)
+        hidden = self.session.run(["last_hidden_state"], feeds)[0]
+
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.normalize:
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        """Embed one text or a list of texts, like SentenceTransformer.encode"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        # Longest first, like SentenceTransformer, so each batch pads to similar lengths
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[row] for row in rows])
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(backend, model_name, onnx_dir=ONNX_DIR, threads=None):
+    """
+    Load the embedding model for `backend`, exporting it to ONNX first if needed
+
+    Args:
+        backend (str): "torch", "onnx" or "onnx-int8"
+        model_name (str): SentenceTransformer model name
+        onnx_dir (str): Where ONNX exports are kept
+        threads (int): Intra-op threads for the ONNX Runtime session
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    model_dir = onnx_model_dir(model_name, onnx_dir)
+    model_file = INT8_FILE if backend == "onnx-int8" else FP32_FILE
+    if not os.path.exists(os.path.join(model_dir, model_file)):
+        print(f"[INFO] No ONNX export of {model_name} yet, exporting once")
+        export_onnx(model_name, onnx_dir, quantize=backend == "onnx-int8")
+    return OnnxEncoder(model_dir, quantized=backend == "onnx-int8", threads=threads)
+
+
+def rank_correlation(a, b):
+    """Spearman rank correlation of two score arrays (Pearson on average ranks)"""
+    return pd.Series(a).rank().corr(pd.Series(b).rank())
+
+
+def parity_check(csv_path="data/leads_raw.csv", backends=("onnx", "onnx-int8"), baseline=DEFAULT_BACKEND,
+                 top_n=20, min_correlation=0.99):
+    """
+    Compare relevance_score from each backend against the baseline backend
+
+    Titles are scored without the embedding cache so every backend really runs.
+
+    Returns:
+        pd.DataFrame: One row per backend with spearman, top-N overlap, max |diff| and a pass flag
+    """
+    from src import ranker
+    from src.lead_store import load_leads
+
+    titles = load_leads(csv_path)["title"].fillna("").tolist()
+    previous = ranker.EMBEDDING_BACKEND
+    try:
+        ranker.set_backend(baseline)
+        expected = ranker.score_titles(titles)
+        top_expected = set(np.argsort(-expected, kind="stable")[:top_n])
+
+        rows = []
+        for backend in backends:
+            ranker.set_backend(backend)
+            scores = ranker.score_titles(titles)
+            top = set(np.argsort(-scores, kind="stable")[:top_n])
+            spearman = rank_correlation(expected, scores)
+            rows.append({
+                "backend": backend,
+                "spearman": spearman,
+                f"top{top_n}_overlap": len(top & top_expected) / max(len(top_expected), 1),
+                "max_abs_diff": float(np.abs(scores - expected).max()) if len(titles) else 0.0,
+                "passed": bool(spearman >= min_correlation)
+            })
+    finally:
+        ranker.set_backend(previous)
+
+    report = pd.DataFrame(rows)
+    print(f"[INFO] Parity against {baseline} on {len(titles)} titles from {csv_path}:")
+    print(report.to_string(index=False))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the ranker model to ONNX or check backend parity")
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"])
+    parser.add_argument("--csv", default="data/leads_raw.csv")
+    parser.add_argument("--min-correlation", type=float, default=0.99)
+    args = parser.parse_args()
+
+    from src.ranker import MODEL_NAME
+    if args.command == "export":
+        export_onnx(MODEL_NAME)
+    else:
+        result = parity_check(args.csv, args.backends, min_correlation=args.min_correlation)
+        if not result["passed"].all():
+            raise SystemExit("[ERROR] Backend scores diverge from the fp32 baseline")
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Rows the matrix file starts with; it doubles from there up to the cache's capacity
+MIN_ROWS = 1024
+
+
+def normalize_title(title):
+    """Lowercase and collapse whitespace so trivially different titles share one cache entry"""
+    return re.sub(r"\s+", " ", str(title)).strip().lower()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of title embeddings
+
+    Vectors live in a memory-mapped float32 matrix (one row per slot) and a JSON
+    index maps hash(model name + normalized title) to its slot. The matrix file
+    grows as entries are added, up to `capacity` rows; when the cache is full
+    the least recently used entry gives up its slot.
+
+    One writer at a time: the first cache opened on a directory and model takes
+    an exclusive lock on its files (where the platform has fcntl). Another
+    process opening the same cache meanwhile gets a private in-memory cache, as
+    the writer may reuse slots under it, and save() leaves the files alone.
+    Within a process, share one instance between threads (ranker.get_embedding_cache);
+    its methods are thread-safe.
+    """
+
+    def __init__(self, model_name, dim, cache_dir="data/embedding_cache", capacity=200_000):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.matrix_path = os.path.join(cache_dir, f"{slug}.f32")
+        self.index_path = os.path.join(cache_dir, f"{slug}.index.json")
+        self._lock_file = self._acquire_writer_lock(os.path.join(cache_dir, f"{slug}.lock"))
+        self.writable = self._lock_file is not None
+        # Entries kept in memory while another process holds the writer lock
+        self._unsaved = {}
+
+        # key -> slot, ordered from least to most recently used
+        self.index = OrderedDict()
+        if self.writable:
+            self._load_index()
+
+        # Reuse the matrix file whenever it holds whole rows covering every indexed
+        # slot; a missing or damaged one is recreated, with no index entry into it
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        size = os.path.getsize(self.matrix_path) if self.writable and os.path.exists(self.matrix_path) else -1
+        rows = size // row_bytes
+        if size < 0 or size % row_bytes or rows > capacity or (self.index and max(self.index.values()) >= rows):
+            if self.index:
+                print("[WARN] Embedding cache vectors missing, starting fresh")
+                self.index.clear()
+            rows = 0
+            if self.writable:
+                open(self.matrix_path, "wb").close()
+        self._rows = rows
+        self.vectors = self._map(rows)
+        self._free_slots = sorted(set(range(rows)) - set(self.index.values()), reverse=True)
+
+    @staticmethod
+    def _acquire_writer_lock(lock_path):
+        """Open and exclusively lock `lock_path`, or return None if another process holds it"""
+        if not HAS_FCNTL:
+            return open(lock_path, "a")
+        lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            print(f"[WARN] Embedding cache {lock_path} is in use by another process, caching in memory only")
+            return None
+        return lock_file
+
+    def _map(self, rows):
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _grow(self):
+        """Extend the matrix geometrically (at most to capacity) and free the new rows"""
+        rows = min(self.capacity, max(MIN_ROWS, 2 * self._rows))
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        with open(self.matrix_path, "r+b") as f:
+            f.truncate(rows * self.dim * np.dtype(np.float32).itemsize)
+        self._free_slots = list(range(rows - 1, self._rows - 1, -1)) + self._free_slots
+        self._rows = rows
+        self.vectors = self._map(rows)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Embedding cache index unreadable, starting fresh: {e}")
+            return
+
+        if (meta.get("model"), meta.get("dim"), meta.get("capacity")) != (self.model_name, self.dim, self.capacity):
+            print("[WARN] Embedding cache settings changed, starting fresh")
+            return
+        self.index = OrderedDict((key, slot) for key, slot in meta.get("entries", []))
+
+    def _key(self, text):
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, texts):
+        """Return {text: vector} for every normalized text already in the cache"""
+        found = {}
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                vector = self._unsaved.get(key)
+                slot = self.index.get(key)
+                if vector is None and slot is None:
+                    self.misses += 1
+                    continue
+                if slot is not None:
+                    self.index.move_to_end(key)
+                found[text] = np.array(self.vectors[slot] if vector is None else vector)
+                self.hits += 1
+        return found
+
+    def put_many(self, embeddings):
+        """Store {text: vector}, evicting least recently used entries when full"""
+        with self._lock:
+            for text, vector in embeddings.items():
+                key = self._key(text)
+                if not self.writable:
+                    self._unsaved[key] = np.asarray(vector, dtype=np.float32)
+                    continue
+                slot = self.index.get(key)
+                if slot is None:
+                    if not self._free_slots and self._rows < self.capacity:
+                        self._grow()
+                    if self._free_slots:
+                        slot = self._free_slots.pop()
+                    else:
+                        _, slot = self.index.popitem(last=False)
+                self.vectors[slot] = np.asarray(vector, dtype=np.float32)
+                self.index[key] = slot
+                self.index.move_to_end(key)
+
+    def save(self):
+        """Flush vectors and write the index in LRU order (only the writer does)"""
+        with self._lock:
+            if not self.writable:
+                return
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "model": self.model_name,
+                    "dim": self.dim,
+                    "capacity": self.capacity,
+                    "entries": list(self.index.items())
+                }, f)
+            os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        """Save and give up the writer lock, so another process can write the cache; don't use it afterwards"""
+        with self._lock:
+            self.save()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self.writable = False
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.index) + len(self._unsaved),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
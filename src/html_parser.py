@@ -0,0 +1,202 @@
+"""
+Pluggable HTML parsing for the job-board scrapers
+
+Each site is described once as a row selector plus field selectors. Pages are
+parsed with the fastest backend installed: selectolax, then BeautifulSoup on
+lxml, then BeautifulSoup's built-in html.parser. The BeautifulSoup backends
+only build the job-row subtrees (via SoupStrainer) instead of the whole page.
+"""
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.instrumentation import count, span
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Field kinds:
+#   "text"      -> element text, then .strip()               (bs4 `.text.strip()`)
+#   "strip"     -> each text node stripped, then joined       (bs4 `get_text(strip=True)`)
+#   "all_text"  -> list of "text" for every matching element
+#   "all_strip" -> list of "strip" for every matching element
+#   "attr:NAME" -> attribute of the element (selector None = the row itself)
+# Each field is (css selector, kind, value when the element is missing)
+SITE_SPECS = {
+    "remoteok": {
+        "row": ("tr", "job"),
+        "fields": {
+            "title": ("h2", "text", None),
+            "company": ("h3", "text", None),
+            "tags": ("div.tag", "all_text", []),
+            "href": (None, "attr:data-href", None)
+        }
+    },
+    "indeed": {
+        "row": ("div", "job_seen_beacon"),
+        "fields": {
+            "title": ("h2.jobTitle", "strip", "N/A"),
+            "company": ("span.companyName", "strip", "N/A"),
+            "location": ("div.companyLocation", "strip", "Remote"),
+            "href": ("a.jcs-JobTitle", "attr:href", None),
+            "snippet": ("div.job-snippet", "text", "")
+        }
+    },
+    "stackoverflow": {
+        "row": ("div", "-job"),
+        "fields": {
+            "title": ("h2.mb4", "strip", "N/A"),
+            "company": ("h3.mb4", "strip", "N/A"),
+            "href": ("a.s-link", "attr:href", None),
+            "tags": ("a.post-tag", "all_strip", [])
+        }
+    },
+    "angelco": {
+        "row": ("div", "listing"),
+        "fields": {
+            "title": ("h3.title", "strip", "N/A"),
+            "company": ("div.company", "strip", "N/A"),
+            "href": ("a", "attr:href", None),
+            "tags": ("span.tag", "all_strip", [])
+        }
+    },
+    "we_work_remotely": {
+        "row": ("li", "feature"),
+        "fields": {
+            "title": ("span.title", "strip", "N/A"),
+            "company": ("span.company", "strip", "N/A"),
+            "href": ("a", "attr:href", None)
+        }
+    }
+}
+
+def available_backends():
+    """Backends usable in this environment, fastest first"""
+    backends = []
+    if HTMLParser is not None:
+        backends.append("selectolax")
+    if HAS_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def default_backend():
+    return available_backends()[0]
+
+
+def _compile_specs():
+    compiled = {}
+    for site, spec in SITE_SPECS.items():
+        tag, css_class = spec["row"]
+        compiled[site] = {
+            "row_css": f"{tag}.{css_class}",
+            "row_selector": soupsieve.compile(f"{tag}.{css_class}"),
+            # A regex matches one class among several on every bs4 version
+            "strainer": SoupStrainer(tag, class_=re.compile(rf"(?:^|\s){re.escape(css_class)}(?:\s|$)")),
+            "fields": [
+                (name, selector, soupsieve.compile(selector) if selector else None, kind, default)
+                for name, (selector, kind, default) in spec["fields"].items()
+            ]
+        }
+    return compiled
+
+
+# CSS selectors are compiled once per site, not once per row
+_COMPILED_SPECS = _compile_specs()
+
+
+def _soup_text(element, kind):
+    if kind.endswith("strip"):
+        return element.get_text(strip=True)
+    return element.get_text().strip()
+
+
+def _parse_soup(html, spec, backend):
+    rows = []
+    soup = BeautifulSoup(html, backend, parse_only=spec["strainer"])
+    for element in spec["row_selector"].select(soup):
+        row = {}
+        for name, selector, compiled, kind, default in spec["fields"]:
+            if kind.startswith("all_"):
+                matches = compiled.select(element)
+                row[name] = [_soup_text(match, kind) for match in matches] if matches else list(default)
+                continue
+
+            target = element if compiled is None else compiled.select_one(element)
+            if target is None:
+                row[name] = default
+            elif kind.startswith("attr:"):
+                row[name] = target.get(kind[5:], default)
+            else:
+                row[name] = _soup_text(target, kind)
+        rows.append(row)
+    return rows
+
+
+def _selectolax_text(node, kind):
+    if kind.endswith("strip"):
+        return node.text(deep=True, separator="", strip=True)
+    return node.text(deep=True).strip()
+
+
+def _parse_selectolax(html, spec):
+    rows = []
+    tree = HTMLParser(html)
+    for node in tree.css(spec["row_css"]):
+        row = {}
+        for name, selector, _, kind, default in spec["fields"]:
+            if kind.startswith("all_"):
+                matches = node.css(selector)
+                row[name] = [_selectolax_text(match, kind) for match in matches] if matches else list(default)
+                continue
+
+            target = node if selector is None else node.css_first(selector)
+            if target is None:
+                row[name] = default
+            elif kind.startswith("attr:"):
+                value = target.attributes.get(kind[5:])
+                row[name] = default if value is None else value
+            else:
+                row[name] = _selectolax_text(target, kind)
+        rows.append(row)
+    return rows
+
+
+def parse_listings(html, site, backend=None):
+    """
+    Extract the raw job rows of one results page
+
+    Args:
+        html (str): Page HTML
+        site (str): Key into SITE_SPECS
+        backend (str): "selectolax", "lxml" or "html.parser" (default: fastest installed)
+
+    Returns:
+        list: One dict of raw field values per job row on the page
+    """
+    backend = backend or default_backend()
+    if backend not in available_backends():
+        raise ValueError(f"HTML parser backend not available: {backend}")
+
+    spec = _COMPILED_SPECS[site]
+    with span("parse", source=site) as timer:
+        if backend == "selectolax":
+            rows = _parse_selectolax(html, spec)
+        else:
+            rows = _parse_soup(html, spec, backend)
+        timer.add_rows(len(rows))
+    count("rows_parsed", len(rows), source=site)
+    return rows
@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.instrumentation import count, enabled, span
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Take one token and return how many seconds the caller must wait for it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """One token bucket per host, so a slow site never throttles the others"""
+
+    def __init__(self, rate=0.5, burst=2, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.rate:
+            return
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+            delay = bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for it and get the same result (or exception). Nothing is kept
+    once the call returns, so a later call runs again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for the scrapers
+
+    Wraps one requests.Session with enlarged per-host connection pools (so
+    keep-alive connections are reused across threads), a per-host token-bucket
+    rate limit, and retries with jittered exponential backoff on 429/5xx.
+    No wait is longer than `max_backoff` seconds: a server asking (via
+    Retry-After) to come back later than that gets no retry.
+    """
+
+    def __init__(self, headers=None, rate=0.5, burst=2, host_rates=None, pool_connections=16,
+                 pool_maxsize=16, max_retries=3, backoff=1.0, max_backoff=30.0, timeout=10):
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.rate_limiter = HostRateLimiter(rate, burst, host_rates)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt, or None if Retry-After exceeds max_backoff"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after) if float(retry_after) <= self.max_backoff else None
+        return min(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5), self.max_backoff)
+
+    def get(self, url, validators=None, **kwargs):
+        """
+        GET with rate limiting and retries; returns the last response or raises the last error
+
+        Args:
+            validators (ValidatorStore): When given, send a conditional GET and record the
+                response's ETag/Last-Modified (an unchanged page comes back as HTTP 304)
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        if validators is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **validators.headers_for(url)}
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(host)
+            try:
+                # For streamed responses this times the wait for the headers only
+                with span("http_request", source=host):
+                    response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                count("http_retries", source=host)
+                delay = self._retry_delay(attempt)
+                print(f"[WARN] {host}: {e.__class__.__name__}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if enabled() and not kwargs.get("stream"):
+                count("bytes_fetched", len(response.content), source=host)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                if delay is not None:
+                    count("http_retries", source=host)
+                    print(f"[WARN] {host}: HTTP {response.status_code}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                print(f"[WARN] {host}: HTTP {response.status_code}, Retry-After "
+                      f"{response.headers['Retry-After']}s exceeds {self.max_backoff:g}s, giving up")
+            if validators is not None:
+                validators.update(url, response)
+            return response
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Return the process-wide HttpClient shared by all scrapers"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
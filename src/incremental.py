@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.lead_store import STORE_FORMAT
+
+INCREMENTAL_DIR = "data/incremental"
+
+# States whose save() is held back by deferred_saves in the current thread
+_deferred = threading.local()
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read {path}, starting fresh: {e}")
+        return {}
+
+
+def _save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class ValidatorStore:
+    """Remembers ETag / Last-Modified per URL so repeat fetches can be conditional GETs"""
+
+    def __init__(self, path="data/http_validators.json"):
+        self.path = path
+        self.validators = _load_json(path)
+        self._lock = threading.Lock()
+
+    def headers_for(self, url):
+        """Conditional request headers for a URL fetched before"""
+        saved = self.validators.get(url, {})
+        headers = {}
+        if saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+        return headers
+
+    def update(self, url, response):
+        if response.status_code != 200:
+            return
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self.validators[url] = {"etag": etag, "last_modified": last_modified}
+
+    def forget(self, url):
+        """Drop a URL's validators, e.g. when its page could not be parsed, so it is fetched in full next time"""
+        with self._lock:
+            self.validators.pop(url, None)
+
+    def save(self):
+        with self._lock:
+            _save_json(self.path, self.validators)
+
+
+class SeenLeadStore:
+    """
+    Persistent index of leads already scraped, keyed on link (or title + company)
+
+    Each key maps to a fingerprint of the lead's raw fields, so a lead is
+    reported again only when it is new or its title/company/tags changed.
+    """
+
+    def __init__(self, path="data/seen_leads.json"):
+        self.path = path
+        self.fingerprints = _load_json(path)
+        self.new = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(title, company, link):
+        if link and link != "#":
+            return link
+        # Same key scrape_all_websites uses for de-duplication
+        return f"{str(title).lower()}\n{str(company).lower()}"
+
+    @staticmethod
+    def fingerprint(title, company, tags):
+        raw = "\n".join([str(title), str(company)] + [str(tag) for tag in tags])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+    def is_new_or_changed(self, title, company, tags, link):
+        """Record the lead and return True if it was not seen before with the same content"""
+        key = self.key(title, company, link)
+        fingerprint = self.fingerprint(title, company, tags)
+        with self._lock:
+            if self.fingerprints.get(key) == fingerprint:
+                self.skipped += 1
+                return False
+            self.fingerprints[key] = fingerprint
+            self.new += 1
+            return True
+
+    def save(self):
+        with self._lock:
+            _save_json(self.path, self.fingerprints)
+        print(f"[INFO] Incremental scrape: {self.new} new/changed leads, {self.skipped} already seen")
+
+
+def query_scope(keyword, location=None, field=None, experience=None):
+    """Identify a filter combination; incremental state is tracked separately per scope"""
+    return "|".join(str(value or "any").lower() for value in (keyword, location, field, experience))
+
+
+def scope_dir(scope, base_dir=INCREMENTAL_DIR):
+    """Directory holding one scope's incremental state"""
+    return os.path.join(base_dir, hashlib.blake2b(scope.encode("utf-8"), digest_size=8).hexdigest())
+
+
+def scope_ranked_path(scope, base_dir=INCREMENTAL_DIR):
+    """Ranked leads accumulated by a scope's incremental runs"""
+    return os.path.join(scope_dir(scope, base_dir), f"leads_ranked.{STORE_FORMAT}")
+
+
+class IncrementalState:
+    """
+    Seen leads and HTTP validators for one query scope
+
+    State is kept per filter combination: a page that is unchanged since the
+    last "AI / US" scrape may still hold leads never returned for "AI / Europe".
+    """
+
+    def __init__(self, scope, base_dir=INCREMENTAL_DIR):
+        self.scope = scope
+        directory = scope_dir(scope, base_dir)
+        self.seen = SeenLeadStore(os.path.join(directory, "seen_leads.json"))
+        self.validators = ValidatorStore(os.path.join(directory, "http_validators.json"))
+
+    def save(self):
+        """Persist seen leads and validators (held back until the end of an enclosing deferred_saves block)"""
+        pending = getattr(_deferred, "states", None)
+        if pending is not None:
+            pending[self.scope] = self
+            return
+        self.seen.save()
+        self.validators.save()
+
+
+@contextmanager
+def forget_unparsed(validators, *urls):
+    """Drop the validators of `urls` if the block parsing their page raises, so the next run fetches it in full"""
+    try:
+        yield
+    except Exception:
+        if validators is not None:
+            for url in urls:
+                validators.forget(url)
+        raise
+
+
+@contextmanager
+def deferred_saves():
+    """
+    Hold back IncrementalState.save() calls made in this thread until the block succeeds
+
+    Validators are recorded when a page arrives and leads are marked seen when
+    they are classified; if parsing or ranking fails afterwards, saving them
+    would make the next incremental run skip leads that never reached the
+    ranked output. Inside the block saves are collected and written only when
+    the block finishes without an exception.
+    """
+    if getattr(_deferred, "states", None) is not None:
+        # Nested: the outermost block decides
+        yield
+        return
+    _deferred.states = {}
+    try:
+        yield
+        states = list(_deferred.states.values())
+    finally:
+        _deferred.states = None
+    for state in states:
+        state.save()
+
+
+def merge_ranked_leads(new_ranked, previous_ranked):
+    """
+    Fold freshly ranked leads into the previously ranked set
+
+    Leads present in both (same link, or same title + company) take the new row.
+    """
+    if previous_ranked is None or previous_ranked.empty:
+        return new_ranked
+    if new_ranked is None or new_ranked.empty:
+        return previous_ranked
+
+    merged = pd.concat([new_ranked, previous_ranked], ignore_index=True)
+    keys = [
+        SeenLeadStore.key(title, company, link)
+        for title, company, link in zip(merged["title"], merged["company"], merged.get("link", [None] * len(merged)))
+    ]
+    merged = merged[~pd.Series(keys).duplicated().values]
+    merged = merged.sort_values(by="relevance_score", ascending=False).reset_index(drop=True)
+    return merged
@@ -0,0 +1,388 @@
+"""
+Lightweight timing, counters and profiling for the scrape → rank pipeline
+
+Code is instrumented with named spans and counters, optionally per source:
+
+    with span("parse", source="indeed") as s:
+        rows = parse(html)
+        s.add_rows(len(rows))
+    count("bytes_fetched", len(body), source="www.indeed.com")
+
+Nothing is recorded unless a run is active (see recording()). Without one,
+span() hands back a shared no-op object and count() returns after one global
+check, so instrumented code costs next to nothing in normal use.
+
+A run aggregates spans by (name, source): calls, total and max time, rows and
+rows/sec, plus counter totals. Chosen stages can be profiled with cProfile
+(the stage's own thread) or a sampling profiler (every thread, stacks sampled
+every few ms). The run report is plain JSON, saved under data/run_reports/.
+Recording is process-wide: one run is active at a time, which matches the
+job runner executing one pipeline at a time.
+"""
+import cProfile
+import glob
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+REPORT_DIR = "data/run_reports"
+MAX_REPORTS = 100
+PROFILE_TOP_FUNCTIONS = 25
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# LEADS_INSTRUMENT=1 records every pipeline run; LEADS_PROFILE=Ranking,Scraping profiles those stages
+INSTRUMENT_BY_DEFAULT = os.environ.get("LEADS_INSTRUMENT", "") not in ("", "0")
+PROFILE_STAGES = tuple(stage for stage in os.environ.get("LEADS_PROFILE", "").split(",") if stage)
+PROFILE_MODE = os.environ.get("LEADS_PROFILE_MODE", "cprofile")
+
+_active_run = None
+_active_run_lock = threading.Lock()
+
+
+class _NullSpan:
+    """Stands in for a span when no run is recording"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_rows(self, rows):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times one block of code and records it into its run on exit"""
+
+    __slots__ = ("run", "name", "source", "rows", "start", "profiler")
+
+    def __init__(self, run, name, source=None, rows=0):
+        self.run = run
+        self.name = name
+        self.source = source
+        self.rows = rows
+        self.start = None
+        self.profiler = None
+
+    def __enter__(self):
+        self.profiler = self.run._start_profile(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.run._stop_profile(self.name, self.profiler)
+        self.run._record_span(self.name, self.source, elapsed, self.rows, exc_type is not None)
+        return False
+
+    def add_rows(self, rows):
+        """Count rows handled inside the span (for rows/sec)"""
+        self.rows += rows
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack at a fixed interval from a background thread
+
+    Reports, per function, the share of samples in which it was on the stack
+    (cumulative) and at the top of the stack (self).
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.on_stack = Counter()
+        self.on_top = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                self.samples += 1
+                self.on_top[_frame_label(frame)] += 1
+                seen = set()
+                while frame is not None:
+                    label = _frame_label(frame)
+                    if label not in seen:
+                        seen.add(label)
+                        self.on_stack[label] += 1
+                    frame = frame.f_back
+
+    def top(self, limit=PROFILE_TOP_FUNCTIONS):
+        total = max(self.samples, 1)
+        return [
+            {"function": label, "cumulative_share": samples / total, "self_share": self.on_top[label] / total}
+            for label, samples in self.on_stack.most_common(limit)
+        ]
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _top_functions(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    """The slowest functions of a cProfile run, by cumulative time"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {"function": f"{name} ({os.path.basename(filename)}:{line})", "calls": calls,
+         "total_secs": total, "cumulative_secs": cumulative}
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+class RunRecorder:
+    """
+    Spans, counters and stage profiles of one pipeline run
+
+    Args:
+        name (str): What is being run (part of the run id)
+        profile_stages (iterable): Span names to profile whenever they run
+        profile_mode (str): "cprofile" (deterministic, the span's thread only) or
+            "sample" (statistical, all threads, e.g. a site's page-fetch pool)
+        sample_interval (float): Seconds between stack samples in "sample" mode
+    """
+
+    def __init__(self, name="pipeline", profile_stages=(), profile_mode="cprofile",
+                 sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        if profile_mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode '{profile_mode}', expected 'cprofile' or 'sample'")
+        self.name = name
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{name}"
+        self.profile_stages = set(profile_stages)
+        self.profile_mode = profile_mode
+        self.sample_interval = sample_interval
+        self.attributes = {}
+        self.started_at = time.time()
+        self.duration = None
+        self.report_path = None
+        # (name, source) -> [calls, total seconds, max seconds, rows, errors]
+        self._spans = {}
+        # (name, source) -> total
+        self._counters = {}
+        self._profiles = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._cprofile_owner = threading.local()
+
+    def span(self, name, source=None, rows=0):
+        return Span(self, name, source, rows)
+
+    def count(self, name, amount=1, source=None):
+        key = (name, source)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _record_span(self, name, source, elapsed, rows, failed):
+        key = (name, source)
+        with self._lock:
+            stats = self._spans.get(key)
+            if stats is None:
+                stats = self._spans[key] = [0, 0.0, 0.0, 0, 0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3] += rows
+            stats[4] += failed
+
+    def _start_profile(self, name):
+        if name not in self.profile_stages:
+            return None
+        if self.profile_mode == "sample":
+            profiler = SamplingProfiler(self.sample_interval)
+            profiler.start()
+            return profiler
+        # cProfile hooks one thread; a profiled stage nested in another is covered by the outer one
+        if getattr(self._cprofile_owner, "active", False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            print(f"[WARN] Could not profile stage {name}: {e}")
+            return None
+        self._cprofile_owner.active = True
+        return profiler
+
+    def _stop_profile(self, name, profiler):
+        if isinstance(profiler, SamplingProfiler):
+            profiler.stop()
+            top = profiler.top()
+        else:
+            profiler.disable()
+            self._cprofile_owner.active = False
+            top = _top_functions(profiler)
+        with self._lock:
+            self._profiles[name] = {"mode": self.profile_mode, "top": top}
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start
+
+    def report(self):
+        """The run as a JSON-serializable dict"""
+        with self._lock:
+            spans = [
+                {"name": name, "source": source, "calls": calls, "total_secs": total,
+                 "mean_ms": total / calls * 1000, "max_ms": longest * 1000, "rows": rows,
+                 "rows_per_sec": rows / total if rows and total > 0 else None, "errors": errors}
+                for (name, source), (calls, total, longest, rows, errors) in self._spans.items()
+            ]
+            counters = [{"name": name, "source": source, "value": value}
+                        for (name, source), value in self._counters.items()]
+            profiles = dict(self._profiles)
+        spans.sort(key=lambda row: row["total_secs"], reverse=True)
+        counters.sort(key=lambda row: (row["name"], str(row["source"])))
+        duration = self.duration if self.duration is not None else time.perf_counter() - self._start
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_secs": duration,
+            "attributes": self.attributes,
+            "spans": spans,
+            "counters": counters,
+            "profiles": profiles
+        }
+
+    def save(self, report_dir=REPORT_DIR):
+        """Write the JSON report to <report_dir>/<run_id>.json, keeping the newest MAX_REPORTS"""
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        for old in sorted(glob.glob(os.path.join(report_dir, "*.json")))[:-MAX_REPORTS]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        self.report_path = path
+        return path
+
+
+def span(name, source=None, rows=0):
+    """Time a block into the active run (a no-op when nothing is recording)"""
+    run = _active_run
+    if run is None:
+        return _NULL_SPAN
+    return run.span(name, source, rows)
+
+
+def count(name, amount=1, source=None):
+    """Add to a counter of the active run (a no-op when nothing is recording)"""
+    run = _active_run
+    if run is not None:
+        run.count(name, amount, source)
+
+
+def enabled():
+    """Whether a run is recording; guards measurements that cost something to take"""
+    return _active_run is not None
+
+
+def counted_chunks(chunks, name, source=None):
+    """Pass byte chunks through, counting their size into the active run"""
+    for chunk in chunks:
+        count(name, len(chunk), source)
+        yield chunk
+
+
+@contextmanager
+def recording(name="pipeline", profile_stages=None, profile_mode=None, save=True):
+    """
+    Record spans and counters of everything run inside the block
+
+    Args:
+        name (str): Run name, part of the run id
+        profile_stages (iterable): Span names to profile (default: LEADS_PROFILE)
+        profile_mode (str): "cprofile" or "sample" (default: LEADS_PROFILE_MODE)
+        save (bool): Write the JSON report when the block ends
+
+    Yields:
+        RunRecorder: The run; inside an already recording block, that outer run
+    """
+    global _active_run
+    with _active_run_lock:
+        outer = _active_run
+        if outer is None:
+            run = RunRecorder(name, PROFILE_STAGES if profile_stages is None else profile_stages,
+                              profile_mode or PROFILE_MODE)
+            _active_run = run
+    if outer is not None:
+        yield outer
+        return
+
+    try:
+        yield run
+    finally:
+        with _active_run_lock:
+            _active_run = None
+        run.finish()
+        if save:
+            try:
+                path = run.save()
+                print(f"[INFO] Run report saved to {path}")
+            except OSError as e:
+                print(f"[WARN] Could not save run report: {e}")
+
+
+def latest_report(report_dir=REPORT_DIR):
+    """The newest saved run report, or None"""
+    paths = sorted(glob.glob(os.path.join(report_dir, "*.json")))
+    for path in reversed(paths):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def summarize(report, stages=("Scraping", "Ranking", "Indexing")):
+    """
+    Headline numbers of a run report, for the dashboard and logs
+
+    Returns:
+        dict: duration, seconds per stage, totals of the main counters, encode rows/sec
+    """
+    def span_total(name, field):
+        return sum(row[field] or 0 for row in report["spans"] if row["name"] == name)
+
+    def counter_total(name):
+        return sum(row["value"] for row in report["counters"] if row["name"] == name)
+
+    encode_secs = span_total("encode_batch", "total_secs")
+    encode_rows = span_total("encode_batch", "rows")
+    return {
+        "duration_secs": report["duration_secs"],
+        "stages": {stage: span_total(stage, "total_secs") for stage in stages
+                   if any(row["name"] == stage for row in report["spans"])},
+        "bytes_fetched": counter_total("bytes_fetched"),
+        "http_requests": span_total("http_request", "calls"),
+        "rows_parsed": counter_total("rows_parsed"),
+        "rows_dropped": counter_total("rows_dropped"),
+        "encode_rows_per_sec": encode_rows / encode_secs if encode_secs else None
+    }
@@ -0,0 +1,299 @@
+"""
+Background execution of scrape & rank pipelines
+
+Jobs run on worker threads fed from a queue, so the Streamlit script thread
+only submits work and polls progress. A job for a filter combination that is
+already queued or running is not started twice: the caller gets the in-flight
+job back, so several analysts sharing one server also share one scrape.
+"""
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.incremental import deferred_saves, merge_ranked_leads, query_scope, scope_ranked_path
+from src.instrumentation import INSTRUMENT_BY_DEFAULT, recording, span
+from src.lead_store import RANKED_PATH, load_leads, save_leads
+
+# Job states; a job is "in flight" while queued or running
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs kept around for polling before the oldest are dropped
+MAX_FINISHED_JOBS = 50
+
+
+class Job:
+    """One pipeline run: its state, current stage and progress counters"""
+
+    def __init__(self, job_id, key, target, args, kwargs):
+        self.id = job_id
+        self.key = key
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.stage = "Queued"
+        self.counters = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage):
+        with self._lock:
+            self.stage = stage
+
+    def advance(self, counter, amount=1):
+        """Add `amount` to a progress counter (e.g. "pages_fetched", "leads_scored")"""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def in_flight(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def snapshot(self):
+        """Consistent copy of the job's state for display"""
+        with self._lock:
+            return {
+                "id": self.id,
+                "key": self.key,
+                "status": self.status,
+                "stage": self.stage,
+                "counters": dict(self.counters),
+                "error": self.error,
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+class JobRunner:
+    """
+    Queue of pipeline jobs executed by a small pool of worker threads
+
+    Args:
+        max_workers (int): Worker threads. The pipelines write shared output files
+            (leads_raw.csv, the ranked leads), so the default runs one job at a time.
+    """
+
+    def __init__(self, max_workers=1):
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-runner-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key, target, *args, **kwargs):
+        """
+        Queue `target(*args, job=<Job>, **kwargs)` unless a job with the same key is in flight
+
+        Args:
+            key (str): Identity of the work, e.g. the query scope of a scrape
+
+        Returns:
+            Job: The new job, or the already queued/running one for `key`
+        """
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                print(f"[INFO] Joining in-flight job {job.id} for {key}")
+                return job
+            job = Job(next(self._ids), key, target, args, kwargs)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._forget_finished()
+        self._queue.put(job)
+        print(f"[INFO] Queued job {job.id} for {key}")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """All tracked jobs, oldest first"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.in_flight()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with job._lock:
+                job.status = RUNNING
+                job.started_at = time.time()
+            try:
+                result = job.target(*job.args, job=job, **job.kwargs)
+                status, error = DONE, None
+            except Exception as e:
+                print(f"[ERROR] Job {job.id} ({job.key}) failed: {e}")
+                result, status, error = None, FAILED, str(e)
+
+            with self._lock:
+                with job._lock:
+                    job.result = result
+                    job.error = error
+                    job.status = status
+                    job.finished_at = time.time()
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+            self._queue.task_done()
+
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+
+def get_default_runner():
+    """Return the process-wide JobRunner shared by every dashboard session"""
+    global _default_runner
+    if _default_runner is None:
+        with _default_runner_lock:
+            if _default_runner is None:
+                _default_runner = JobRunner()
+    return _default_runner
+
+
+@contextmanager
+def _stage(job, name):
+    """Report a pipeline stage to the job and time it as a span of the same name"""
+    if job is not None:
+        job.set_stage(name)
+    with span(name) as timer:
+        yield timer
+
+
+def scrape_and_rank(keyword=None, location=None, field=None, experience=None, incremental=False, use_cache=True,
+                    instrument=None, job=None):
+    """
+    Scrape RemoteOK for the filters, rank the results and save them to RANKED_PATH
+
+    Args:
+        instrument (bool): Record per-stage timings and counters and save a JSON run report
+            (default: the LEADS_INSTRUMENT environment variable)
+        job (Job): Receives stage changes and pages_fetched / leads_parsed / leads_scored counts
+
+    Returns:
+        dict: "outcome" ("ranked", "unchanged" or "empty"), the number of leads scraped and,
+            when instrumented, "report" (path of the run report)
+    """
+    if instrument is None:
+        instrument = INSTRUMENT_BY_DEFAULT
+    if not instrument:
+        # Incremental state is only saved once the leads have been ranked
+        with deferred_saves():
+            return _scrape_and_rank(keyword, location, field, experience, incremental, use_cache, job)
+
+    with recording("scrape_and_rank") as run:
+        run.attributes.update(scope=query_scope(keyword, location, field, experience), incremental=incremental,
+                              use_cache=use_cache)
+        with deferred_saves():
+            result = _scrape_and_rank(keyword, location, field, experience, incremental, use_cache, job)
+    result["report"] = run.report_path
+    return result
+
+
+def _scrape_and_rank(keyword, location, field, experience, incremental, use_cache, job):
+    # Imported here so the pipeline picks up scraper/ranker reloads made by the app
+    from src.scraper2 import scrape_remoteok_jobs
+    from src.ranker import rank_leads
+
+    progress = job.advance if job is not None else None
+    with _stage(job, "Scraping") as timer:
+        df_scraped = scrape_remoteok_jobs(
+            keyword=keyword,
+            location=location,
+            field=field,
+            experience=experience,
+            incremental=incremental,
+            progress=progress,
+            use_cache=use_cache
+        )
+        timer.add_rows(len(df_scraped))
+    # Incremental runs accumulate their ranked leads per filter combination, never across them
+    scope_ranked = scope_ranked_path(query_scope(keyword, location, field, experience)) if incremental else None
+    if df_scraped.empty:
+        if incremental and os.path.exists(scope_ranked):
+            # Nothing new for these filters; their ranked leads are still current
+            save_leads(load_leads(scope_ranked), RANKED_PATH)
+            return {"outcome": "unchanged", "scraped": 0}
+        return {"outcome": "empty", "scraped": 0}
+
+    with _stage(job, "Ranking") as timer:
+        previous_ranked = None
+        if incremental and os.path.exists(scope_ranked):
+            previous_ranked = load_leads(scope_ranked)
+        # Incremental runs write the merged leads below; the new ones alone must never reach RANKED_PATH
+        df_ranked = rank_leads(leads=df_scraped, progress=progress, output_path=None if incremental else RANKED_PATH)
+        timer.add_rows(len(df_ranked))
+        if incremental:
+            merged = merge_ranked_leads(df_ranked, previous_ranked)
+            save_leads(merged, scope_ranked)
+            save_leads(merged, RANKED_PATH)
+
+    # Indexing embeds each lead's title, company and tags, a second model pass, so it
+    # runs on its own worker rather than holding back the ranked leads
+    submit_index_leads(df_ranked)
+    return {"outcome": "ranked", "scraped": len(df_scraped)}
+
+
+def _index_leads(leads, job=None):
+    from src.lead_index import index_leads
+
+    if job is not None:
+        job.set_stage("Indexing")
+    return {"indexed": index_leads(leads)}
+
+
+_index_runner = None
+_index_runner_lock = threading.Lock()
+_index_job_ids = itertools.count(1)
+
+
+def get_index_runner():
+    """Return the process-wide JobRunner for lead index updates; one worker keeps them in order"""
+    global _index_runner
+    if _index_runner is None:
+        with _index_runner_lock:
+            if _index_runner is None:
+                _index_runner = JobRunner()
+    return _index_runner
+
+
+def submit_index_leads(leads, runner=None):
+    """Queue adding ranked leads to the lead index, off the scrape & rank path"""
+    runner = runner or get_index_runner()
+    # Every batch is its own job: joining an in-flight one would drop these leads
+    return runner.submit(f"lead-index-{next(_index_job_ids)}", _index_leads, leads)
+
+
+def submit_scrape_and_rank(keyword=None, location=None, field=None, experience=None, incremental=False,
+                           use_cache=True, instrument=None, runner=None):
+    """Queue scrape_and_rank on the shared runner, joining an identical in-flight request"""
+    runner = runner or get_default_runner()
+    key = query_scope(keyword, location, field, experience)
+    if incremental:
+        key += "|incremental"
+    elif not use_cache:
+        key += "|fresh"
+    return runner.submit(key, scrape_and_rank, keyword=keyword, location=location, field=field,
+                         experience=experience, incremental=incremental, use_cache=use_cache,
+                         instrument=instrument)
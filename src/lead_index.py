@@ -0,0 +1,397 @@
+"""
+Persistent vector index of stored leads for "find leads like this" queries
+
+Each lead is indexed by the ranker's L2-normalized MiniLM embedding of its
+title, company and tags, so a description naming a company or a stack finds
+it as well as one naming the role. Queries are answered exactly with a float32 dot product over the
+whole matrix (argpartition for the top k), or through an HNSW graph when
+hnswlib is installed and requested. Leads are inserted incrementally as
+scrapes land; a lead seen again (same link, or same title + company)
+replaces its earlier entry.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.incremental import SeenLeadStore
+from src.lead_store import STORE_FORMAT, load_leads, save_leads
+from src.embedding_cache import EmbeddingCache
+from src.ranker import embed_titles, embedding_key, get_keyword_embeddings
+
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+
+LEAD_INDEX_DIR = "data/lead_index"
+
+# Lead fields kept alongside each vector and returned with search results
+INDEXED_COLUMNS = ["title", "company", "tags", "link", "source", "location", "field", "experience", "relevance_score"]
+
+# Lead field parts written before save() rewrites them as one (see LeadIndex.save)
+MAX_LEAD_PARTS = 32
+
+# HNSW build/search parameters (recall vs. speed)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+
+def available_backends():
+    return ["exact", "hnsw"] if HAS_HNSWLIB else ["exact"]
+
+
+def lead_embedding_key():
+    """Embedding key for lead texts, kept apart from the ranker's bare-title embeddings"""
+    return f"{embedding_key()}-lead"
+
+
+def lead_texts(leads):
+    """One "<title> at <company>. <tags>" text per lead row, skipping missing parts"""
+    def column(name):
+        if name not in leads.columns:
+            return [""] * len(leads)
+        return leads[name].fillna("").astype(str).str.strip().tolist()
+
+    texts = []
+    for title, company, tags in zip(column("title"), column("company"), column("tags")):
+        text = f"{title} at {company}" if company else title
+        texts.append(f"{text}. {tags}" if tags else text)
+    return texts
+
+
+class LeadIndex:
+    """
+    Vector index over lead embeddings, stored under `index_dir`
+
+    Args:
+        model_name (str): Embedding model; an index built with another model is discarded
+        dim (int): Embedding size
+        index_dir (str): Directory holding vectors.f32, leads/part-N.<format> and index.json
+        backend (str): "exact" (default) or "hnsw" (requires hnswlib)
+    """
+
+    def __init__(self, model_name, dim, index_dir=LEAD_INDEX_DIR, backend="exact"):
+        if backend not in available_backends():
+            raise ValueError(f"Lead index backend not available: {backend}")
+        self.model_name = model_name
+        self.dim = dim
+        self.index_dir = index_dir
+        self.backend = backend
+        self.vectors_path = os.path.join(index_dir, "vectors.f32")
+        self.leads_dir = os.path.join(index_dir, "leads")
+        self.meta_path = os.path.join(index_dir, "index.json")
+        self.hnsw_path = os.path.join(index_dir, "hnsw.bin")
+
+        self.count = 0
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._leads = []
+        self._positions = {}
+        # Rows [0, _persisted) are on disk; rows in _dirty were replaced since the last save
+        self._persisted = 0
+        self._dirty = set()
+        # Lead field files listed in index.json, oldest first, and the rows they hold in total
+        self._parts = []
+        self._part_rows = 0
+        self._next_part = 0
+        self._hnsw = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return self.count
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta.get("model"), meta.get("dim")) != (self.model_name, self.dim):
+                print("[WARN] Lead index was built with a different model, starting fresh")
+                return
+            vectors = np.fromfile(self.vectors_path, dtype=np.float32).reshape(-1, self.dim)
+            parts = meta.get("parts", [])
+            frames = [load_leads(os.path.join(self.leads_dir, part)) for part in parts]
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Lead index unreadable, starting fresh: {e}")
+            return
+
+        count = meta.get("count", 0)
+        stored = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame({"_row": []})
+        # Later parts hold the replacements of rows written by earlier ones
+        leads = stored.drop_duplicates("_row", keep="last").sort_values("_row")
+        if len(vectors) < count or not np.array_equal(leads["_row"].to_numpy(), np.arange(count)):
+            print("[WARN] Lead index files are inconsistent, starting fresh")
+            return
+        leads = leads.drop(columns="_row")
+        self._parts = parts
+        self._part_rows = len(stored)
+        self._next_part = meta.get("next_part", len(parts))
+
+        self._reserve(count)
+        self._vectors[:count] = vectors[:count]
+        self._leads = leads.astype(object).where(leads.notna(), None).to_dict("records")
+        self._positions = {
+            SeenLeadStore.key(lead["title"], lead["company"], lead.get("link")): row
+            for row, lead in enumerate(self._leads)
+        }
+        self.count = self._persisted = count
+        print(f"[INFO] Loaded lead index with {count} leads")
+
+    def _reserve(self, size):
+        """Grow the vector matrix geometrically so repeated inserts stay amortized O(1)"""
+        if size <= len(self._vectors):
+            return
+        grown = np.zeros((max(size, 2 * len(self._vectors), 1024), self.dim), dtype=np.float32)
+        grown[:self.count] = self._vectors[:self.count]
+        self._vectors = grown
+
+    def add(self, leads, embeddings):
+        """
+        Insert or replace leads
+
+        Args:
+            leads (pd.DataFrame): Leads with at least title and company columns
+            embeddings (np.ndarray): One L2-normalized embedding per lead row
+
+        Returns:
+            int: Number of leads that were not in the index before
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        columns = [column for column in INDEXED_COLUMNS if column in leads.columns]
+        records = leads[columns].astype(object).where(leads[columns].notna(), None).to_dict("records")
+        added = 0
+
+        with self._lock:
+            if self.backend == "hnsw":
+                self._ensure_hnsw()
+            self._reserve(self.count + len(records))
+            changed_rows = []
+            for record, vector in zip(records, embeddings):
+                key = SeenLeadStore.key(record["title"], record["company"], record.get("link"))
+                row = self._positions.get(key)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self._positions[key] = row
+                    self._leads.append(record)
+                    added += 1
+                else:
+                    self._leads[row] = record
+                    if row < self._persisted:
+                        self._dirty.add(row)
+                self._vectors[row] = vector
+                changed_rows.append(row)
+
+            if self._hnsw is not None and changed_rows:
+                self._hnsw_add(changed_rows)
+        return added
+
+    def _hnsw_add(self, rows):
+        if self.count > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(max(self.count, 2 * self._hnsw.get_max_elements()))
+        rows = np.unique(rows)
+        self._hnsw.add_items(self._vectors[rows], rows)
+
+    def _ensure_hnsw(self):
+        if self._hnsw is not None:
+            return
+        hnsw = hnswlib.Index(space="ip", dim=self.dim)
+        if os.path.exists(self.hnsw_path):
+            try:
+                hnsw.load_index(self.hnsw_path, max_elements=max(self.count, 1024))
+                if hnsw.get_current_count() == self.count:
+                    hnsw.set_ef(HNSW_EF_SEARCH)
+                    self._hnsw = hnsw
+                    return
+            except RuntimeError as e:
+                print(f"[WARN] HNSW index unreadable, rebuilding: {e}")
+            hnsw = hnswlib.Index(space="ip", dim=self.dim)
+
+        print(f"[INFO] Building HNSW index over {self.count} leads")
+        hnsw.init_index(max_elements=max(self.count, 1024), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        if self.count:
+            hnsw.add_items(self._vectors[:self.count], np.arange(self.count))
+        hnsw.set_ef(HNSW_EF_SEARCH)
+        self._hnsw = hnsw
+
+    def search(self, query_vector, k=10):
+        """
+        Top-k leads by cosine similarity to an L2-normalized query embedding
+
+        Returns:
+            pd.DataFrame: Lead fields plus a `similarity` column, most similar first
+        """
+        query_vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        with self._lock:
+            k = min(k, self.count)
+            if k == 0:
+                return pd.DataFrame(columns=INDEXED_COLUMNS + ["similarity"])
+
+            if self.backend == "hnsw":
+                self._ensure_hnsw()
+                labels, distances = self._hnsw.knn_query(query_vector, k=k)
+                rows, similarities = labels[0], 1.0 - distances[0]
+            else:
+                scores = self._vectors[:self.count] @ query_vector
+                rows = np.argpartition(-scores, k - 1)[:k] if k < self.count else np.arange(self.count)
+                rows = rows[np.argsort(-scores[rows], kind="stable")]
+                similarities = scores[rows]
+            results = pd.DataFrame([self._leads[row] for row in rows])
+
+        results["similarity"] = np.asarray(similarities, dtype=np.float32)
+        return results
+
+    def save(self):
+        """
+        Write new and replaced leads, then the metadata that makes them visible
+
+        Vectors are written in place. Lead fields go to a new part file holding
+        only the new and replaced rows; once there are MAX_LEAD_PARTS parts, or
+        the parts hold twice the index's rows, they are rewritten as one.
+        """
+        with self._lock:
+            os.makedirs(self.index_dir, exist_ok=True)
+            mode = "r+b" if os.path.exists(self.vectors_path) and self._persisted else "wb"
+            row_bytes = self.dim * 4
+            with open(self.vectors_path, mode) as f:
+                for row in sorted(self._dirty):
+                    f.seek(row * row_bytes)
+                    f.write(self._vectors[row].tobytes())
+                f.seek(self._persisted * row_bytes)
+                f.write(self._vectors[self._persisted:self.count].tobytes())
+                f.truncate()
+
+            rows = sorted(self._dirty) + list(range(self._persisted, self.count))
+            parts = self._parts
+            if len(parts) >= MAX_LEAD_PARTS or self._part_rows + len(rows) > 2 * self.count:
+                rows, parts, self._part_rows = list(range(self.count)), [], 0
+            if rows:
+                part = f"part-{self._next_part:06d}.{STORE_FORMAT}"
+                self._next_part += 1
+                save_leads(pd.DataFrame([self._leads[row] for row in rows]).assign(_row=rows),
+                           os.path.join(self.leads_dir, part))
+                parts = parts + [part]
+                self._part_rows += len(rows)
+
+            if self._hnsw is not None:
+                self._hnsw.save_index(self.hnsw_path)
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": self.dim, "count": self.count,
+                           "parts": parts, "next_part": self._next_part}, f)
+            os.replace(tmp_path, self.meta_path)
+            # Parts replaced by a rewrite are only removed once index.json no longer lists them
+            for stale in set(self._parts) - set(parts):
+                if os.path.exists(os.path.join(self.leads_dir, stale)):
+                    os.remove(os.path.join(self.leads_dir, stale))
+            self._parts = parts
+            self._persisted = self.count
+            self._dirty.clear()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_lead_index(backend=None):
+    """
+    Return the process-wide LeadIndex for the ranker's model and backend
+
+    The index is keyed by lead_embedding_key(), so switching the embedding
+    backend reopens it rather than mixing vectors from different backends.
+
+    Args:
+        backend (str): "exact" or "hnsw"; defaults to exact search
+    """
+    global _default_index
+
+    def stale(index):
+        return (index is None or index.model_name != lead_embedding_key()
+                or (backend and backend != index.backend))
+
+    if stale(_default_index):
+        with _default_index_lock:
+            if stale(_default_index):
+                backend = backend or (_default_index.backend if _default_index is not None else "exact")
+                _default_index = LeadIndex(lead_embedding_key(), get_keyword_embeddings().shape[1],
+                                           backend=backend)
+    return _default_index
+
+
+_lead_cache = None
+_lead_cache_lock = threading.Lock()
+
+
+def get_lead_embedding_cache():
+    """Return the process-wide embedding cache for lead texts, reopened when the embedding key changes"""
+    global _lead_cache
+    if _lead_cache is None or _lead_cache.model_name != lead_embedding_key():
+        with _lead_cache_lock:
+            if _lead_cache is None or _lead_cache.model_name != lead_embedding_key():
+                if _lead_cache is not None:
+                    _lead_cache.close()
+                _lead_cache = EmbeddingCache(lead_embedding_key(), get_keyword_embeddings().shape[1])
+    return _lead_cache
+
+
+def index_leads(leads, index=None):
+    """
+    Embed leads' title, company and tags with the ranker and insert them into the lead index
+
+    The texts have their own embedding cache (see lead_embedding_key), so leads
+    indexed before are not encoded again and the ranker's title cache is untouched.
+    New leads take a model pass of their own, so scrape & rank jobs run this on
+    a background worker (job_runner.submit_index_leads).
+
+    Returns:
+        int: Number of leads new to the index
+    """
+    if leads is None or leads.empty or "title" not in leads.columns:
+        return 0
+    index = index or get_lead_index()
+    cache = get_lead_embedding_cache()
+    embeddings = embed_titles(lead_texts(leads), cache=cache)
+    cache.save()
+    added = index.add(leads, embeddings)
+    index.save()
+    print(f"[INFO] Lead index: {added} new leads, {len(index)} total")
+    return added
+
+
+def search_leads(text, k=10, index=None):
+    """
+    Find the k stored leads most similar to a free-text description
+
+    Args:
+        text (str): Title or company/role description to match
+        k (int): Number of leads to return
+
+    Returns:
+        pd.DataFrame: Lead fields plus `similarity`, most similar first
+    """
+    index = index or get_lead_index()
+    if not len(index):
+        return pd.DataFrame(columns=INDEXED_COLUMNS + ["similarity"])
+    return index.search(embed_titles([text])[0], k)
+
+
+def backfill_from_store(store_dir=None, chunk_size=50_000, index=None):
+    """Index every lead kept in the lead store's scrape runs, one chunk at a time"""
+    from src.lead_store import RAW_STORE_DIR, load_runs
+
+    index = index or get_lead_index()
+    leads = load_runs(store_dir or RAW_STORE_DIR)
+    added = 0
+    for start in range(0, len(leads), chunk_size):
+        added += index_leads(leads.iloc[start:start + chunk_size], index)
+    return added
+
+
+if __name__ == "__main__":
+    backfill_from_store()
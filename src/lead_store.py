@@ -0,0 +1,194 @@
+import glob
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import span
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Low-cardinality columns stored as categoricals
+CATEGORICAL_COLUMNS = ["source", "field", "experience", "location"]
+SCORE_COLUMN = "relevance_score"
+
+# Columnar when pyarrow is installed, CSV otherwise
+STORE_FORMAT = "parquet" if HAS_PYARROW else "csv"
+RAW_STORE_DIR = "data/lead_store/raw"
+RANKED_PATH = f"data/leads_ranked.{STORE_FORMAT}"
+
+
+def to_typed(df):
+    """Apply the lead schema: categorical label columns and float32 scores"""
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    if SCORE_COLUMN in df.columns:
+        df[SCORE_COLUMN] = pd.to_numeric(df[SCORE_COLUMN], errors="coerce").astype(np.float32)
+    return df
+
+
+def save_leads(df, path):
+    """
+    Write leads as Parquet (.parquet), Arrow IPC (.arrow/.feather) or CSV, by extension
+
+    The file is written under a hidden temporary name and moved into place, so a
+    reader polling `path` (the dashboard) sees the old file or the new one, never
+    a partly written one.
+    """
+    directory, name = os.path.split(path)
+    os.makedirs(directory or ".", exist_ok=True)
+    extension = os.path.splitext(path)[1].lower()
+    # Hidden, so partition globs like run=*.* never pick it up
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    with span("save_leads", source=extension.lstrip(".") or "csv", rows=len(df)):
+        try:
+            if extension == ".parquet":
+                to_typed(df).to_parquet(tmp_path, index=False)
+            elif extension in (".arrow", ".feather"):
+                to_typed(df).reset_index(drop=True).to_feather(tmp_path)
+            else:
+                df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def load_leads(path, columns=None):
+    """Read leads written by save_leads, returning them with the typed schema"""
+    extension = os.path.splitext(path)[1].lower()
+    with span("load_leads", source=extension.lstrip(".") or "csv") as timer:
+        if extension == ".parquet":
+            df = pd.read_parquet(path, columns=columns)
+        elif extension in (".arrow", ".feather"):
+            df = pd.read_feather(path, columns=columns)
+        else:
+            df = pd.read_csv(path, usecols=columns)
+        timer.add_rows(len(df))
+    return to_typed(df)
+
+
+def iter_lead_chunks(path, chunk_rows=50_000, columns=None):
+    """
+    Read a lead file in chunks of at most `chunk_rows` rows, without loading it whole
+
+    Supports CSV and Parquet. Chunks keep the file's raw dtypes (to_typed is not applied)
+    so they can be written back out unchanged.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        # pre_buffer reads far ahead of the current batch; with many files open at once
+        # (the streaming ranker's merge) that would cost tens of MB per file
+        for batch in pq.ParquetFile(path, pre_buffer=False).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    if extension in (".arrow", ".feather"):
+        df = pd.read_feather(path, columns=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+
+
+class LeadWriter:
+    """
+    Write a lead file chunk by chunk (CSV, or Parquet row groups), by extension
+
+    Use as a context manager; the file is complete once it is closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = os.path.splitext(path)[1].lower() == ".parquet"
+        self._writer = None
+        self._schema = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, df):
+        if SCORE_COLUMN in df.columns:
+            df = df.assign(**{SCORE_COLUMN: df[SCORE_COLUMN].astype(np.float32)})
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # Later chunks take the first chunk's schema (an all-empty column would otherwise become null-typed)
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def append_run(df, store_dir=RAW_STORE_DIR, run_id=None):
+    """
+    Append one scrape run to the lead store as its own partition file
+
+    Args:
+        df (pd.DataFrame): Leads from this run
+        store_dir (str): Store directory; each run lands in run=<run_id>.<format>
+        run_id (str): Partition name, defaults to a unique id led by the current UTC timestamp
+
+    Returns:
+        str: Path of the written partition
+    """
+    path = run_path(store_dir, run_id)
+    save_leads(df, path)
+    return path
+
+
+def run_path(store_dir=RAW_STORE_DIR, run_id=None):
+    """
+    Partition path for one scrape run
+
+    The default run id is the current UTC time to the millisecond plus a random
+    suffix, so runs started in the same second (or process) never share a file
+    and partitions still sort oldest first.
+    """
+    if run_id is None:
+        now = time.time()
+        run_id = (f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))}{int(now % 1 * 1000):03d}"
+                  f"-{uuid.uuid4().hex[:8]}")
+    return os.path.join(store_dir, f"run={run_id}.{STORE_FORMAT}")
+
+
+def load_runs(store_dir=RAW_STORE_DIR, runs=None, columns=None):
+    """
+    Load partitions written by append_run, oldest first
+
+    Args:
+        runs (list): Only these run ids (default: all)
+        columns (list): Only these columns
+    """
+    paths = sorted(glob.glob(os.path.join(store_dir, "run=*.*")))
+    if runs is not None:
+        wanted = set(runs)
+        paths = [path for path in paths if os.path.basename(path)[4:].rsplit(".", 1)[0] in wanted]
+    if not paths:
+        return pd.DataFrame()
+    return to_typed(pd.concat([load_leads(path, columns) for path in paths], ignore_index=True))
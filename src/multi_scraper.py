@@ -1,145 +1,427 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
 import time
-import random
-from urllib.parse import quote_plus, urljoin
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote_plus
+
+from src.classifier import default_classifier
+from src.dedupe import drop_near_duplicates
+from src.html_parser import parse_listings
+from src.http_client import SingleFlight, get_default_client
+from src.incremental import IncrementalState, forget_unparsed, query_scope
+from src.instrumentation import count, span
+from src.lead_store import append_run
+from src.remoteok_feed import feed_url, fetch_remoteok_listings, iter_feed_listings, page_url
+from src.result_cache import get_default_result_cache
+
+DEFAULT_WEBSITES = ["remoteok", "indeed", "stackoverflow", "angelco", "we_work_remotely"]
+
+# Pagination budget for sites that page their results (Indeed, We Work Remotely)
+DEFAULT_MAX_PAGES = 3
+DEFAULT_PAGE_WORKERS = 4
+# Concurrent page fetches of a multi-keyword scrape
+DEFAULT_FETCH_WORKERS = 16
+
+# Value of the leads' source column per site
+SOURCE_NAMES = {
+    "remoteok": "RemoteOK",
+    "indeed": "Indeed",
+    "stackoverflow": "Stack Overflow",
+    "angelco": "AngelList",
+    "we_work_remotely": "We Work Remotely"
+}
+# Listing links are relative to these
+SITE_ORIGINS = {
+    "remoteok": "https://remoteok.com",
+    "indeed": "https://www.indeed.com",
+    "stackoverflow": "https://stackoverflow.com",
+    "angelco": "https://angel.co",
+    "we_work_remotely": "https://weworkremotely.com"
+}
+# Listings kept from the single-page boards (Stack Overflow, AngelList)
+SINGLE_PAGE_LIMIT = 20
+
+# We Work Remotely has no search; keywords map to a category page
+WE_WORK_REMOTELY_CATEGORIES = {
+    "ai": "programming",
+    "python": "programming",
+    "javascript": "programming",
+    "react": "programming",
+    "nurse": "customer-support",
+    "design": "design",
+    "marketing": "marketing"
+}
+
+
+def we_work_remotely_category(keyword):
+    return WE_WORK_REMOTELY_CATEGORIES.get(keyword.lower(), "programming")
+
+
+def page_urls(website, keyword, location=None, max_pages=DEFAULT_MAX_PAGES):
+    """
+    URLs a site is scraped from for one keyword, in page order
+
+    RemoteOK is read from its JSON feed; Indeed and We Work Remotely are paged
+    (up to `max_pages`); Stack Overflow and AngelList serve a single page.
+    """
+    search_query = quote_plus(keyword)
+    if website == "remoteok":
+        return [feed_url(keyword)]
+    if website == "indeed":
+        location_query = quote_plus(location) if location else "remote"
+        return [
+            f"https://www.indeed.com/jobs?q={search_query}&l={location_query}&sort=date&start={page * 10}"
+            for page in range(max_pages)
+        ]
+    if website == "stackoverflow":
+        return [f"https://stackoverflow.com/jobs?q={search_query}&r=true"]
+    if website == "angelco":
+        return [f"https://angel.co/talent/jobs?keywords={search_query}&remote=true"]
+    if website == "we_work_remotely":
+        base_url = f"https://weworkremotely.com/categories/remote-{we_work_remotely_category(keyword)}-jobs"
+        return [base_url] + [f"{base_url}?page={page}" for page in range(2, max_pages + 1)]
+    raise ValueError(f"Unknown website '{website}'")
+
+
+def listing_rows(website, listings, keyword=None):
+    """
+    Turn a site's parsed listings into raw lead rows: title, company, tags, link and location
+
+    Args:
+        listings (list): parse_listings rows (or RemoteOK feed rows)
+        keyword (str): Search keyword (We Work Remotely tags its leads with it and the category)
+    """
+    origin = SITE_ORIGINS[website]
+    if website in ("stackoverflow", "angelco"):
+        listings = listings[:SINGLE_PAGE_LIMIT]
+    rows = []
+    for listing in listings:
+        try:
+            if website == "remoteok":
+                link = origin + listing["href"]
+            else:
+                link = origin + listing["href"] if listing["href"] else "#"
+            if website == "indeed":
+                # Extract tags from job description
+                tags = [tag.strip() for tag in listing["snippet"].split() if len(tag) > 3]
+            elif website == "we_work_remotely":
+                tags = [keyword, we_work_remotely_category(keyword)]
+            else:
+                tags = listing["tags"]
+            rows.append({"title": listing["title"], "company": listing["company"], "tags": tags, "link": link,
+                         "location": listing["location"] if website == "indeed" else "Remote"})
+        except Exception as e:
+            # One malformed listing (e.g. a RemoteOK row without data-href) must not sink the page
+            print(f"[WARN] {SOURCE_NAMES[website]}: Error processing job: {e}")
+    return rows
+
+
+def page_listings(website, body):
+    """Listings on one fetched page; for RemoteOK either the feed or the HTML page"""
+    if website == "remoteok" and body.lstrip().startswith("["):
+        return list(iter_feed_listings([body.encode("utf-8")]))
+    return parse_listings(body, website)
+
+
+def parse_page(website, body, keyword=None):
+    """Raw lead rows (see listing_rows) on one fetched page"""
+    return listing_rows(website, page_listings(website, body), keyword)
+
+
+def drop_duplicate_jobs(jobs, near_duplicates=True):
+    """
+    Keep the first of every (title, company), then optionally drop near-duplicate postings
+
+    Args:
+        near_duplicates (bool): Also drop near-duplicates (e.g. the same job on two boards
+            with "Sr." vs "Senior" in the title)
+    """
+    unique_jobs = []
+    seen = set()
+
+    for job in jobs:
+        job_key = (job['title'].lower(), job['company'].lower())
+        if job_key not in seen:
+            seen.add(job_key)
+            unique_jobs.append(job)
+
+    if near_duplicates:
+        with span("dedupe", rows=len(unique_jobs)):
+            unique_jobs = drop_near_duplicates(unique_jobs)
+    return unique_jobs
+
+
+def result_cache_params(website, keyword, location=None, max_pages=DEFAULT_MAX_PAGES):
+    """Parameters a site's unfiltered result is cached under"""
+    if website == "indeed":
+        # Indeed is queried with the location itself, so it is part of the cached fetch
+        return keyword, location, max_pages
+    if website == "we_work_remotely":
+        return keyword, max_pages
+    return (keyword,)
+
+
+def _query_filters(query):
+    """(keyword, location, field, experience) for a keyword or a (partial) filter tuple"""
+    if isinstance(query, str):
+        return query, None, None, None
+    return tuple(query) + (None,) * (4 - len(query))
+
 
 class MultiWebsiteScraper:
-    def __init__(self):
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-        
-    def scrape_remoteok(self, keyword, location=None, field=None, experience=None):
-        """Scrape from RemoteOK"""
+    def __init__(self, client=None, incremental=False, result_cache=None, use_cache=True):
+        """
+        Args:
+            client (HttpClient): HTTP client, defaults to the shared one
+            incremental (bool): Send conditional GETs and only return leads that are new
+                or changed since the last scrape of the same filter combination
+            result_cache (ResultCache): Cache of unfiltered per-site results, defaults to the shared one
+            use_cache (bool): Serve repeat scrapes from the result cache (never used when incremental)
+        """
+        self.client = client or get_default_client()
+        self.session = self.client.session
+        self.headers = dict(self.session.headers)
+        self.incremental = incremental
+        self.result_cache = (result_cache or get_default_result_cache()) if use_cache else None
+        self._incremental_states = {}
+        self._state_lock = threading.Lock()
+        # Pages being fetched and parsed by scrape_many, shared by concurrent scrapes
+        self._page_flights = SingleFlight()
+
+    def _get(self, url, state=None, **kwargs):
+        """GET through the shared HTTP client (pooled, rate limited per host, retried)"""
+        validators = state.validators if state is not None else None
+        return self.client.get(url, validators=validators, **kwargs)
+
+    def fetch_page(self, website, url, keyword=None, state=None):
+        """
+        GET one page_urls page; the RemoteOK feed falls back to the keyword's HTML page when unavailable
+
+        Returns:
+            requests.Response
+        """
+        if website != "remoteok":
+            return self._get(url, state=state, timeout=10)
+        try:
+            response = self._get(url, state=state, timeout=10, headers={"Accept": "application/json"})
+            if response.status_code in (200, 304):
+                return response
+            print(f"[WARN] RemoteOK feed returned HTTP {response.status_code}, falling back to HTML")
+        except Exception as e:
+            print(f"[WARN] RemoteOK feed unavailable ({e}), falling back to HTML")
+        return self._get(page_url(keyword), state=state, timeout=10)
+
+    def _incremental_state(self, keyword, location=None, field=None, experience=None):
+        """Seen-lead and validator state for this filter combination (None when not incremental)"""
+        if not self.incremental:
+            return None
+        scope = query_scope(keyword, location, field, experience)
+        with self._state_lock:
+            state = self._incremental_states.get(scope)
+            if state is None:
+                state = IncrementalState(scope)
+                self._incremental_states[scope] = state
+        return state
+
+    def _is_new_lead(self, state, title, company, tags, link):
+        return state is None or state.seen.is_new_or_changed(title, company, tags, link)
+
+    def save_incremental_state(self):
+        """Persist seen leads and HTTP validators gathered by incremental scrapes"""
+        with self._state_lock:
+            states = list(self._incremental_states.values())
+        for state in states:
+            state.save()
+
+    def _caching(self):
+        # Incremental scrapes must reach the network to see what changed
+        return self.result_cache is not None and not self.incremental
+
+    def _cached(self, source, params, fetch, location=None, field=None, experience=None, fetch_location=None):
+        """
+        Serve a site's leads from the result cache, applying the filters to the cached set
+
+        Args:
+            source (str): Site name (selects the TTL)
+            params (tuple): Fetch parameters that identify the unfiltered result
+            fetch (callable): fetch(location, field, experience) scrapes the site
+            fetch_location (str): Location the site itself is queried with (part of `params`)
+
+        On a miss the site is scraped without field/experience filters and the
+        result is cached; empty results are not cached so a failed fetch is retried.
+        """
+        if not self._caching():
+            return fetch(location, field, experience)
+
+        rows = self.result_cache.get(source, *params)
+        if rows is None:
+            rows = fetch(fetch_location, None, None)
+            if rows:
+                self.result_cache.put(source, params, rows)
+        else:
+            count("result_cache_hits", source=source)
+            print(f"[INFO] {source}: {len(rows)} leads served from the result cache")
+        return [job for job in rows if self._apply_filters(job, location, field, experience)]
+
+    def scrape_remoteok(self, keyword, location=None, field=None, experience=None, use_api=True):
+        """Scrape from RemoteOK (JSON feed, with the HTML page as fallback)"""
+        return self._cached("remoteok", result_cache_params("remoteok", keyword),
+                            lambda loc, fld, exp: self._scrape_remoteok(keyword, loc, fld, exp, use_api),
+                            location, field, experience)
+
+    def _scrape_remoteok(self, keyword, location=None, field=None, experience=None, use_api=True):
         print(f"[INFO] Scraping RemoteOK for: {keyword}")
         jobs = []
+        state = self._incremental_state(keyword, location, field, experience)
         
         try:
-            url = f"https://remoteok.com/remote-{keyword}-jobs"
-            response = self.session.get(url, timeout=10)
+            listings = fetch_remoteok_listings(keyword, use_api=use_api, client=self.client,
+                                               validators=state.validators if state else None)
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                for tr in soup.find_all("tr", class_="job"):
-                    try:
-                        title = tr.find("h2").text.strip()
-                        company = tr.find("h3").text.strip()
-                        tags = [tag.text.strip() for tag in tr.find_all("div", class_="tag")]
-                        link = "https://remoteok.com" + tr["data-href"]
-                        
-                        job_data = self._process_job_data(title, company, tags, link, "RemoteOK")
-                        if self._apply_filters(job_data, location, field, experience):
-                            jobs.append(job_data)
-                            
-                    except Exception as e:
-                        print(f"[WARN] RemoteOK: Error processing job: {e}")
-                        continue
-                        
+            if listings is not None:
+                jobs = self.classify_rows("remoteok", listing_rows("remoteok", listings), location, field,
+                                          experience, state)
+
         except Exception as e:
             print(f"[ERROR] RemoteOK scraping failed: {e}")
             
         return jobs
     
-    def scrape_indeed(self, keyword, location=None, field=None, experience=None):
+    def scrape_indeed(self, keyword, location=None, field=None, experience=None,
+                      max_pages=DEFAULT_MAX_PAGES, max_leads=None):
         """Scrape from Indeed"""
+        if not self._caching():
+            return self._scrape_indeed(keyword, location, field, experience, max_pages, max_leads)
+        jobs = self._cached("indeed", result_cache_params("indeed", keyword, location, max_pages),
+                            lambda loc, fld, exp: self._scrape_indeed(keyword, loc, fld, exp, max_pages),
+                            location, field, experience, fetch_location=location)
+        return jobs[:max_leads] if max_leads is not None else jobs
+
+    def _scrape_indeed(self, keyword, location=None, field=None, experience=None,
+                       max_pages=DEFAULT_MAX_PAGES, max_leads=None):
         print(f"[INFO] Scraping Indeed for: {keyword}")
         jobs = []
-        
+
         try:
-            # Indeed search URL
-            search_query = quote_plus(keyword)
-            location_query = quote_plus(location) if location else "remote"
-            url = f"https://www.indeed.com/jobs?q={search_query}&l={location_query}&sort=date"
-            
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Find job cards
-                job_cards = soup.find_all("div", class_="job_seen_beacon")
-                
-                for card in job_cards[:20]:  # Limit to first 20 jobs
-                    try:
-                        title_elem = card.find("h2", class_="jobTitle")
-                        title = title_elem.get_text(strip=True) if title_elem else "N/A"
-                        
-                        company_elem = card.find("span", class_="companyName")
-                        company = company_elem.get_text(strip=True) if company_elem else "N/A"
-                        
-                        location_elem = card.find("div", class_="companyLocation")
-                        job_location = location_elem.get_text(strip=True) if location_elem else "Remote"
-                        
-                        link_elem = card.find("a", class_="jcs-JobTitle")
-                        link = "https://www.indeed.com" + link_elem["href"] if link_elem else "#"
-                        
-                        # Extract tags from job description
-                        tags = []
-                        desc_elem = card.find("div", class_="job-snippet")
-                        if desc_elem:
-                            tags = [tag.strip() for tag in desc_elem.get_text().split() if len(tag) > 3]
-                        
-                        job_data = self._process_job_data(title, company, tags, link, "Indeed", job_location)
-                        if self._apply_filters(job_data, location, field, experience):
-                            jobs.append(job_data)
-                            
-                    except Exception as e:
-                        print(f"[WARN] Indeed: Error processing job: {e}")
-                        continue
-                        
+            jobs = list(self.iter_indeed(keyword, location, field, experience, max_pages, max_leads))
         except Exception as e:
             print(f"[ERROR] Indeed scraping failed: {e}")
-            
+
         return jobs
-    
+
+    def iter_indeed(self, keyword, location=None, field=None, experience=None,
+                    max_pages=DEFAULT_MAX_PAGES, max_leads=None):
+        """Yield Indeed leads page by page, stopping once `max_leads` have been yielded"""
+        urls = page_urls("indeed", keyword, location, max_pages)
+        state = self._incremental_state(keyword, location, field, experience)
+
+        def parse_results(html):
+            return self._parse_indeed_page(html, location, field, experience, state)
+
+        return self._iter_pages("Indeed", urls, parse_results, max_leads, state=state)
+
+    def _parse_indeed_page(self, html, location=None, field=None, experience=None, state=None):
+        rows = parse_page("indeed", html)
+        return self.classify_rows("indeed", rows, location, field, experience, state), len(rows)
+
+    def classify_rows(self, website, rows, location=None, field=None, experience=None, state=None):
+        """
+        Classify a site's raw lead rows and keep those matching the filters
+
+        Args:
+            rows (list): listing_rows output
+            state (IncrementalState): When incremental, rows seen unchanged before are skipped
+
+        Returns:
+            list: Job dicts
+        """
+        source = SOURCE_NAMES[website]
+        jobs = []
+        # One span per page of rows: a span per row would cost more than classifying it
+        with span("classify", source=source, rows=len(rows)):
+            for row in rows:
+                try:
+                    if not self._is_new_lead(state, row["title"], row["company"], row["tags"], row["link"]):
+                        continue
+
+                    job_data = self._process_job_data(row["title"], row["company"], row["tags"], row["link"],
+                                                      source, row["location"])
+                    if self._apply_filters(job_data, location, field, experience):
+                        jobs.append(job_data)
+
+                except Exception as e:
+                    print(f"[WARN] {source}: Error processing job: {e}")
+                    continue
+
+        return jobs
+
+    def _iter_pages(self, source, urls, parse_page, max_leads=None, max_workers=DEFAULT_PAGE_WORKERS, state=None):
+        """
+        Fetch result pages concurrently and yield parsed leads in page order
+
+        Leads from page N are yielded as soon as page N is parsed, while later
+        pages are still downloading. Remaining fetches are cancelled once
+        `max_leads` is reached or a page has no listings (end of results).
+        `parse_page` takes the page HTML and returns (filtered jobs, listings on page).
+        In incremental mode a page unchanged since the last scrape (HTTP 304) is skipped.
+        """
+        def fetch_and_parse(url):
+            response = self._get(url, state=state, timeout=10)
+            if response.status_code == 304:
+                return [], None
+            if response.status_code != 200:
+                print(f"[WARN] {source}: HTTP {response.status_code} for {url}")
+                return [], 0
+            with forget_unparsed(state.validators if state is not None else None, url):
+                return parse_page(response.text)
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)) or 1, thread_name_prefix="pages")
+        futures = [pool.submit(fetch_and_parse, url) for url in urls]
+        yielded = 0
+        # Sites that ignore the page parameter serve the same listings again
+        seen_links = set()
+
+        try:
+            for page_num, future in enumerate(futures, start=1):
+                try:
+                    page_jobs, listing_count = future.result()
+                except Exception as e:
+                    print(f"[WARN] {source}: Page {page_num} failed: {e}")
+                    continue
+                if listing_count == 0:
+                    break
+
+                for job in page_jobs:
+                    if job["link"] != "#" and job["link"] in seen_links:
+                        continue
+                    seen_links.add(job["link"])
+                    yield job
+                    yielded += 1
+                    if max_leads is not None and yielded >= max_leads:
+                        return
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def scrape_stackoverflow(self, keyword, location=None, field=None, experience=None):
         """Scrape from Stack Overflow Jobs"""
+        return self._cached("stackoverflow", result_cache_params("stackoverflow", keyword),
+                            lambda loc, fld, exp: self._scrape_stackoverflow(keyword, loc, fld, exp),
+                            location, field, experience)
+
+    def _scrape_stackoverflow(self, keyword, location=None, field=None, experience=None):
         print(f"[INFO] Scraping Stack Overflow for: {keyword}")
         jobs = []
+        state = self._incremental_state(keyword, location, field, experience)
         
         try:
-            search_query = quote_plus(keyword)
-            url = f"https://stackoverflow.com/jobs?q={search_query}&r=true"
-            
-            response = self.session.get(url, timeout=10)
+            url = page_urls("stackoverflow", keyword)[0]
+            response = self._get(url, state=state, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Find job listings
-                job_listings = soup.find_all("div", class_="-job")
-                
-                for listing in job_listings[:20]:  # Limit to first 20 jobs
-                    try:
-                        title_elem = listing.find("h2", class_="mb4")
-                        title = title_elem.get_text(strip=True) if title_elem else "N/A"
-                        
-                        company_elem = listing.find("h3", class_="mb4")
-                        company = company_elem.get_text(strip=True) if company_elem else "N/A"
-                        
-                        link_elem = listing.find("a", class_="s-link")
-                        link = "https://stackoverflow.com" + link_elem["href"] if link_elem else "#"
-                        
-                        # Extract tags
-                        tags = []
-                        tag_elements = listing.find_all("a", class_="post-tag")
-                        tags = [tag.get_text(strip=True) for tag in tag_elements]
-                        
-                        job_data = self._process_job_data(title, company, tags, link, "Stack Overflow")
-                        if self._apply_filters(job_data, location, field, experience):
-                            jobs.append(job_data)
-                            
-                    except Exception as e:
-                        print(f"[WARN] Stack Overflow: Error processing job: {e}")
-                        continue
-                        
+                with forget_unparsed(state.validators if state is not None else None, url):
+                    rows = parse_page("stackoverflow", response.text)
+                jobs = self.classify_rows("stackoverflow", rows, location, field, experience, state)
+
         except Exception as e:
             print(f"[ERROR] Stack Overflow scraping failed: {e}")
             
@@ -147,150 +429,72 @@ class MultiWebsiteScraper:
     
     def scrape_angelco(self, keyword, location=None, field=None, experience=None):
         """Scrape from AngelList Talent"""
+        return self._cached("angelco", result_cache_params("angelco", keyword),
+                            lambda loc, fld, exp: self._scrape_angelco(keyword, loc, fld, exp),
+                            location, field, experience)
+
+    def _scrape_angelco(self, keyword, location=None, field=None, experience=None):
         print(f"[INFO] Scraping AngelList for: {keyword}")
         jobs = []
+        state = self._incremental_state(keyword, location, field, experience)
         
         try:
-            search_query = quote_plus(keyword)
-            url = f"https://angel.co/talent/jobs?keywords={search_query}&remote=true"
-            
-            response = self.session.get(url, timeout=10)
+            url = page_urls("angelco", keyword)[0]
+            response = self._get(url, state=state, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Find job listings
-                job_listings = soup.find_all("div", class_="listing")
-                
-                for listing in job_listings[:20]:  # Limit to first 20 jobs
-                    try:
-                        title_elem = listing.find("h3", class_="title")
-                        title = title_elem.get_text(strip=True) if title_elem else "N/A"
-                        
-                        company_elem = listing.find("div", class_="company")
-                        company = company_elem.get_text(strip=True) if company_elem else "N/A"
-                        
-                        link_elem = listing.find("a")
-                        link = "https://angel.co" + link_elem["href"] if link_elem else "#"
-                        
-                        # Extract tags
-                        tags = []
-                        tag_elements = listing.find_all("span", class_="tag")
-                        tags = [tag.get_text(strip=True) for tag in tag_elements]
-                        
-                        job_data = self._process_job_data(title, company, tags, link, "AngelList")
-                        if self._apply_filters(job_data, location, field, experience):
-                            jobs.append(job_data)
-                            
-                    except Exception as e:
-                        print(f"[WARN] AngelList: Error processing job: {e}")
-                        continue
-                        
+                with forget_unparsed(state.validators if state is not None else None, url):
+                    rows = parse_page("angelco", response.text)
+                jobs = self.classify_rows("angelco", rows, location, field, experience, state)
+
         except Exception as e:
             print(f"[ERROR] AngelList scraping failed: {e}")
             
         return jobs
     
-    def scrape_we_work_remotely(self, keyword, location=None, field=None, experience=None):
+    def scrape_we_work_remotely(self, keyword, location=None, field=None, experience=None,
+                                max_pages=DEFAULT_MAX_PAGES, max_leads=None):
         """Scrape from We Work Remotely"""
+        if not self._caching():
+            return self._scrape_we_work_remotely(keyword, location, field, experience, max_pages, max_leads)
+        # The whole page budget is cached; max_leads is applied to the filtered result
+        jobs = self._cached("we_work_remotely", result_cache_params("we_work_remotely", keyword, max_pages=max_pages),
+                            lambda loc, fld, exp: self._scrape_we_work_remotely(keyword, loc, fld, exp, max_pages),
+                            location, field, experience)
+        return jobs[:max_leads] if max_leads is not None else jobs
+
+    def _scrape_we_work_remotely(self, keyword, location=None, field=None, experience=None,
+                                 max_pages=DEFAULT_MAX_PAGES, max_leads=None):
         print(f"[INFO] Scraping We Work Remotely for: {keyword}")
         jobs = []
-        
+
         try:
-            # Map keyword to category
-            category_map = {
-                "ai": "programming",
-                "python": "programming", 
-                "javascript": "programming",
-                "react": "programming",
-                "nurse": "customer-support",
-                "design": "design",
-                "marketing": "marketing"
-            }
-            
-            category = category_map.get(keyword.lower(), "programming")
-            url = f"https://weworkremotely.com/categories/remote-{category}-jobs"
-            
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Find job listings
-                job_listings = soup.find_all("li", class_="feature")
-                
-                for listing in job_listings[:20]:  # Limit to first 20 jobs
-                    try:
-                        title_elem = listing.find("span", class_="title")
-                        title = title_elem.get_text(strip=True) if title_elem else "N/A"
-                        
-                        company_elem = listing.find("span", class_="company")
-                        company = company_elem.get_text(strip=True) if company_elem else "N/A"
-                        
-                        link_elem = listing.find("a")
-                        link = "https://weworkremotely.com" + link_elem["href"] if link_elem else "#"
-                        
-                        # Extract tags from title and company
-                        tags = [keyword, category]
-                        
-                        job_data = self._process_job_data(title, company, tags, link, "We Work Remotely")
-                        if self._apply_filters(job_data, location, field, experience):
-                            jobs.append(job_data)
-                            
-                    except Exception as e:
-                        print(f"[WARN] We Work Remotely: Error processing job: {e}")
-                        continue
-                        
+            jobs = list(self.iter_we_work_remotely(keyword, location, field, experience, max_pages, max_leads))
         except Exception as e:
             print(f"[ERROR] We Work Remotely scraping failed: {e}")
-            
+
         return jobs
-    
+
+    def iter_we_work_remotely(self, keyword, location=None, field=None, experience=None,
+                              max_pages=DEFAULT_MAX_PAGES, max_leads=None):
+        """Yield We Work Remotely leads page by page, stopping once `max_leads` have been yielded"""
+        urls = page_urls("we_work_remotely", keyword, max_pages=max_pages)
+        state = self._incremental_state(keyword, location, field, experience)
+
+        def parse_results(html):
+            return self._parse_we_work_remotely_page(html, keyword, location, field, experience, state)
+
+        return self._iter_pages("We Work Remotely", urls, parse_results, max_leads, state=state)
+
+    def _parse_we_work_remotely_page(self, html, keyword, location=None, field=None, experience=None, state=None):
+        rows = parse_page("we_work_remotely", html, keyword)
+        return self.classify_rows("we_work_remotely", rows, location, field, experience, state), len(rows)
+
     def _process_job_data(self, title, company, tags, link, source, location="Remote"):
         """Process and categorize job data"""
-        title_lower = title.lower()
-        tags_lower = [tag.lower() for tag in tags]
-        
-        # Get location from tags or description
-        job_location = location
-        for tag in tags:
-            if any(loc in tag.lower() for loc in ["us", "europe", "worldwide", "remote"]):
-                job_location = tag
-                break
-        
-        # Get experience level from title or tags
-        job_experience = "Not specified"
-        experience_keywords = {
-            "fresher": ["entry", "junior", "fresher", "0-1", "0-2", "intern"],
-            "mid": ["mid", "intermediate", "2-3", "3-4", "2-5"],
-            "senior": ["senior", "lead", "principal", "5+", "6+", "7+", "staff"]
-        }
-        
-        for exp_level, keywords in experience_keywords.items():
-            if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
-                job_experience = exp_level
-                break
-        
-        # Get field from title or tags
-        job_field = "General"
-        field_keywords = {
-            "AI": ["ai", "artificial intelligence", "machine learning", "ml", "deep learning", "neural"],
-            "DS": ["data science", "data scientist", "analytics", "bi"],
-            "ML": ["machine learning", "ml engineer", "mlops", "ai engineer"],
-            "Frontend": ["frontend", "front-end", "react", "vue", "angular", "javascript", "typescript"],
-            "Backend": ["backend", "back-end", "python", "java", "node", "api", "server"],
-            "Nursing": ["nurse", "nursing", "healthcare", "medical", "patient"],
-            "DevOps": ["devops", "sre", "infrastructure", "aws", "azure", "kubernetes"],
-            "Mobile": ["mobile", "ios", "android", "react native", "flutter", "swift"],
-            "Design": ["design", "ui", "ux", "graphic", "visual"],
-            "Marketing": ["marketing", "growth", "seo", "content", "social media"]
-        }
-        
-        for field_name, keywords in field_keywords.items():
-            if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
-                job_field = field_name
-                break
-        
+        # Get location, experience level and field from title or tags
+        job_location, job_experience, job_field = default_classifier.classify(title, tags, location)
+
         return {
             "title": title,
             "company": company,
@@ -304,6 +508,12 @@ class MultiWebsiteScraper:
     
     def _apply_filters(self, job_data, location=None, field=None, experience=None):
         """Apply filters to job data"""
+        if self._matches_filters(job_data, location, field, experience):
+            return True
+        count("rows_dropped", source=job_data["source"])
+        return False
+
+    def _matches_filters(self, job_data, location=None, field=None, experience=None):
         if location and location.lower() != "any":
             if not any(loc in job_data['location'].lower() for loc in [location.lower(), "remote"]):
                 return False
@@ -318,13 +528,21 @@ class MultiWebsiteScraper:
         
         return True
     
-    def scrape_all_websites(self, keyword, location=None, field=None, experience=None, websites=None):
-        """Scrape from multiple websites"""
+    def scrape_all_websites(self, keyword, location=None, field=None, experience=None, websites=None,
+                            concurrent=True, max_workers=None, deadline=60, near_duplicates=True):
+        """
+        Scrape from multiple websites
+
+        Args:
+            concurrent (bool): Fetch all sites in parallel threads instead of one after another
+            max_workers (int): Thread pool size (defaults to one thread per site)
+            deadline (float): Seconds to wait for the whole sweep; slower sites are skipped
+            near_duplicates (bool): Also drop near-duplicate postings (e.g. the same job on two
+                boards with "Sr." vs "Senior" in the title) before they are ranked
+        """
         if websites is None:
-            websites = ["remoteok", "indeed", "stackoverflow", "angelco", "we_work_remotely"]
-        
-        all_jobs = []
-        
+            websites = DEFAULT_WEBSITES
+
         website_scrapers = {
             "remoteok": self.scrape_remoteok,
             "indeed": self.scrape_indeed,
@@ -332,35 +550,253 @@ class MultiWebsiteScraper:
             "angelco": self.scrape_angelco,
             "we_work_remotely": self.scrape_we_work_remotely
         }
-        
+        websites = [website for website in websites if website in website_scrapers]
+
+        if concurrent and len(websites) > 1:
+            results = self._scrape_concurrently(website_scrapers, websites, keyword, location, field,
+                                                experience, max_workers, deadline)
+        else:
+            results = self._scrape_sequentially(website_scrapers, websites, keyword, location, field,
+                                                experience, deadline)
+
+        # Merge in the requested website order so both paths produce the same result
+        all_jobs = []
         for website in websites:
-            if website in website_scrapers:
-                try:
-                    jobs = website_scrapers[website](keyword, location, field, experience)
-                    all_jobs.extend(jobs)
-                    print(f"[SUCCESS] {website}: Found {len(jobs)} jobs")
-                    
-                    # Add delay between requests to be respectful
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    print(f"[ERROR] Failed to scrape {website}: {e}")
-                    continue
-        
-        # Remove duplicates based on title and company
-        unique_jobs = []
-        seen = set()
-        
-        for job in all_jobs:
-            job_key = (job['title'].lower(), job['company'].lower())
-            if job_key not in seen:
-                seen.add(job_key)
-                unique_jobs.append(job)
-        
+            all_jobs.extend(results.get(website, []))
+
+        unique_jobs = drop_duplicate_jobs(all_jobs, near_duplicates)
+
         print(f"[INFO] Total unique jobs found: {len(unique_jobs)}")
+        if self.incremental:
+            self.save_incremental_state()
         return unique_jobs
 
-def scrape_remoteok_jobs(keyword="AI", location=None, field=None, experience=None, websites=None):
+    def _scrape_site(self, scrape, website, keyword, location, field, experience):
+        """One site's scrape, timed as its own span"""
+        with span("scrape_site", source=website) as timer:
+            jobs = scrape(keyword, location, field, experience)
+            timer.add_rows(len(jobs))
+        return jobs
+
+    def _scrape_sequentially(self, website_scrapers, websites, keyword, location, field, experience, deadline):
+        results = {}
+        started = time.monotonic()
+
+        for website in websites:
+            if deadline is not None and time.monotonic() - started > deadline:
+                print(f"[WARN] Deadline of {deadline}s reached, skipping {website}")
+                continue
+            try:
+                jobs = self._scrape_site(website_scrapers[website], website, keyword, location, field, experience)
+                results[website] = jobs
+                print(f"[SUCCESS] {website}: Found {len(jobs)} jobs")
+            except Exception as e:
+                print(f"[ERROR] Failed to scrape {website}: {e}")
+
+        return results
+
+    def _scrape_concurrently(self, website_scrapers, websites, keyword, location, field, experience,
+                             max_workers, deadline):
+        results = {}
+        pool = ThreadPoolExecutor(max_workers=max_workers or len(websites), thread_name_prefix="scraper")
+        futures = {
+            pool.submit(self._scrape_site, website_scrapers[website], website, keyword, location, field,
+                        experience): website
+            for website in websites
+        }
+
+        done, not_done = wait(futures, timeout=deadline)
+        # Don't block on stragglers; their threads finish in the background and are ignored
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            website = futures[future]
+            try:
+                jobs = future.result()
+                results[website] = jobs
+                print(f"[SUCCESS] {website}: Found {len(jobs)} jobs")
+            except Exception as e:
+                print(f"[ERROR] Failed to scrape {website}: {e}")
+
+        for future in not_done:
+            print(f"[WARN] {futures[future]}: No response within {deadline}s deadline, skipping")
+
+        return results
+
+    def scrape_many(self, queries, websites=None, max_pages=DEFAULT_MAX_PAGES, max_workers=DEFAULT_FETCH_WORKERS,
+                    deadline=60, near_duplicates=True):
+        """
+        Scrape many keyword/filter combinations in one sweep, fetching and parsing each page once
+
+        Every (site, URL) the queries need is planned up front and fetched once:
+        most keywords map to the same We Work Remotely category page, and
+        queries differing only in their filters need the same pages. Each page
+        is parsed once and its listings fan out to every query that needs them;
+        a site's classified leads are shared by all filter combinations of a
+        keyword. A page already being fetched by a concurrent scrape_many on
+        this scraper is waited for instead of fetched again.
+
+        Args:
+            queries (list): Keywords, or (keyword, location, field, experience) tuples
+            websites (list): Sites to scrape (default: DEFAULT_WEBSITES)
+            max_pages (int): Pages fetched per paged site
+            max_workers (int): Concurrent page fetches
+            deadline (float): Seconds allowed per site query, as scrape_all_websites allows for one
+                keyword; a site's pages share its rate limit, so the sweep waits up to `deadline`
+                times the site queries of the busiest site. Pages not started by then are skipped
+                (None waits for every page)
+            near_duplicates (bool): Also drop near-duplicate postings, as scrape_all_websites does
+
+        Returns:
+            dict: {query: jobs}, each as scrape_all_websites would return them for that query
+        """
+        websites = [website for website in (websites or DEFAULT_WEBSITES) if website in SOURCE_NAMES]
+        filters = {query: _query_filters(query) for query in queries}
+
+        # One site query per (site, keyword, location the site is queried with, incremental state):
+        # its pages, unfiltered leads and cache entry are shared by every query that maps to it
+        site_queries = {}
+        for keyword, location, field, experience in filters.values():
+            for website in websites:
+                state = self._incremental_state(keyword, location, field, experience)
+                site_query = self._site_query(website, keyword, location, state)
+                site_queries[site_query] = state
+
+        unfiltered = {}
+        plans = {}
+        for site_query in site_queries:
+            website, keyword, location, _ = site_query
+            params = result_cache_params(website, keyword, location, max_pages)
+            rows = self.result_cache.get(website, *params) if self._caching() else None
+            if rows is not None:
+                count("result_cache_hits", source=website)
+                unfiltered[site_query] = rows
+            else:
+                plans[site_query] = page_urls(website, keyword, location, max_pages)
+
+        fetches = {}
+        for site_query, urls in plans.items():
+            website, keyword, _, scope = site_query
+            for url in urls:
+                fetches.setdefault((website, url, scope), (keyword, site_queries[site_query]))
+        planned = sum(len(urls) for urls in plans.values())
+        count("pages_coalesced", planned - len(fetches))
+        print(f"[INFO] Scraping {len(filters)} queries: {planned} pages needed, {len(fetches)} distinct "
+              f"({len(unfiltered)} site queries served from the result cache)")
+        site_counts = {}
+        for website, _, _, _ in plans:
+            site_counts[website] = site_counts.get(website, 0) + 1
+        sweep_deadline = deadline * max(site_counts.values()) if deadline is not None and site_counts else None
+        pages = self._fetch_pages(fetches, max_workers, sweep_deadline)
+
+        for site_query, urls in plans.items():
+            jobs = self._collect_site_query(site_query, urls, pages, site_queries[site_query])
+            unfiltered[site_query] = jobs
+            if self._caching() and jobs:
+                website, keyword, location, _ = site_query
+                self.result_cache.put(website, result_cache_params(website, keyword, location, max_pages), jobs)
+
+        results = {}
+        for query, (keyword, location, field, experience) in filters.items():
+            all_jobs = []
+            for website in websites:
+                state = self._incremental_state(keyword, location, field, experience)
+                for job in unfiltered[self._site_query(website, keyword, location, state)]:
+                    if self._apply_filters(job, location, field, experience):
+                        all_jobs.append(job)
+            results[query] = drop_duplicate_jobs(all_jobs, near_duplicates)
+            print(f"[INFO] {query}: {len(results[query])} unique jobs")
+
+        if self.incremental:
+            self.save_incremental_state()
+        return results
+
+    def _site_query(self, website, keyword, location, state):
+        # Only Indeed's URL depends on the location; incremental scrapes keep their own conditional requests
+        return (website, keyword, location if website == "indeed" else None,
+                state.scope if state is not None else None)
+
+    def _fetch_listings(self, website, url, keyword, state):
+        """A page's listings: None when unchanged since the last scrape, [] when there were none"""
+        response = self.fetch_page(website, url, keyword, state)
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            print(f"[WARN] {SOURCE_NAMES[website]}: HTTP {response.status_code} for {url}")
+            return []
+        # The RemoteOK response may be the HTML page fetch_page fell back to
+        fetched = (url, page_url(keyword)) if website == "remoteok" else (url,)
+        with forget_unparsed(state.validators if state is not None else None, *fetched):
+            return page_listings(website, response.text)
+
+    def _fetch_pages(self, fetches, max_workers, deadline):
+        """
+        Fetch and parse planned pages concurrently
+
+        At the deadline, fetches not yet started are cancelled and those in flight
+        are waited for (each is bounded by the HTTP client's timeout and retries):
+        they record validators, so nothing may outlive the sweep that saves them.
+
+        Args:
+            fetches (dict): {(website, url, scope): (keyword, incremental state)}
+            deadline (float): Seconds before unstarted fetches are cancelled (None for no limit)
+
+        Returns:
+            dict: {(website, url, scope): listings, None (unchanged) or the exception that ended the fetch}
+        """
+        if not fetches:
+            return {}
+
+        def fetch(key, keyword, state):
+            website, url, _ = key
+            with span("fetch_page", source=website):
+                return self._page_flights.do(key, lambda: self._fetch_listings(website, url, keyword, state))
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(fetches)), thread_name_prefix="pages")
+        futures = {pool.submit(fetch, key, keyword, state): key for key, (keyword, state) in fetches.items()}
+        _, not_done = wait(futures, timeout=deadline)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+        pages = {}
+        for future, key in futures.items():
+            if future.cancelled():
+                pages[key] = TimeoutError(f"not fetched within the {deadline:g}s deadline")
+                continue
+            try:
+                pages[key] = future.result()
+            except Exception as e:
+                pages[key] = e
+        skipped = sum(future.cancelled() for future in not_done)
+        if skipped:
+            print(f"[WARN] Deadline of {deadline:g}s reached, {skipped} of {len(futures)} pages skipped")
+        return pages
+
+    def _collect_site_query(self, site_query, urls, pages, state):
+        """A site query's classified, unfiltered leads from its fetched pages, in page order"""
+        website, keyword, _, scope = site_query
+        source = SOURCE_NAMES[website]
+        jobs = []
+        # Sites that ignore the page parameter serve the same listings again
+        seen_links = set()
+        for page_num, url in enumerate(urls, start=1):
+            listings = pages[(website, url, scope)]
+            if isinstance(listings, Exception):
+                print(f"[WARN] {source}: Page {page_num} failed: {listings}")
+                continue
+            if listings is None:
+                continue
+            if not listings:
+                break
+            for job in self.classify_rows(website, listing_rows(website, listings, keyword), state=state):
+                if job["link"] != "#" and job["link"] in seen_links:
+                    continue
+                seen_links.add(job["link"])
+                jobs.append(job)
+        return jobs
+
+
+def scrape_remoteok_jobs(keyword="AI", location=None, field=None, experience=None, websites=None,
+                         concurrent=True, incremental=False, use_cache=True):
     """
     Main function to scrape jobs from multiple websites
     
@@ -370,23 +806,45 @@ def scrape_remoteok_jobs(keyword="AI", location=None, field=None, experience=Non
         field (str): Field filter
         experience (str): Experience level filter
         websites (list): List of websites to scrape from
+        concurrent (bool): Scrape the websites in parallel
+        incremental (bool): Only return leads that are new or changed since the last run
+        use_cache (bool): Serve sites scraped recently from the result cache
     """
-    scraper = MultiWebsiteScraper()
+    scraper = MultiWebsiteScraper(incremental=incremental, use_cache=use_cache)
     
     if websites is None:
-        websites = ["remoteok", "indeed", "stackoverflow", "angelco", "we_work_remotely"]
+        websites = DEFAULT_WEBSITES
     
-    jobs = scraper.scrape_all_websites(keyword, location, field, experience, websites)
+    jobs = scraper.scrape_all_websites(keyword, location, field, experience, websites, concurrent=concurrent)
     
     if jobs:
         df = pd.DataFrame(jobs)
         df.to_csv("data/leads_raw.csv", index=False)
+        append_run(df)
         print(f"[SUCCESS] Scraped {len(df)} jobs from {len(websites)} websites → data/leads_raw.csv")
         return df
     else:
         print("[WARNING] No jobs found.")
         return pd.DataFrame()
 
+def scrape_keywords(queries, websites=None, incremental=False, use_cache=True, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Scrape many keywords (or keyword/filter combinations) at once, each page fetched and parsed once
+
+    Args:
+        queries (list): Keywords, or (keyword, location, field, experience) tuples
+        websites (list): List of websites to scrape from
+        incremental (bool): Only return leads that are new or changed since the last run
+        use_cache (bool): Serve sites scraped recently from the result cache
+        max_pages (int): Pages fetched per paged site
+
+    Returns:
+        dict: {query: pd.DataFrame of its leads}
+    """
+    scraper = MultiWebsiteScraper(incremental=incremental, use_cache=use_cache)
+    results = scraper.scrape_many(queries, websites, max_pages=max_pages)
+    return {query: pd.DataFrame(jobs) for query, jobs in results.items()}
+
 if __name__ == "__main__":
     # Test the scraper
     jobs = scrape_remoteok_jobs("python", websites=["remoteok", "stackoverflow"])
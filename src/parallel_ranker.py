@@ -0,0 +1,130 @@
+"""
+Multi-process ranking for lead files too large to score on one process
+
+The input is read in chunks and the chunks' titles are fanned out to a pool
+of worker processes, each holding one copy of the ranking model. With the
+"fork" start method the parent loads the model once before the pool starts
+and the workers share its weights copy-on-write; with "spawn" every worker
+loads its own copy. Fork is only the default while the parent has not run
+the model yet. Scores come back in input order and each chunk is written
+to the output as soon as it and every chunk before it are done, so only a
+bounded number of chunks is ever held in memory.
+"""
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src import ranker
+from src.lead_store import RANKED_PATH, LeadWriter, iter_lead_chunks
+from src.streaming_ranker import sort_scored_chunks
+
+DEFAULT_CHUNK_ROWS = 20_000
+DEFAULT_THREADS_PER_WORKER = 1
+
+
+def _init_worker(threads, backend):
+    """Pin the worker's inference thread count and make sure its model is loaded"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    # A spawned worker re-imports the ranker, so the parent's backend choice is passed on
+    ranker.set_backend(backend, threads if backend != "torch" else None)
+    ranker.get_model()
+    ranker.get_keyword_embeddings()
+
+
+def _score_chunk(titles, batch_size):
+    # No embedding cache in workers: its memory-mapped file is not safe for concurrent writers
+    return ranker.score_titles(titles, batch_size=batch_size).astype(np.float32)
+
+
+def default_workers(threads_per_worker=DEFAULT_THREADS_PER_WORKER):
+    return max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+
+def iter_scored_chunks(csv_path, workers=None, threads_per_worker=DEFAULT_THREADS_PER_WORKER,
+                       chunk_rows=DEFAULT_CHUNK_ROWS, batch_size=ranker.DEFAULT_BATCH_SIZE, start_method=None):
+    """
+    Score a lead file on a process pool, yielding each chunk with its relevance_score in input order
+
+    Args:
+        csv_path (str): Raw leads file (.csv or .parquet), read in chunks
+        workers (int): Worker processes (default: CPU cores / threads_per_worker)
+        threads_per_worker (int): torch / ONNX Runtime intra-op threads per worker
+        chunk_rows (int): Rows per chunk sent to a worker
+        batch_size (int): Titles per model call inside a worker
+        start_method (str): "fork" (share the parent's model weights copy-on-write) or
+            "spawn" (each worker loads its own model); defaults to fork where available
+            and no inference has run in this process, spawn otherwise
+
+    Yields:
+        pd.DataFrame: Input chunk with a float32 relevance_score column
+    """
+    workers = workers or default_workers(threads_per_worker)
+    if start_method is None:
+        fork_safe = "fork" in multiprocessing.get_all_start_methods() and not ranker.inference_ran()
+        start_method = "fork" if fork_safe else "spawn"
+    if start_method == "fork" and ranker.EMBEDDING_BACKEND == "torch":
+        # Load weights once; workers inherit them. Loading runs no inference, so no
+        # torch thread pool exists yet that a forked child could deadlock on.
+        # ONNX Runtime starts its pool with the session, so ONNX workers load their own.
+        ranker.get_model()
+
+    pending = deque()
+    # Enough chunks in flight to keep every worker busy while the oldest is being written
+    max_in_flight = 2 * workers
+    chunks = iter_lead_chunks(csv_path, chunk_rows)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                             initializer=_init_worker, initargs=(threads_per_worker, ranker.EMBEDDING_BACKEND)) as pool:
+        for chunk in chunks:
+            titles = chunk["title"].fillna("").astype(str).tolist()
+            pending.append((chunk, pool.submit(_score_chunk, titles, batch_size)))
+            if len(pending) >= max_in_flight:
+                done_chunk, future = pending.popleft()
+                yield done_chunk.assign(relevance_score=future.result())
+        while pending:
+            done_chunk, future = pending.popleft()
+            yield done_chunk.assign(relevance_score=future.result())
+
+
+def rank_leads_parallel(csv_path="data/leads_raw.csv", output_path=RANKED_PATH, workers=None,
+                        threads_per_worker=DEFAULT_THREADS_PER_WORKER, chunk_rows=DEFAULT_CHUNK_ROWS,
+                        batch_size=ranker.DEFAULT_BATCH_SIZE, start_method=None, sort=True):
+    """
+    Score a large lead file on all cores and write the scored leads
+
+    With sort=True scored chunks become sorted runs that are merged into
+    `output_path` by relevance_score (see streaming_ranker), so the file is never
+    loaded whole. With sort=False they are appended in input order as they arrive.
+
+    Returns:
+        int: Number of leads scored
+    """
+    workers = workers or default_workers(threads_per_worker)
+    print(f"[INFO] Ranking {csv_path} on {workers} workers x {threads_per_worker} threads")
+    start = time.perf_counter()
+
+    chunks = iter_scored_chunks(csv_path, workers, threads_per_worker, chunk_rows, batch_size, start_method)
+    if sort:
+        rows = sort_scored_chunks(chunks, output_path)
+    else:
+        with LeadWriter(output_path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+                print(f"[INFO] Scored {writer.rows} leads")
+        rows = writer.rows
+
+    elapsed = time.perf_counter() - start
+    print(f"[SUCCESS] Ranked {rows} leads in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec) → {output_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    rank_leads_parallel()
@@ -0,0 +1,488 @@
+"""
+Headless scrape-and-rank pipeline for scheduled runs
+
+    fetch -> parse -> classify + filter -> dedupe -> score -> write
+
+Each stage runs on its own worker threads and hands work to the next through
+a bounded queue. Downloads, parsing and scoring overlap; a slow stage makes
+the ones before it wait instead of letting work pile up, so memory stays flat
+however many pages are scraped. The filters run in the classify stage: they
+are a few string checks per lead, cheaper than another queue hop.
+
+Leads are handled a page at a time as they arrive, so the first copy of a
+duplicate to arrive is the one kept (the batch scrape keeps the first in
+website order), and the result cache, which holds whole-site results, is not
+used. The ranked output is sorted out of core (see streaming_ranker).
+
+Usage:
+    python -m src.pipeline --keyword python --websites remoteok indeed --fetch-workers 16
+"""
+import argparse
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import ranker
+from src.dedupe import NearDuplicateFilter
+from src.incremental import forget_unparsed, query_scope, scope_ranked_path
+from src.instrumentation import count, recording, span
+from src.lead_store import RANKED_PATH, SCORE_COLUMN, STORE_FORMAT, LeadWriter, iter_lead_chunks, run_path
+from src.multi_scraper import DEFAULT_MAX_PAGES, DEFAULT_WEBSITES, MultiWebsiteScraper, page_urls, parse_page
+from src.remoteok_feed import page_url
+from src.streaming_ranker import DEFAULT_CHUNK_ROWS, merge_ranked_files, sort_scored_chunks
+
+DEFAULT_FETCH_WORKERS = 16
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_CLASSIFY_WORKERS = 2
+# Items buffered between two stages
+DEFAULT_QUEUE_SIZE = 16
+# Leads scored together (and written to the raw outputs together)
+SCORE_BATCH_ROWS = 1_000
+# Seconds between checks for an aborted run while blocked on a queue
+POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class _Aborted(Exception):
+    pass
+
+
+class Stage:
+    """
+    One pipeline stage: `workers` threads calling work(item, emit) for each input item
+
+    Args:
+        name (str): Stage name (also the span name its items are timed under)
+        work (callable): work(item, emit) handles one item, calling emit(output) for each result
+        workers (int): Worker threads; stateful stages must use one
+        finish (callable): finish(emit), called once after the last item (e.g. to flush a buffer)
+        skip_errors (bool): An exception skips the item with a warning (e.g. one page that failed
+            to download) instead of failing the whole run
+    """
+
+    def __init__(self, name, work, workers=1, finish=None, skip_errors=False):
+        self.name = name
+        self.work = work
+        self.workers = max(1, workers)
+        self.finish = finish
+        self.skip_errors = skip_errors
+        self.items = 0
+        self.emitted = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+        self._running = self.workers
+
+    def stats(self):
+        """Items in and out, and worker-seconds spent working vs. blocked on a full downstream queue"""
+        with self._lock:
+            return {"stage": self.name, "workers": self.workers, "items": self.items, "emitted": self.emitted,
+                    "failed": self.failed, "busy_seconds": round(max(self.busy - self.blocked, 0.0), 3),
+                    "blocked_seconds": round(self.blocked, 3)}
+
+
+class StagePipeline:
+    """
+    Run stages concurrently, each connected to the next by a queue of `queue_size` items
+
+    Iterate run(items) for the last stage's outputs. Stopping the iteration early
+    aborts the remaining work; so does an error in a stage that doesn't skip
+    errors, which run() then raises.
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._abort = threading.Event()
+        self._error = None
+
+    def _put(self, q, item):
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        raise _Aborted()
+
+    def _get(self, q):
+        while not self._abort.is_set():
+            try:
+                return q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        raise _Aborted()
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._abort.set()
+
+    def _feed(self, items, outbox, consumers):
+        try:
+            for item in items:
+                self._put(outbox, item)
+            for _ in range(consumers):
+                self._put(outbox, _DONE)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(e)
+
+    def _worker(self, stage, inbox, outbox, consumers):
+        def emit(output):
+            start = time.perf_counter()
+            self._put(outbox, output)
+            with stage._lock:
+                stage.blocked += time.perf_counter() - start
+                stage.emitted += 1
+
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                failed = False
+                try:
+                    with span(stage.name, source="pipeline"):
+                        stage.work(item, emit)
+                except _Aborted:
+                    raise
+                except Exception as e:
+                    if not stage.skip_errors:
+                        raise
+                    failed = True
+                    print(f"[WARN] Pipeline {stage.name}: {e}")
+                with stage._lock:
+                    stage.items += 1
+                    stage.failed += failed
+                    stage.busy += time.perf_counter() - start
+
+            with stage._lock:
+                stage._running -= 1
+                last = stage._running == 0
+            # The stage's last worker flushes it and tells every worker downstream that it is done
+            if last:
+                if stage.finish is not None:
+                    stage.finish(emit)
+                for _ in range(consumers):
+                    self._put(outbox, _DONE)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(e)
+
+    def run(self, items):
+        """
+        Args:
+            items (iterable): Inputs of the first stage
+
+        Yields:
+            Outputs of the last stage, as they are produced
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], self.stages[0].workers),
+                                    name="pipeline-feed", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            consumers = self.stages[position + 1].workers if position + 1 < len(self.stages) else 1
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(target=self._worker,
+                                                args=(stage, queues[position], queues[position + 1], consumers),
+                                                name=f"pipeline-{stage.name}-{worker}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                try:
+                    output = self._get(queues[-1])
+                except _Aborted:
+                    break
+                if output is _DONE:
+                    break
+                yield output
+        finally:
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+class _SiteProgress:
+    """First page index at which each paged site ran out of results"""
+
+    def __init__(self):
+        self._last_pages = {}
+        self._lock = threading.Lock()
+
+    def exhausted(self, website, page):
+        with self._lock:
+            return page > self._last_pages.get(website, page)
+
+    def mark_empty(self, website, page):
+        with self._lock:
+            self._last_pages[website] = min(page, self._last_pages.get(website, page))
+
+
+def build_stages(scraper, keyword, location=None, field=None, experience=None, fetch_workers=DEFAULT_FETCH_WORKERS,
+                 parse_workers=DEFAULT_PARSE_WORKERS, classify_workers=DEFAULT_CLASSIFY_WORKERS,
+                 batch_size=ranker.DEFAULT_BATCH_SIZE, score_rows=SCORE_BATCH_ROWS, use_cache=True):
+    """
+    The pipeline's stages for one filter combination
+
+    The first stage takes (website, page index, url) tasks; the last yields
+    scored DataFrames of up to `score_rows` leads. Dedupe and score keep state
+    (seen leads, the embedding cache), so they run on one worker each; the
+    model batches `batch_size` titles per call.
+    """
+    state = scraper._incremental_state(keyword, location, field, experience)
+    progress = _SiteProgress()
+
+    def fetch(task, emit):
+        website, page, url = task
+        # A page past the end of a paged site's results is not worth a request
+        if progress.exhausted(website, page):
+            return
+        response = scraper.fetch_page(website, url, keyword, state)
+        if response.status_code == 304:
+            return
+        if response.status_code != 200:
+            print(f"[WARN] {website}: HTTP {response.status_code} for {url}")
+            progress.mark_empty(website, page)
+            return
+        count("pages_fetched", source=website)
+        emit((website, page, url, response.text))
+
+    def parse(page_body, emit):
+        website, page, url, body = page_body
+        if progress.exhausted(website, page):
+            return
+        fetched = (url, page_url(keyword)) if website == "remoteok" else (url,)
+        with forget_unparsed(state.validators if state is not None else None, *fetched):
+            rows = parse_page(website, body, keyword)
+        if not rows:
+            progress.mark_empty(website, page)
+            return
+        emit((website, rows))
+
+    def classify(site_rows, emit):
+        website, rows = site_rows
+        jobs = scraper.classify_rows(website, rows, location, field, experience, state)
+        if jobs:
+            emit(jobs)
+
+    duplicates = NearDuplicateFilter()
+    pending = []
+
+    def dedupe(jobs, emit):
+        pending.extend(duplicates.filter(jobs))
+        while len(pending) >= score_rows:
+            emit(pending[:score_rows])
+            del pending[:score_rows]
+
+    def flush(emit):
+        if pending:
+            emit(list(pending))
+            pending.clear()
+        print(f"[INFO] Pipeline dedupe: {duplicates.dropped} duplicate leads dropped")
+
+    cache = ranker.get_embedding_cache() if use_cache else None
+
+    def score(jobs, emit):
+        df = pd.DataFrame(jobs)
+        scores = ranker.score_titles(df["title"].fillna("").astype(str).tolist(), batch_size=batch_size, cache=cache)
+        emit(df.assign(**{SCORE_COLUMN: scores.astype(np.float32)}))
+
+    def save_cache(emit):
+        if cache is not None:
+            cache.save()
+
+    return [
+        # A page that fails to download or parse is skipped, as the batch scrapers do; anything
+        # failing later (e.g. the model) fails the run
+        Stage("fetch", fetch, fetch_workers, skip_errors=True),
+        Stage("parse", parse, parse_workers, skip_errors=True),
+        Stage("classify", classify, classify_workers),
+        Stage("dedupe", dedupe, 1, finish=flush),
+        Stage("score", score, 1, finish=save_cache),
+    ]
+
+
+def _grouped(frames, rows):
+    """Concatenate consecutive DataFrames into chunks of at least `rows` rows"""
+    group = []
+    grouped_rows = 0
+    for frame in frames:
+        group.append(frame)
+        grouped_rows += len(frame)
+        if grouped_rows >= rows:
+            yield pd.concat(group, ignore_index=True)
+            group = []
+            grouped_rows = 0
+    if group:
+        yield pd.concat(group, ignore_index=True)
+
+
+def run_pipeline(keyword="AI", location=None, field=None, experience=None, websites=None,
+                 max_pages=DEFAULT_MAX_PAGES, output_path=RANKED_PATH, raw_path="data/leads_raw.csv",
+                 store_run=True, fetch_workers=DEFAULT_FETCH_WORKERS, parse_workers=DEFAULT_PARSE_WORKERS,
+                 classify_workers=DEFAULT_CLASSIFY_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 batch_size=ranker.DEFAULT_BATCH_SIZE, chunk_rows=DEFAULT_CHUNK_ROWS, incremental=False,
+                 use_cache=True, client=None, top_n=20):
+    """
+    Scrape, classify, filter, dedupe, score and write leads as one streaming pass
+
+    Args:
+        keyword, location, field, experience (str): Search keyword and filters, as for scrape_remoteok_jobs
+        websites (list): Sites to scrape (default: DEFAULT_WEBSITES)
+        max_pages (int): Pages fetched per paged site
+        output_path (str): Ranked output (.csv or .parquet)
+        raw_path (str): Raw (unscored) leads, written as they arrive (None to skip)
+        store_run (bool): Also add the raw leads to the lead store as a new run
+        fetch_workers, parse_workers, classify_workers (int): Threads per stage
+        queue_size (int): Items buffered between two stages
+        batch_size (int): Titles per model call
+        chunk_rows (int): Scored rows per sorted run (bounds the writer's memory)
+        incremental (bool): Conditional requests, and only leads new or changed since the last run;
+            they are merged into the leads ranked by earlier incremental runs of the same filters
+        use_cache (bool): Use the embedding cache
+        client (HttpClient): HTTP client, defaults to the shared one
+
+    Returns:
+        dict: "outcome" ("ranked", "unchanged" or "empty", as scrape_and_rank), "scraped" (leads
+            written), "output" (ranked file, None when nothing was found), "top" (the top_n leads)
+            and "stages" (per-stage stats)
+    """
+    websites = [website for website in (websites or DEFAULT_WEBSITES) if website in DEFAULT_WEBSITES]
+    scraper = MultiWebsiteScraper(client=client, incremental=incremental, use_cache=False)
+    tasks = [(website, page, url) for website in websites
+             for page, url in enumerate(page_urls(website, keyword, location, max_pages))]
+    stages = build_stages(scraper, keyword, location, field, experience, fetch_workers, parse_workers,
+                          classify_workers, batch_size, use_cache=use_cache)
+    pipeline = StagePipeline(stages, queue_size)
+    print(f"[INFO] Pipeline: {len(tasks)} pages from {len(websites)} websites for '{keyword}'")
+
+    writers = [LeadWriter(path) for path in (raw_path, run_path() if store_run else None) if path]
+    scraped = 0
+    # Incremental runs only see new or changed leads: sort those on their own, then fold them into
+    # the ranked leads of earlier runs with the same filters
+    scope_ranked = scope_ranked_path(query_scope(keyword, location, field, experience)) if incremental else None
+    sorted_path = os.path.join(os.path.dirname(scope_ranked), f"leads_new.{STORE_FORMAT}") if incremental \
+        else output_path
+
+    def scored_chunks():
+        nonlocal scraped
+        for chunk in _grouped(pipeline.run(tasks), chunk_rows):
+            for writer in writers:
+                writer.write(chunk.drop(columns=[SCORE_COLUMN]))
+            scraped += len(chunk)
+            yield chunk
+
+    start = time.perf_counter()
+    chunks = scored_chunks()
+    try:
+        # The ranked output is only replaced when there are leads
+        first = next(chunks, None)
+        if first is not None:
+            os.makedirs(os.path.dirname(sorted_path) or ".", exist_ok=True)
+            rows = sort_scored_chunks(itertools.chain([first], chunks), sorted_path)
+            print(f"[SUCCESS] Ranked {rows} leads in {time.perf_counter() - start:.1f}s → {sorted_path}")
+            if incremental:
+                if os.path.exists(scope_ranked):
+                    rows = merge_ranked_files(sorted_path, scope_ranked, scope_ranked)
+                    os.remove(sorted_path)
+                else:
+                    os.replace(sorted_path, scope_ranked)
+                _copy_leads(scope_ranked, output_path)
+                print(f"[SUCCESS] {rows} ranked leads for these filters → {output_path}")
+    finally:
+        chunks.close()
+        for writer in writers:
+            writer.close()
+
+    stats = [stage.stats() for stage in stages]
+    for stage in stats:
+        print(f"[INFO] Pipeline {stage['stage']}: {stage['workers']} workers, {stage['items']} in, "
+              f"{stage['emitted']} out, {stage['failed']} failed, busy {stage['busy_seconds']:.1f}s, "
+              f"blocked downstream {stage['blocked_seconds']:.1f}s")
+    if incremental:
+        scraper.save_incremental_state()
+
+    if scraped:
+        outcome = "ranked"
+    elif incremental and os.path.exists(scope_ranked):
+        # Nothing new for these filters; their ranked leads are still current
+        _copy_leads(scope_ranked, output_path)
+        print(f"[INFO] No new or changed leads; ranked leads for these filters → {output_path}")
+        outcome = "unchanged"
+    else:
+        print("[WARNING] No jobs found.")
+        return {"outcome": "empty", "scraped": 0, "output": None, "top": pd.DataFrame(), "stages": stats}
+
+    head = next(iter_lead_chunks(output_path, top_n), pd.DataFrame()).reset_index(drop=True)
+    print(f"[INFO] Top {top_n} Leads:")
+    print(head[[column for column in ("title", "company", SCORE_COLUMN) if column in head.columns]])
+    return {"outcome": outcome, "scraped": scraped, "output": output_path, "top": head, "stages": stats}
+
+
+def _copy_leads(source_path, output_path):
+    """Copy a lead file chunk by chunk, converting between formats by extension"""
+    tmp_path = output_path + ".tmp" + os.path.splitext(output_path)[1]
+    with LeadWriter(tmp_path) as writer:
+        for chunk in iter_lead_chunks(source_path, DEFAULT_CHUNK_ROWS):
+            writer.write(chunk)
+    os.replace(tmp_path, output_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape and rank leads as a streaming pipeline")
+    parser.add_argument("--keyword", default="AI")
+    parser.add_argument("--location")
+    parser.add_argument("--field")
+    parser.add_argument("--experience")
+    parser.add_argument("--websites", nargs="+", choices=DEFAULT_WEBSITES, default=DEFAULT_WEBSITES)
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES)
+    parser.add_argument("--output", default=RANKED_PATH, help="Ranked leads (.csv or .parquet)")
+    parser.add_argument("--raw-output", default="data/leads_raw.csv", help="Raw leads ('' to skip)")
+    parser.add_argument("--no-store", action="store_true", help="Don't add the leads to the lead store")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS)
+    parser.add_argument("--classify-workers", type=int, default=DEFAULT_CLASSIFY_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=ranker.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the embedding cache")
+    parser.add_argument("--instrument", action="store_true", help="Save a JSON run report")
+    args = parser.parse_args(argv)
+
+    def run():
+        return run_pipeline(args.keyword, args.location, args.field, args.experience, args.websites,
+                            args.max_pages, args.output, args.raw_output or None, not args.no_store,
+                            args.fetch_workers, args.parse_workers, args.classify_workers, args.queue_size,
+                            args.batch_size, args.chunk_rows, args.incremental, not args.no_cache)
+
+    try:
+        if args.instrument:
+            with recording("pipeline"):
+                run()
+        else:
+            run()
+    except Exception as e:
+        print(f"[ERROR] Pipeline failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,18 @@
-from sentence_transformers import SentenceTransformer, util
+import os
+import threading
+
 import pandas as pd
 import numpy as np
 
-# Load Sentence-BERT model once globally
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from src.embedding_backends import BACKENDS, DEFAULT_BACKEND, load_encoder
+from src.embedding_cache import EmbeddingCache, normalize_title
+from src.instrumentation import span
+from src.lead_store import RANKED_PATH, load_leads, save_leads
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# "torch", "onnx" or "onnx-int8" (see src/embedding_backends.py); set RANKER_BACKEND or call set_backend()
+EMBEDDING_BACKEND = os.environ.get("RANKER_BACKEND", DEFAULT_BACKEND)
 
 # Define high-priority role/context keywords
 important_keywords = [
@@ -12,38 +21,310 @@ important_keywords = [
     "decision maker", "venture", "startup", "ceo"
 ]
 
-# Pre-encode keywords once for efficiency
-keyword_embeddings = model.encode(important_keywords)
+# Keyword embeddings are persisted here (one file per backend) so they are only encoded once per keyword list
+KEYWORD_EMBEDDINGS_DIR = "data/embedding_cache"
+
+# Default number of titles sent to the model per encode call
+DEFAULT_BATCH_SIZE = 256
+
+# The Sentence-BERT model and keyword embeddings are loaded on first use, not at import
+_model = None
+_keyword_embeddings = None
+_backend_threads = None
+_load_lock = threading.Lock()
+_warm_up_thread = None
+# Set once the model has encoded anything here: its thread pools then exist, and a
+# forked child could deadlock on locks they held at fork time
+_inference_ran = False
+
+
+def embedding_key():
+    """Model name qualified by the backend, so caches never mix vectors from different backends"""
+    return MODEL_NAME if EMBEDDING_BACKEND == "torch" else f"{MODEL_NAME}-{EMBEDDING_BACKEND}"
+
+
+def set_backend(backend, threads=None):
+    """
+    Switch the embedding backend; the model and keyword embeddings reload on next use
+
+    Args:
+        backend (str): "torch", "onnx" or "onnx-int8"
+        threads (int): Intra-op threads for the ONNX Runtime backends
+    """
+    global EMBEDDING_BACKEND, _backend_threads, _model, _keyword_embeddings
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+    with _load_lock:
+        if (backend, threads) != (EMBEDDING_BACKEND, _backend_threads):
+            EMBEDDING_BACKEND = backend
+            _backend_threads = threads
+            _model = None
+            _keyword_embeddings = None
+
+
+def get_model():
+    """Return the process-wide embedding model for EMBEDDING_BACKEND, loading it on first call"""
+    global _model
+    if _model is None:
+        with _load_lock:
+            if _model is None:
+                print(f"[INFO] Loading embedding model: {MODEL_NAME} ({EMBEDDING_BACKEND})")
+                _model = load_encoder(EMBEDDING_BACKEND, MODEL_NAME, threads=_backend_threads)
+    return _model
+
+
+def inference_ran():
+    """True once the model has encoded text in this process, after which forking is unsafe"""
+    return _inference_ran
+
+
+def _encode(model, texts, **kwargs):
+    global _inference_ran
+    _inference_ran = True
+    return model.encode(texts, convert_to_numpy=True, **kwargs)
 
-def rank_leads(csv_path="data/leads_raw.csv", top_n=20):
+
+def get_keyword_embeddings():
+    """Return embeddings for important_keywords, reusing the persisted copy when it matches"""
+    global _keyword_embeddings
+    if _keyword_embeddings is None:
+        with _load_lock:
+            if _keyword_embeddings is None:
+                _keyword_embeddings = _load_keyword_embeddings()
+    if _keyword_embeddings is None:
+        embeddings = _encode(get_model(), important_keywords)
+        _save_keyword_embeddings(embeddings)
+        _keyword_embeddings = embeddings
+    return _keyword_embeddings
+
+
+def _keyword_embeddings_path():
+    return os.path.join(KEYWORD_EMBEDDINGS_DIR, f"keywords_{embedding_key()}.npz")
+
+
+def _load_keyword_embeddings():
+    path = _keyword_embeddings_path()
+    if not os.path.exists(path):
+        return None
     try:
-        df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        print(f"[ERROR] File not found: {csv_path}")
-        return pd.DataFrame()
+        with np.load(path, allow_pickle=False) as saved:
+            if saved["keywords"].tolist() != important_keywords:
+                return None
+            return saved["embeddings"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Could not load keyword embeddings: {e}")
+        return None
+
+
+def _save_keyword_embeddings(embeddings):
+    path = _keyword_embeddings_path()
+    try:
+        os.makedirs(KEYWORD_EMBEDDINGS_DIR, exist_ok=True)
+        # Written atomically: parallel ranking workers may save at the same time
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keywords=np.array(important_keywords), embeddings=embeddings)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not save keyword embeddings: {e}")
+
+
+def warm_up(background=True):
+    """
+    Load the model and keyword embeddings ahead of the first ranking call
+
+    Args:
+        background (bool): Load in a daemon thread and return immediately
+    """
+    global _warm_up_thread
+
+    def _load():
+        get_model()
+        get_keyword_embeddings()
+
+    if not background:
+        _load()
+        return None
+    if _warm_up_thread is None:
+        _warm_up_thread = threading.Thread(target=_load, name="ranker-warm-up", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
 
-    if 'title' not in df.columns:
-        print(f"[ERROR] Column 'title' not found in file: {csv_path}")
-        return pd.DataFrame()
 
-    scores = []
-    for title in df['title'].fillna(""):
+def __getattr__(name):
+    # Keep `ranker.model` / `ranker.keyword_embeddings` working without loading at import
+    if name == "model":
+        return get_model()
+    if name == "keyword_embeddings":
+        return get_keyword_embeddings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _normalize_rows(matrix):
+    """L2-normalize each row, guarding against zero vectors like util.cos_sim does"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _score_embeddings(title_embeddings, keyword_matrix):
+    """Mean cosine similarity of every title embedding against all keywords"""
+    return (_normalize_rows(title_embeddings) @ keyword_matrix.T).mean(axis=1)
+
+
+def _encode_texts(texts, batch_size, progress=None):
+    """Encode texts in batches, returning {text: embedding} for every text that succeeded"""
+    encoded = {}
+    if not texts:
+        return encoded
+    # Loaded outside the per-title fallback: a model that can't load fails the run instead of scoring 0
+    model = get_model()
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
         try:
-            title_embedding = model.encode(title)
-            sim_scores = util.cos_sim(title_embedding, keyword_embeddings)
-            score = sim_scores.mean().item()
+            with span("encode_batch", source=EMBEDDING_BACKEND, rows=len(chunk)):
+                embeddings = _encode(model, chunk, batch_size=batch_size)
+            encoded.update(zip(chunk, embeddings))
         except Exception as e:
-            print(f"[WARN] Failed to process title '{title}': {e}")
-            score = 0
-        scores.append(score)
+            # Fall back to one title at a time so a single bad row can't sink the chunk
+            print(f"[WARN] Batch {start}-{start + len(chunk)} failed ({e}), retrying per title")
+            for text in chunk:
+                try:
+                    encoded[text] = _encode(model, text)
+                except Exception as e:
+                    print(f"[WARN] Failed to process title '{text}': {e}")
+        if progress is not None:
+            progress(len(chunk))
+    return encoded
+
+
+def _embed_unique(keys, batch_size, cache=None, progress=None):
+    """Embeddings for normalized titles: {key: vector} from the cache, then the model for the rest"""
+    embeddings = cache.get_many(keys) if cache is not None else {}
+    missing = [key for key in keys if key not in embeddings]
+    if progress is not None and embeddings:
+        progress("leads_scored", len(embeddings))
+    if missing:
+        encoded = _encode_texts(missing, batch_size,
+                                (lambda amount: progress("leads_scored", amount)) if progress else None)
+        if cache is not None:
+            cache.put_many(encoded)
+        embeddings.update(encoded)
+
+    if cache is not None:
+        print(f"[INFO] Embedding cache: {len(keys) - len(missing)} hits, {len(missing)} misses")
+    return embeddings
+
+
+def score_titles(titles, batch_size=DEFAULT_BATCH_SIZE, cache=None, progress=None):
+    """
+    Score job titles against the important keywords in batches
+
+    Args:
+        titles (list): Job titles to score
+        batch_size (int): Number of titles encoded per model call
+        cache (EmbeddingCache): Optional embedding cache consulted before the model
+        progress (callable): Called as progress("leads_scored", amount) as unique titles are scored
+
+    Returns:
+        np.ndarray: Mean cosine similarity per title (0 for titles that failed)
+    """
+    # Titles are normalized before encoding; MiniLM is uncased so this doesn't change the vectors
+    keys = [normalize_title(title) for title in titles]
+    unique_keys = list(dict.fromkeys(keys))
+    embeddings = _embed_unique(unique_keys, batch_size, cache, progress)
+
+    scored_keys = [key for key in unique_keys if key in embeddings]
+    unique_scores = {}
+    if scored_keys:
+        matrix = np.stack([embeddings[key] for key in scored_keys])
+        unique_scores = dict(zip(scored_keys, _score_embeddings(matrix, _normalize_rows(get_keyword_embeddings()))))
+
+    return np.array([unique_scores.get(key, 0.0) for key in keys], dtype=np.float64)
+
+
+def embed_titles(titles, batch_size=DEFAULT_BATCH_SIZE, cache=None):
+    """
+    L2-normalized float32 embeddings of job titles, one row per title
+
+    Titles go through the same normalization and embedding cache as score_titles,
+    so titles that were just ranked are not encoded again. Rows for titles that
+    failed to encode are zero.
+    """
+    keys = [normalize_title(title) for title in titles]
+    unique_keys = list(dict.fromkeys(keys))
+    embeddings = _embed_unique(unique_keys, batch_size, cache)
+
+    matrix = np.zeros((len(keys), get_keyword_embeddings().shape[1]), dtype=np.float32)
+    for row, key in enumerate(keys):
+        vector = embeddings.get(key)
+        if vector is not None:
+            matrix[row] = vector
+    return _normalize_rows(matrix)
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """
+    Return the process-wide on-disk embedding cache for the ranker model and backend
+
+    Every job, pipeline run and thread in the process shares it, as the cache
+    allows one writer at a time; switching backends closes the previous one.
+    """
+    global _embedding_cache
+    if _embedding_cache is None or _embedding_cache.model_name != embedding_key():
+        with _embedding_cache_lock:
+            if _embedding_cache is None or _embedding_cache.model_name != embedding_key():
+                if _embedding_cache is not None:
+                    _embedding_cache.close()
+                _embedding_cache = EmbeddingCache(embedding_key(), get_keyword_embeddings().shape[1])
+    return _embedding_cache
+
+
+def rank_leads(csv_path="data/leads_raw.csv", top_n=20, batch_size=DEFAULT_BATCH_SIZE, use_cache=True,
+               leads=None, output_path=RANKED_PATH, progress=None):
+    """
+    Rank leads by title relevance and save them
+
+    Args:
+        csv_path (str): Raw leads file (.csv, .parquet or .arrow), read when `leads` is not given
+        leads (pd.DataFrame): Raw leads handed over in memory, skipping the file round-trip
+        output_path (str): Where the ranked leads are written (None to skip writing)
+        progress (callable): Progress callback passed on to score_titles
+    """
+    if leads is not None:
+        df = leads.copy()
+        source = "in-memory leads"
+    else:
+        try:
+            df = load_leads(csv_path)
+        except FileNotFoundError:
+            print(f"[ERROR] File not found: {csv_path}")
+            return pd.DataFrame()
+        source = f"file: {csv_path}"
+
+    if 'title' not in df.columns:
+        print(f"[ERROR] Column 'title' not found in {source}")
+        return pd.DataFrame()
+
+    cache = get_embedding_cache() if use_cache else None
+    scores = score_titles(df['title'].fillna("").tolist(), batch_size=batch_size, cache=cache,
+                          progress=progress)
+    if cache is not None:
+        cache.save()
 
-    df["relevance_score"] = pd.Series(scores, dtype='float64')
+    df["relevance_score"] = pd.Series(scores, index=df.index, dtype='float32')
     df.sort_values(by="relevance_score", ascending=False, inplace=True)
     df.reset_index(drop=True, inplace=True)
 
-    output_path = "data/leads_ranked.csv"
-    df.to_csv(output_path, index=False)
-    print(f"[SUCCESS] Ranked leads saved to: {output_path}")
+    if output_path:
+        save_leads(df, output_path)
+        print(f"[SUCCESS] Ranked leads saved to: {output_path}")
     print(f"[INFO] Top {top_n} Leads:")
     print(df.head(top_n)[["title", "company", "relevance_score"]])
 
@@ -0,0 +1,187 @@
+import codecs
+import json
+from urllib.parse import quote_plus, urlparse
+
+from src.html_parser import parse_listings
+from src.http_client import get_default_client
+from src.incremental import forget_unparsed
+from src.instrumentation import count, counted_chunks, enabled
+
+REMOTEOK_API_URL = "https://remoteok.com/api"
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks):
+    """
+    Incrementally decode a top-level JSON array, yielding each element once it is complete
+
+    Args:
+        chunks (iterable): Byte chunks of the response body
+
+    Only the element currently being received is buffered, so a large feed never
+    has to be held (or parsed) as one document.
+
+    Raises:
+        ValueError: The body is not a JSON array, or ends before its closing bracket
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # What the next token must be: "[" to open, then an element (or "]" if none
+    # yet), then "," or "]" after each element
+    expect = "open"
+    exhausted = False
+    chunks = iter(chunks)
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == "open":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                expect, pos = "first", pos + 1
+                continue
+            if expect == "separator":
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                expect, pos = "element", pos + 1
+                continue
+            if expect == "first" and char == "]":
+                return
+
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # Make sure the element is really finished, not a number cut mid-chunk
+                if end < len(buffer) or exhausted:
+                    yield item
+                    # Only move past it: a whole body in one chunk would be copied once per element
+                    pos = end
+                    expect = "separator"
+                    continue
+
+        if exhausted:
+            raise ValueError("Empty response, expected a JSON array" if expect == "open"
+                             else "Truncated JSON array")
+
+        # Consumed text is dropped only here, once per chunk
+        try:
+            buffer = buffer[pos:] + utf8.decode(next(chunks))
+        except StopIteration:
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+            exhausted = True
+        pos = 0
+
+
+def _to_listing(item):
+    """Map one feed entry onto the raw row shape produced by html_parser for RemoteOK"""
+    slug = item.get("slug")
+    if slug:
+        href = f"/remote-jobs/{slug}"
+    else:
+        href = item.get("url", "").replace("https://remoteOK.com", "").replace("https://remoteok.com", "")
+    return {
+        "title": (item.get("position") or "").strip(),
+        "company": (item.get("company") or "").strip(),
+        "tags": [str(tag).strip() for tag in item.get("tags") or []],
+        "href": href
+    }
+
+
+def iter_remoteok_listings(keyword, api_url=None, client=None, validators=None):
+    """
+    Stream RemoteOK jobs for a keyword from the JSON feed
+
+    Args:
+        keyword (str): Tag to request from the feed
+        api_url (str): Feed endpoint, defaults to REMOTEOK_API_URL (override for recorded fixtures)
+        client (HttpClient): HTTP client, defaults to the shared one
+        validators (ValidatorStore): Make the request conditional; an unchanged feed yields nothing
+
+    Yields:
+        dict: title, company, tags and href for each job, like parse_listings(html, "remoteok")
+    """
+    client = client or get_default_client()
+    url = feed_url(keyword, api_url)
+    response = client.get(url, validators=validators, stream=True, headers={"Accept": "application/json"})
+    try:
+        if response.status_code == 304:
+            print("[INFO] RemoteOK feed unchanged since last scrape")
+            return
+        if response.status_code != 200:
+            raise ValueError(f"RemoteOK feed returned HTTP {response.status_code}")
+        chunks = response.iter_content(chunk_size=64 * 1024)
+        if enabled():
+            chunks = counted_chunks(chunks, "bytes_fetched", source=urlparse(url).netloc)
+        with forget_unparsed(validators, url):
+            yield from iter_feed_listings(chunks)
+    finally:
+        response.close()
+
+
+def feed_url(keyword, api_url=None):
+    """Feed URL for a keyword (the whole feed when there is none)"""
+    api_url = api_url or REMOTEOK_API_URL
+    return f"{api_url}?tag={quote_plus(keyword)}" if keyword else api_url
+
+
+def page_url(keyword):
+    """HTML search page for a keyword, scraped when the feed is unavailable"""
+    return f"https://remoteok.com/remote-{keyword}-jobs"
+
+
+def iter_feed_listings(chunks):
+    """
+    Listing rows from the byte chunks of a feed response (a whole body is one chunk)
+
+    Yields:
+        dict: title, company, tags and href, like parse_listings(html, "remoteok")
+    """
+    for item in iter_json_array(chunks):
+        # The first element is the feed's legal notice, not a job
+        if isinstance(item, dict) and item.get("position"):
+            count("rows_parsed", source="remoteok")
+            yield _to_listing(item)
+
+
+def fetch_remoteok_listings(keyword, use_api=True, client=None, headers=None, api_url=None, validators=None):
+    """
+    Fetch RemoteOK rows from the JSON feed, falling back to scraping the HTML page
+
+    Args:
+        keyword (str): Search keyword
+        use_api (bool): Try the JSON feed first
+        client (HttpClient): HTTP client, defaults to the shared one
+        headers (dict): Extra headers for the HTML request
+        api_url (str): Feed endpoint override
+        validators (ValidatorStore): Send conditional requests (unchanged responses give no rows)
+
+    Returns:
+        list: Raw listing rows, or None if the HTML page could not be fetched either
+    """
+    client = client or get_default_client()
+
+    if use_api:
+        try:
+            return list(iter_remoteok_listings(keyword, api_url=api_url, client=client, validators=validators))
+        except Exception as e:
+            print(f"[WARN] RemoteOK feed unavailable ({e}), falling back to HTML")
+
+    response = client.get(page_url(keyword), validators=validators, headers=headers)
+    if response.status_code == 304:
+        print("[INFO] RemoteOK page unchanged since last scrape")
+        return []
+    if response.status_code != 200:
+        print(f"[ERROR] Failed to fetch page. Status code: {response.status_code}")
+        return None
+    with forget_unparsed(validators, page_url(keyword)):
+        return parse_listings(response.text, "remoteok")
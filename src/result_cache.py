@@ -0,0 +1,166 @@
+"""
+TTL cache for unfiltered per-site scrape results
+
+Location/field/experience filters only narrow what a site returns, so the
+cache stores the classified leads of one fetch and every filter combination
+is served from it. Entries live in a bounded in-memory LRU backed by one JSON
+file per entry on disk, which survives app restarts until the source's TTL runs out.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a source's results stay fresh; feeds that change quickly expire sooner
+SOURCE_TTLS = {
+    "remoteok": 10 * 60,
+    "indeed": 30 * 60,
+    "stackoverflow": 60 * 60,
+    "angelco": 60 * 60,
+    "we_work_remotely": 30 * 60
+}
+DEFAULT_TTL = 30 * 60
+
+
+class ResultCache:
+    """
+    Two-tier (memory + disk) cache of scrape results with a per-source TTL
+
+    Args:
+        ttls (dict): Seconds to keep results per source, defaults to SOURCE_TTLS
+        default_ttl (float): TTL for sources not listed in `ttls`
+        max_entries (int): Entries kept in memory (least recently used are dropped first)
+        cache_dir (str): Directory of the on-disk tier (None for memory only)
+        max_disk_entries (int): Files kept on disk (oldest are pruned first)
+    """
+
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_entries=64, cache_dir="data/result_cache",
+                 max_disk_entries=512):
+        self.ttls = SOURCE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source, params):
+        """Cache key for a source and the fetch parameters that identify its unfiltered result"""
+        return "|".join([source] + [str(value or "").lower() for value in params])
+
+    def ttl(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + ".json")
+
+    def get(self, source, *params):
+        """
+        Cached rows for `source` fetched with `params`, or None if missing or expired
+        """
+        key = self.key(source, params)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, rows = entry
+                if now - stored_at < self.ttl(source):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return rows
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None and now - entry["stored_at"] < self.ttl(source):
+                self._remember(key, entry["stored_at"], entry["rows"])
+                self.disk_hits += 1
+                return entry["rows"]
+            self.misses += 1
+        return None
+
+    def put(self, source, params, rows):
+        """Store the unfiltered rows of one fetch"""
+        key = self.key(source, params)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, rows)
+        self._write_disk(key, stored_at, rows)
+
+    def _remember(self, key, stored_at, rows):
+        self._memory[key] = (stored_at, rows)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable result cache entry {path}: {e}")
+            return None
+        # Guard against a (very unlikely) digest collision
+        return entry if entry.get("key") == key else None
+
+    def _write_disk(self, key, stored_at, rows):
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "stored_at": stored_at, "rows": rows}, f)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            print(f"[WARN] Could not write result cache entry: {e}")
+
+    def _prune_disk(self):
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        if len(paths) <= self.max_disk_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_result_cache():
+    """Return the process-wide ResultCache shared by all scrapers"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ResultCache()
+    return _default_cache
@@ -1,46 +1,213 @@
-from playwright.sync_api import sync_playwright
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, TimeoutError as AsyncPlaywrightTimeoutError
 import pandas as pd
 
-def scrape_leads(query="AI startup", location="San Francisco", pages=1):
-    results = []
-    base_url = "https://www.indeed.com/jobs"
+INDEED_URL = "https://www.indeed.com/jobs"
+JOB_CARD_SELECTOR = "div.job_seen_beacon"
+
+# Browser contexts fetching result pages at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Extracts every job card in one round-trip instead of three locator calls per card
+EXTRACT_CARDS_JS = """
+cards => cards.map(card => {
+    const text = selector => {
+        const element = card.querySelector(selector);
+        return element ? element.innerText : "N/A";
+    };
+    return {
+        title: text("h2.jobTitle"),
+        company: text("span.companyName"),
+        location: text("div.companyLocation")
+    };
+})
+"""
+
+
+def _search_url(base_url, query, location, page_num):
+    return f"{base_url}?q={query}&l={location}&start={page_num * 10}"
+
+
+def _debug_path(debug_dir, page_num):
+    os.makedirs(debug_dir, exist_ok=True)
+    return os.path.join(debug_dir, f"debug_page_{page_num + 1}.html")
+
+
+def iter_leads(query="AI startup", location="San Francisco", pages=1, max_leads=None, headless=True,
+               debug_dir=None, base_url=INDEED_URL):
+    """
+    Yield leads as each results page is parsed, stopping once `max_leads` have been yielded
+
+    Args:
+        headless (bool): Run Chromium without a window (False to watch the browser)
+        debug_dir (str): Save each page's HTML here as debug_page_N.html (off by default)
+        base_url (str): Search endpoint, override to scrape a local fixture server
+    """
+    yielded = 0
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # 🔍 HEADLESS = False to see the browser
+        browser = p.chromium.launch(headless=headless)
         page = browser.new_page()
 
-        for page_num in range(pages):
-            start = page_num * 10
-            search_url = f"{base_url}?q={query}&l={location}&start={start}"
-            print(f"[INFO] Scraping page {page_num+1}: {search_url}")
-            page.goto(search_url, timeout=30000)
-            page.wait_for_timeout(5000)  # wait for content to load
+        try:
+            for page_num in range(pages):
+                search_url = _search_url(base_url, query, location, page_num)
+                print(f"[INFO] Scraping page {page_num+1}: {search_url}")
+                page.goto(search_url, timeout=30000)
+                try:
+                    # Wait for the job cards themselves instead of a fixed sleep
+                    page.wait_for_selector(JOB_CARD_SELECTOR, timeout=5000)
+                except PlaywrightTimeoutError:
+                    print(f"[WARN] No job cards appeared on page {page_num+1}")
 
-            # 💡 Debug: Save HTML to inspect structure
-            with open(f"debug_page_{page_num+1}.html", "w", encoding="utf-8") as f:
-                f.write(page.content())
+                if debug_dir:
+                    with open(_debug_path(debug_dir, page_num), "w", encoding="utf-8") as f:
+                        f.write(page.content())
 
-            job_cards = page.locator("div.job_seen_beacon")
-            count = job_cards.count()
-            print(f"[DEBUG] Found {count} job cards on page {page_num+1}")
+                cards = page.eval_on_selector_all(JOB_CARD_SELECTOR, EXTRACT_CARDS_JS)
+                print(f"[DEBUG] Found {len(cards)} job cards on page {page_num+1}")
+                if not cards:
+                    break
 
-            for i in range(count):
-                try:
-                    title = job_cards.nth(i).locator("h2.jobTitle").inner_text()
-                except:
-                    title = "N/A"
-                try:
-                    company = job_cards.nth(i).locator("span.companyName").inner_text()
-                except:
-                    company = "N/A"
+                for card in cards:
+                    yield card
+                    yielded += 1
+                    if max_leads is not None and yielded >= max_leads:
+                        return
+        finally:
+            browser.close()
+
+
+class BrowserPool:
+    """
+    One headless Chromium shared by a pool of browser contexts
+
+    Use as `async with BrowserPool() as pool:`; the browser stays up for every
+    scrape made through the pool, and each context fetches one page at a time,
+    so `concurrency` pages load in parallel.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, headless=True, debug_dir=None):
+        self.concurrency = concurrency
+        self.headless = headless
+        self.debug_dir = debug_dir
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._pages = asyncio.Queue()
+        for _ in range(self.concurrency):
+            context = await self._browser.new_context()
+            await self._pages.put(await context.new_page())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._browser.close()
+        await self._playwright.stop()
+
+    async def fetch_cards(self, url, page_num):
+        """Load one results page in a free context and return its job cards"""
+        page = await self._pages.get()
+        try:
+            print(f"[INFO] Scraping page {page_num+1}: {url}")
+            await page.goto(url, timeout=30000)
+            try:
+                await page.wait_for_selector(JOB_CARD_SELECTOR, timeout=5000)
+            except AsyncPlaywrightTimeoutError:
+                print(f"[WARN] No job cards appeared on page {page_num+1}")
+
+            if self.debug_dir:
+                with open(_debug_path(self.debug_dir, page_num), "w", encoding="utf-8") as f:
+                    f.write(await page.content())
+
+            cards = await page.eval_on_selector_all(JOB_CARD_SELECTOR, EXTRACT_CARDS_JS)
+            print(f"[DEBUG] Found {len(cards)} job cards on page {page_num+1}")
+            return cards
+        finally:
+            await self._pages.put(page)
+
+    async def iter_leads(self, query="AI startup", location="San Francisco", pages=1, max_leads=None,
+                         base_url=INDEED_URL):
+        """
+        Async generator over leads, fetching result pages in parallel but yielding in page order
+
+        Stops at the first page without cards or once `max_leads` have been yielded;
+        pages still loading at that point are cancelled.
+        """
+        tasks = [
+            asyncio.ensure_future(self.fetch_cards(_search_url(base_url, query, location, page_num), page_num))
+            for page_num in range(pages)
+        ]
+        yielded = 0
+        try:
+            for page_num, task in enumerate(tasks):
                 try:
-                    loc = job_cards.nth(i).locator("div.companyLocation").inner_text()
-                except:
-                    loc = "N/A"
+                    cards = await task
+                except Exception as e:
+                    print(f"[WARN] Page {page_num+1} failed: {e}")
+                    continue
+                if not cards:
+                    return
+                for card in cards:
+                    yield card
+                    yielded += 1
+                    if max_leads is not None and yielded >= max_leads:
+                        return
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-                results.append({"title": title, "company": company, "location": loc})
 
-        browser.close()
+async def scrape_leads_async(query="AI startup", location="San Francisco", pages=1, max_leads=None,
+                             concurrency=DEFAULT_CONCURRENCY, headless=True, debug_dir=None,
+                             base_url=INDEED_URL, pool=None):
+    """
+    Collect leads with a headless browser pool
+
+    Args:
+        concurrency (int): Pages fetched in parallel (ignored when `pool` is given)
+        pool (BrowserPool): Already started pool to reuse across scrapes
+    """
+    if pool is not None:
+        return [lead async for lead in pool.iter_leads(query, location, pages, max_leads, base_url)]
+    async with BrowserPool(concurrency, headless, debug_dir) as pool:
+        return [lead async for lead in pool.iter_leads(query, location, pages, max_leads, base_url)]
+
+
+def scrape_leads(query="AI startup", location="San Francisco", pages=1, max_leads=None,
+                 concurrency=DEFAULT_CONCURRENCY, headless=True, debug_dir=None, base_url=INDEED_URL):
+    """
+    Scrape Indeed with a headless browser pool and save the leads to data/leads_raw.csv
+
+    Args:
+        concurrency (int): Result pages fetched in parallel
+        headless (bool): Run Chromium without a window
+        debug_dir (str): Save each page's HTML for inspection (off by default)
+        base_url (str): Search endpoint, override to scrape a local fixture server
+
+    Called from a thread with a running event loop (Streamlit, Jupyter), the scrape
+    runs on its own loop in a worker thread; async callers should rather await
+    scrape_leads_async.
+    """
+    def scrape():
+        return asyncio.run(scrape_leads_async(query, location, pages, max_leads, concurrency, headless,
+                                              debug_dir, base_url))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        results = scrape()
+    else:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = executor.submit(scrape).result()
 
     if results:
         df = pd.DataFrame(results)
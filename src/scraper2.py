@@ -1,9 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
 
-def scrape_remoteok_jobs(keyword=None, location=None, field=None, experience=None):
+from src.classifier import remoteok_classifier
+from src.incremental import IncrementalState, query_scope
+from src.instrumentation import count, span
+from src.lead_store import append_run
+from src.remoteok_feed import fetch_remoteok_listings
+from src.result_cache import get_default_result_cache
+
+# Namespaces scraper2's rows in the result cache; its classifier rules differ from MultiWebsiteScraper's
+RESULT_CACHE_SCOPE = "scraper2"
+
+def scrape_remoteok_jobs(keyword=None, location=None, field=None, experience=None, use_api=True,
+                         incremental=False, progress=None, use_cache=True):
     """
     Scrape remote jobs with filtering options
     
@@ -12,82 +20,30 @@ def scrape_remoteok_jobs(keyword=None, location=None, field=None, experience=Non
         location (str): Location filter (e.g., "US", "Europe", "Worldwide")
         field (str): Field filter (e.g., "AI", "DS", "ML", "Frontend", "Backend", "Nursing")
         experience (str): Experience level filter (e.g., "Fresher", "2", "3", "Senior")
+        use_api (bool): Read the RemoteOK JSON feed instead of scraping the HTML page
+        incremental (bool): Only return jobs that are new or changed since the last run
+            with the same filters (uses conditional GETs and a seen-lead store)
+        progress (callable): Called as progress(counter, amount) for "pages_fetched" and "leads_parsed"
+        use_cache (bool): Reuse the unfiltered jobs of a recent scrape for the same keyword
+            (incremental scrapes always go to the network)
     """
-    url = f"https://remoteok.com/remote-{keyword}-jobs"
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    r = requests.get(url, headers=headers)
-    if r.status_code != 200:
-        print(f"[ERROR] Failed to fetch page. Status code: {r.status_code}")
-        return pd.DataFrame()
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    jobs = []
-
-    for tr in soup.find_all("tr", class_="job"):
-        try:
-            title = tr.find("h2").text.strip()
-            company = tr.find("h3").text.strip()
-            tags = [tag.text.strip() for tag in tr.find_all("div", class_="tag")]
-            link = "https://remoteok.com" + tr["data-href"]
-            
-            # Get location from tags or description
-            job_location = "Remote"  # Default
-            for tag in tags:
-                if any(loc in tag.lower() for loc in ["us", "europe", "worldwide", "remote"]):
-                    job_location = tag
-                    break
-            
-            # Get experience level from title or tags
-            job_experience = "Not specified"
-            experience_keywords = {
-                "fresher": ["entry", "junior", "fresher", "0-1", "0-2"],
-                "mid": ["mid", "intermediate", "2-3", "3-4", "2-5"],
-                "senior": ["senior", "lead", "principal", "5+", "6+", "7+"]
-            }
-            
-            title_lower = title.lower()
-            tags_lower = [tag.lower() for tag in tags]
-            
-            for exp_level, keywords in experience_keywords.items():
-                if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
-                    job_experience = exp_level
-                    break
-            
-            # Get field from title or tags
-            job_field = "General"
-            field_keywords = {
-                "AI": ["ai", "artificial intelligence", "machine learning", "ml", "deep learning"],
-                "DS": ["data science", "data scientist", "analytics"],
-                "ML": ["machine learning", "ml engineer", "mlops"],
-                "Frontend": ["frontend", "front-end", "react", "vue", "angular", "javascript"],
-                "Backend": ["backend", "back-end", "python", "java", "node", "api"],
-                "Nursing": ["nurse", "nursing", "healthcare", "medical"],
-                "DevOps": ["devops", "sre", "infrastructure", "aws", "azure"],
-                "Mobile": ["mobile", "ios", "android", "react native", "flutter"]
-            }
-            
-            for field_name, keywords in field_keywords.items():
-                if any(keyword in title_lower or any(keyword in tag for tag in tags_lower) for keyword in keywords):
-                    job_field = field_name
-                    break
-
-            jobs.append({
-                "title": title,
-                "company": company,
-                "tags": ", ".join(tags),
-                "link": link,
-                "location": job_location,
-                "field": job_field,
-                "experience": job_experience
-            })
-        except Exception as e:
-            print(f"[WARN] Skipping a row due to error: {e}")
-            continue
+    result_cache = get_default_result_cache() if use_cache and not incremental else None
+    jobs = result_cache.get("remoteok", RESULT_CACHE_SCOPE, keyword) if result_cache is not None else None
+    if jobs is not None:
+        print(f"[INFO] RemoteOK: {len(jobs)} jobs served from the result cache")
+        if progress is not None:
+            progress("leads_parsed", len(jobs))
+    else:
+        jobs = _fetch_jobs(keyword, location, field, experience, use_api, incremental, progress)
+        if jobs is None:
+            return pd.DataFrame()
+        if result_cache is not None and jobs:
+            result_cache.put("remoteok", (RESULT_CACHE_SCOPE, keyword), jobs)
 
     # Apply filters
     if jobs:
         df = pd.DataFrame(jobs)
+        unfiltered_count = len(df)
         
         # Filter by location
         if location and location.lower() != "any":
@@ -100,9 +56,12 @@ def scrape_remoteok_jobs(keyword=None, location=None, field=None, experience=Non
         # Filter by experience
         if experience and experience.lower() != "any":
             df = df[df['experience'].str.contains(experience, case=False, na=False)]
+        count("rows_dropped", unfiltered_count - len(df), source="remoteok")
         
         if not df.empty:
-            df.to_csv("data/leads_raw.csv", index=False)
+            with span("save_leads", source="csv", rows=len(df)):
+                df.to_csv("data/leads_raw.csv", index=False)
+            append_run(df)
             print(f"[SUCCESS] Scraped {len(df)} jobs → data/leads_raw.csv")
             return df
         else:
@@ -112,5 +71,54 @@ def scrape_remoteok_jobs(keyword=None, location=None, field=None, experience=Non
         print("[WARNING] No jobs found.")
         return pd.DataFrame()
 
+
+def _fetch_jobs(keyword, location, field, experience, use_api, incremental, progress):
+    """Fetch and classify RemoteOK jobs for a keyword (None if the page could not be fetched)"""
+    headers = {"User-Agent": "Mozilla/5.0"}
+    state = IncrementalState(query_scope(keyword, location, field, experience)) if incremental else None
+
+    listings = fetch_remoteok_listings(keyword, use_api=use_api, headers=headers,
+                                       validators=state.validators if state else None)
+    if listings is None:
+        return None
+    if progress is not None:
+        progress("pages_fetched", 1)
+
+    jobs = []
+    # Covers the seen-lead check too; classifying dominates
+    with span("classify", source="remoteok", rows=len(listings)):
+        for row in listings:
+            try:
+                title = row["title"]
+                company = row["company"]
+                tags = row["tags"]
+                link = "https://remoteok.com" + row["href"]
+                if state is not None and not state.seen.is_new_or_changed(title, company, tags, link):
+                    continue
+            
+                # Get location, experience level and field from title or tags
+                job_location, job_experience, job_field = remoteok_classifier.classify(title, tags)
+
+                jobs.append({
+                    "title": title,
+                    "company": company,
+                    "tags": ", ".join(tags),
+                    "link": link,
+                    "location": job_location,
+                    "field": job_field,
+                    "experience": job_experience
+                })
+            except Exception as e:
+                print(f"[WARN] Skipping a row due to error: {e}")
+                continue
+
+    if progress is not None:
+        progress("leads_parsed", len(jobs))
+    if state is not None:
+        state.save()
+
+    return jobs
+
+
 if __name__ == "__main__":
     scrape_remoteok_jobs("ai")
@@ -0,0 +1,291 @@
+"""
+Out-of-core ranking for lead files larger than memory
+
+The input is read and scored chunk by chunk. Each scored chunk is sorted and
+written to a temporary run file, then the runs are merged k ways into the
+ranked output, holding only a small block of every run at a time. When only
+the best leads are needed, top_leads keeps just the current top N instead of
+writing runs. Either way peak memory depends on the chunk size, not the input.
+
+Ties keep input order, as a stable sort of the whole file would.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import ranker
+from src.incremental import SeenLeadStore
+from src.lead_store import (RANKED_PATH, SCORE_COLUMN, STORE_FORMAT, LeadWriter, iter_lead_chunks,
+                            save_leads)
+
+DEFAULT_CHUNK_ROWS = 50_000
+# Rows held across all run buffers during a merge
+MERGE_BUFFER_ROWS = 200_000
+MIN_BLOCK_ROWS = 1_000
+# Runs merged at once; more runs are merged in several passes
+MAX_FAN_IN = 16
+# Rows per block (Parquet row group) in run files
+RUN_BLOCK_ROWS = 10_000
+
+
+def _sort_desc(df):
+    return df.sort_values(by=SCORE_COLUMN, ascending=False, kind="stable")
+
+
+def _write_blocks(writer, df):
+    """Write df in blocks of RUN_BLOCK_ROWS, so runs can later be read a small block at a time"""
+    for start in range(0, len(df), RUN_BLOCK_ROWS):
+        writer.write(df.iloc[start:start + RUN_BLOCK_ROWS])
+
+
+def iter_ranked_chunks(csv_path, chunk_rows=DEFAULT_CHUNK_ROWS, batch_size=ranker.DEFAULT_BATCH_SIZE,
+                       use_cache=True, progress=None):
+    """
+    Score a lead file chunk by chunk in this process
+
+    Yields:
+        pd.DataFrame: Input chunk with a float32 relevance_score column
+    """
+    cache = ranker.get_embedding_cache() if use_cache else None
+    for chunk in iter_lead_chunks(csv_path, chunk_rows):
+        scores = ranker.score_titles(chunk["title"].fillna("").astype(str).tolist(), batch_size=batch_size,
+                                     cache=cache, progress=progress)
+        yield chunk.assign(**{SCORE_COLUMN: scores.astype(np.float32)})
+    if cache is not None:
+        cache.save()
+
+
+def top_leads(chunks, top_n):
+    """
+    Best `top_n` rows across scored chunks, holding at most top_n + chunk size rows
+
+    Returns:
+        pd.DataFrame: Top rows sorted by relevance_score (earlier rows win ties)
+    """
+    head = None
+    for chunk in chunks:
+        # nlargest partitions rather than sorting the whole chunk
+        best = chunk.nlargest(top_n, SCORE_COLUMN, keep="first")
+        head = best if head is None else _sort_desc(pd.concat([head, best], ignore_index=True)).head(top_n)
+    if head is None:
+        return pd.DataFrame()
+    return _sort_desc(head).reset_index(drop=True)
+
+
+def write_sorted_runs(chunks, run_dir):
+    """
+    Sort each scored chunk by relevance_score and write it as its own run file
+
+    Returns:
+        list: Run paths, in input order
+    """
+    paths = []
+    for chunk in chunks:
+        path = os.path.join(run_dir, f"run_{len(paths):05d}.{STORE_FORMAT}")
+        with LeadWriter(path) as writer:
+            _write_blocks(writer, _sort_desc(chunk))
+        paths.append(path)
+    return paths
+
+
+def merge_runs(run_paths, output_path, buffer_rows=MERGE_BUFFER_ROWS):
+    """
+    k-way merge of sorted run files into one file sorted by relevance_score
+
+    Every run is read a block at a time. Rows not yet read from a run score at
+    most that run's last buffered score, so every buffered row scoring above the
+    highest such bound is final and is written out in one vectorized step; then
+    the run that set the bound reads its next block. Ties go in run order, and
+    the limiting run is the first run holding the bound, so rows equal to the
+    bound are final too in that run and every run before it: a pile of tied
+    scores drains block by block instead of collecting in the buffers.
+
+    Returns:
+        int: Rows written
+    """
+    block_rows = max(MIN_BLOCK_ROWS, buffer_rows // max(len(run_paths), 1))
+    readers = [iter_lead_chunks(path, block_rows) for path in run_paths]
+    blocks = [pd.DataFrame() for _ in run_paths]
+    # Negated scores (ascending) of each block, and how far into the block rows have been written
+    negated = [np.empty(0, dtype=np.float32) for _ in run_paths]
+    positions = [0] * len(run_paths)
+    exhausted = [False] * len(run_paths)
+
+    def refill(run):
+        while not exhausted[run]:
+            block = next(readers[run], None)
+            if block is None:
+                exhausted[run] = True
+                return
+            if block.empty:
+                continue
+            leftover = blocks[run].iloc[positions[run]:]
+            blocks[run] = pd.concat([leftover, block], ignore_index=True) if len(leftover) else block
+            negated[run] = -blocks[run][SCORE_COLUMN].to_numpy()
+            positions[run] = 0
+            return
+
+    with LeadWriter(output_path) as writer:
+        for run in range(len(run_paths)):
+            refill(run)
+        while True:
+            open_runs = [run for run in range(len(run_paths)) if not exhausted[run]]
+            if not open_runs:
+                rest = [blocks[run].iloc[positions[run]:] for run in range(len(run_paths))]
+                rest = [block for block in rest if len(block)]
+                if rest:
+                    _write_blocks(writer, _sort_desc(pd.concat(rest, ignore_index=True)))
+                break
+
+            # negated[run][-1] is minus the run's bound; the highest bound is the smallest of these
+            limiting = min(open_runs, key=lambda run: negated[run][-1])
+            cutoff = negated[limiting][-1]
+            ready = []
+            for run in range(len(run_paths)):
+                position = positions[run]
+                # Ties go in run order, so rows tying with the bound are final up to the limiting run
+                side = "right" if run <= limiting else "left"
+                end = int(np.searchsorted(negated[run], cutoff, side=side))
+                if end > position:
+                    ready.append(blocks[run].iloc[position:end])
+                    positions[run] = end
+            if ready:
+                # Concatenated in run order, so the stable sort keeps ties in input order
+                _write_blocks(writer, _sort_desc(pd.concat(ready, ignore_index=True)))
+            # The limiting run's buffer is drained; read further into it
+            refill(limiting)
+        return writer.rows
+
+
+def sort_scored_chunks(chunks, output_path, tmp_dir=None, buffer_rows=MERGE_BUFFER_ROWS, fan_in=MAX_FAN_IN):
+    """
+    Write scored chunks to `output_path` sorted by relevance_score, out of core
+
+    Runs are merged at most `fan_in` at a time, in as many passes as needed, so
+    each merge keeps its blocks large however many runs the input produces.
+
+    Args:
+        chunks (iterable): Scored DataFrame chunks
+        output_path (str): Ranked output (.csv or .parquet)
+        tmp_dir (str): Where run files go (default: next to the output)
+
+    Returns:
+        int: Rows written
+    """
+    run_dir = tempfile.mkdtemp(prefix="rank_runs_", dir=tmp_dir or os.path.dirname(output_path) or ".")
+    try:
+        run_paths = write_sorted_runs(chunks, run_dir)
+        merge_pass = 0
+        while len(run_paths) > fan_in:
+            merge_pass += 1
+            print(f"[INFO] Merge pass {merge_pass}: {len(run_paths)} runs")
+            merged = []
+            # Consecutive runs are merged together, so runs stay in input order for tie-breaking
+            for start in range(0, len(run_paths), fan_in):
+                group = run_paths[start:start + fan_in]
+                path = os.path.join(run_dir, f"pass{merge_pass}_{len(merged):05d}.{STORE_FORMAT}")
+                merge_runs(group, path, buffer_rows)
+                for done in group:
+                    os.remove(done)
+                merged.append(path)
+            run_paths = merged
+        print(f"[INFO] Merging {len(run_paths)} sorted runs into {output_path}")
+        return merge_runs(run_paths, output_path, buffer_rows)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def merge_ranked_files(new_path, previous_path, output_path, buffer_rows=MERGE_BUFFER_ROWS):
+    """
+    Fold newly ranked leads into a previously ranked file, out of core (see merge_ranked_leads)
+
+    Both files are sorted by relevance_score. Previous leads that reappear among
+    the new ones (same link, or same title + company) are dropped and the rest
+    are merged with the new leads, which win ties. Only the new leads' keys are
+    held in memory. `output_path` may be `previous_path`.
+
+    Returns:
+        int: Rows written
+    """
+    new_keys = set()
+    for chunk in iter_lead_chunks(new_path, DEFAULT_CHUNK_ROWS):
+        new_keys.update(_lead_keys(chunk))
+
+    run_dir = tempfile.mkdtemp(prefix="rank_merge_", dir=os.path.dirname(output_path) or ".")
+    try:
+        kept_path = os.path.join(run_dir, f"previous.{STORE_FORMAT}")
+        with LeadWriter(kept_path) as writer:
+            for chunk in iter_lead_chunks(previous_path, DEFAULT_CHUNK_ROWS):
+                kept = chunk[[key not in new_keys for key in _lead_keys(chunk)]]
+                if len(kept):
+                    writer.write(kept)
+        runs = [new_path] + ([kept_path] if writer.rows else [])
+        merged_path = os.path.join(run_dir, "merged" + os.path.splitext(output_path)[1])
+        rows = merge_runs(runs, merged_path, buffer_rows)
+        os.replace(merged_path, output_path)
+        return rows
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _lead_keys(df):
+    links = df["link"] if "link" in df.columns else [None] * len(df)
+    return [SeenLeadStore.key(title, company, link) for title, company, link in zip(df["title"], df["company"], links)]
+
+
+def rank_leads_streaming(csv_path="data/leads_raw.csv", top_n=20, output_path=RANKED_PATH,
+                         chunk_rows=DEFAULT_CHUNK_ROWS, batch_size=ranker.DEFAULT_BATCH_SIZE, use_cache=True,
+                         head_only=False, workers=None, tmp_dir=None, progress=None):
+    """
+    Rank a lead file of any size with flat memory
+
+    Args:
+        csv_path (str): Raw leads file (.csv or .parquet)
+        top_n (int): Number of top leads returned (and printed)
+        output_path (str): Ranked output; with head_only only the top_n leads are written (None to skip)
+        chunk_rows (int): Rows read and scored at a time
+        head_only (bool): Only keep the top_n leads instead of sorting the whole file
+        workers (int): Score on a process pool (see parallel_ranker) instead of in this process
+        tmp_dir (str): Where temporary sorted runs go (default: next to the output)
+        progress (callable): Progress callback passed on to score_titles (in-process scoring only)
+
+    Returns:
+        pd.DataFrame: The top_n leads
+    """
+    try:
+        first = next(iter_lead_chunks(csv_path, 1), None)
+    except FileNotFoundError:
+        print(f"[ERROR] File not found: {csv_path}")
+        return pd.DataFrame()
+    if first is None or "title" not in first.columns:
+        print(f"[ERROR] Column 'title' not found in file: {csv_path}")
+        return pd.DataFrame()
+
+    if workers:
+        from src.parallel_ranker import iter_scored_chunks
+        chunks = iter_scored_chunks(csv_path, workers, chunk_rows=chunk_rows, batch_size=batch_size)
+    else:
+        chunks = iter_ranked_chunks(csv_path, chunk_rows, batch_size, use_cache, progress)
+
+    start = time.perf_counter()
+    if head_only or not output_path:
+        head = top_leads(chunks, top_n)
+        if output_path:
+            save_leads(head, output_path)
+    else:
+        rows = sort_scored_chunks(chunks, output_path, tmp_dir)
+        head = next(iter_lead_chunks(output_path, top_n), pd.DataFrame()).reset_index(drop=True)
+        print(f"[SUCCESS] Ranked {rows} leads in {time.perf_counter() - start:.1f}s → {output_path}")
+
+    print(f"[INFO] Top {top_n} Leads:")
+    if not head.empty:
+        print(head[[column for column in ("title", "company", SCORE_COLUMN) if column in head.columns]])
+    return head
+
+
+if __name__ == "__main__":
+    rank_leads_streaming()
@@ -1,8 +1,322 @@
-from email_validator import validate_email, EmailNotValidError
+"""
+Email verification, one address at a time or in bulk
 
-def verify_email(email):
+verify_emails checks a whole contact list in two passes. The syntax pass
+splits plain addresses (an unquoted ASCII dot-atom before the @-sign) with one
+vectorized regex and validates each distinct domain once; most of
+email_validator's time goes to the IDNA checks of the domain, which every
+address at a company shares. Any other address is validated whole, on a
+process pool for large lists; results are identical either way. The domain
+pass resolves every distinct domain once: MX records, falling back to
+A/AAAA, as email_validator's deliverability check does. Domain results live
+in a TTL/LRU DomainCache, so addresses at the same company, and later lists,
+reuse one lookup. DNS goes through a pluggable resolver: any object
+with dnspython's resolve(qname, rdtype), e.g. a dns.resolver.Resolver pointed
+at a local stub server.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from email_validator import EmailNotValidError, EmailUndeliverableError, validate_email
+from email_validator.deliverability import validate_email_deliverability
+from email_validator.rfc_constants import ATEXT, CASE_INSENSITIVE_MAILBOX_NAMES, EMAIL_MAX_LENGTH
+
+from src.instrumentation import count, span
+
+# Seconds a domain's DNS result is reused; inconclusive lookups (timeouts) are retried sooner
+DOMAIN_TTL = 6 * 60 * 60
+UNKNOWN_DOMAIN_TTL = 5 * 60
+DEFAULT_DNS_TIMEOUT = 5
+DEFAULT_DNS_WORKERS = 16
+# Distinct addresses above which full validation runs on a process pool
+PARALLEL_SYNTAX_MIN = 50_000
+SYNTAX_CHUNK = 5_000
+
+# Addresses whose local part needs no normalization; anything unusual after the @-sign
+# (brackets, quotes, whitespace, another @) sends the address through full validation
+PLAIN_ADDRESS = (r"\A(?P<local>[" + ATEXT + r"]+(?:\.[" + ATEXT + r"]+)*)"
+                 r"@(?P<domain>[^@\s\[\]<>\"(),;:\\]+)\Z")
+
+
+class DomainCache:
+    """
+    In-memory TTL/LRU cache of per-domain DNS results
+
+    Args:
+        ttl (float): Seconds a conclusive result (deliverable or not) stays fresh
+        unknown_ttl (float): Seconds an inconclusive result (timeout, no nameservers) stays fresh
+        max_entries (int): Domains kept (least recently used are dropped first)
+    """
+
+    def __init__(self, ttl=DOMAIN_TTL, unknown_ttl=UNKNOWN_DOMAIN_TTL, max_entries=100_000):
+        self.ttl = ttl
+        self.unknown_ttl = unknown_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, domain):
+        """Cached result for `domain`, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is not None:
+                stored_at, result = entry
+                ttl = self.ttl if result["deliverable"] is not None else self.unknown_ttl
+                if now - stored_at < ttl:
+                    self._entries.move_to_end(domain)
+                    self.hits += 1
+                    return result
+                del self._entries[domain]
+            self.misses += 1
+        return None
+
+    def put(self, domain, result):
+        with self._lock:
+            self._entries[domain] = (time.time(), result)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_domain_cache():
+    """Return the process-wide DomainCache"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = DomainCache()
+    return _default_cache
+
+
+def default_resolver(timeout=DEFAULT_DNS_TIMEOUT):
+    """A dnspython resolver using the system's nameservers, giving up on a domain after `timeout` seconds"""
+    import dns.resolver
+
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = timeout
+    return resolver
+
+
+def check_domain(domain, resolver=None):
+    """
+    Resolve one domain's mail servers
+
+    Args:
+        domain (str): ASCII (IDNA) domain name
+        resolver: dnspython-compatible resolver, defaults to default_resolver()
+
+    Returns:
+        dict: deliverable (True, False, or None when DNS was inconclusive), mx (hosts in
+        priority order), mx_fallback_type ("A"/"AAAA" when there is no MX record) and reason
+    """
+    try:
+        info = validate_email_deliverability(domain, domain, dns_resolver=resolver or default_resolver())
+    except EmailUndeliverableError as e:
+        return {"deliverable": False, "mx": [], "mx_fallback_type": None, "reason": str(e)}
+    if "unknown-deliverability" in info:
+        return {"deliverable": None, "mx": [], "mx_fallback_type": None,
+                "reason": f"DNS inconclusive: {info['unknown-deliverability']}"}
+    return {"deliverable": True, "mx": [host for _, host in info["mx"]],
+            "mx_fallback_type": info["mx_fallback_type"], "reason": None}
+
+
+def _check_syntax(email):
+    """(normalized address, ASCII domain, error) for one address, without DNS"""
     try:
-        validate_email(email)
-        return True
-    except EmailNotValidError:
-        return False
+        validated = validate_email(email, check_deliverability=False)
+    except EmailNotValidError as e:
+        return None, None, str(e)
+    return validated.normalized, validated.ascii_domain, None
+
+
+def _check_syntax_chunk(emails):
+    return [_check_syntax(email) for email in emails]
+
+
+def _check_domain_syntax(domain):
+    """(normalized domain, ASCII domain, error) as validate_email reports them for any plain local part"""
+    try:
+        validated = validate_email("a@" + domain, check_deliverability=False)
+    except EmailNotValidError as e:
+        return None, None, str(e)
+    return validated.domain, validated.ascii_domain, None
+
+
+def _within_length(*addresses):
+    return all(len(address.encode("utf-8")) <= EMAIL_MAX_LENGTH for address in addresses)
+
+
+def _validate_whole(emails, processes):
+    """_check_syntax for every address, on `processes` worker processes when there are enough"""
+    if processes <= 1 or len(emails) <= SYNTAX_CHUNK:
+        return _check_syntax_chunk(emails)
+    chunks = [emails[start:start + SYNTAX_CHUNK] for start in range(0, len(emails), SYNTAX_CHUNK)]
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(start_method)) as pool:
+        return [checked for chunk in pool.map(_check_syntax_chunk, chunks) for checked in chunk]
+
+
+def check_syntax(emails, processes=None):
+    """
+    Syntax-check addresses without DNS, each distinct address once
+
+    Args:
+        emails (list): Addresses
+        processes (int): Worker processes for addresses validated whole (default: one
+            per core when there are at least PARALLEL_SYNTAX_MIN of them, otherwise none)
+
+    Returns:
+        dict: {address: (normalized address, ASCII domain, error)}, as validate_email
+        would report them
+    """
+    unique = list(dict.fromkeys(emails))
+    parts = pd.Series(unique, dtype=object).str.extract(PLAIN_ADDRESS)
+    locals_, domain_parts = parts["local"].tolist(), parts["domain"].tolist()
+    domains = {domain: _check_domain_syntax(domain) for domain in dict.fromkeys(domain_parts)
+               if isinstance(domain, str)}
+
+    results = {}
+    whole = []
+    for email, local, domain_part in zip(unique, locals_, domain_parts):
+        if not isinstance(local, str):
+            whole.append(email)
+            continue
+        domain, ascii_domain, error = domains[domain_part]
+        if error is not None:
+            results[email] = (None, None, error)
+            continue
+        if local.lower() in CASE_INSENSITIVE_MAILBOX_NAMES:
+            local = local.lower()
+        normalized = f"{local}@{domain}"
+        # Too long: let validate_email word the error
+        if not _within_length(email, normalized, f"{local}@{ascii_domain}"):
+            whole.append(email)
+            continue
+        results[email] = (normalized, ascii_domain, None)
+
+    if whole:
+        if processes is None:
+            processes = (os.cpu_count() or 1) if len(whole) >= PARALLEL_SYNTAX_MIN else 1
+        results.update(zip(whole, _validate_whole(whole, processes)))
+    return results
+
+
+def check_domains(domains, resolver=None, cache=None, workers=DEFAULT_DNS_WORKERS):
+    """
+    Resolve distinct domains concurrently, serving fresh ones from the domain cache
+
+    Returns:
+        dict: {domain: check_domain result}
+    """
+    cache = cache if cache is not None else get_default_domain_cache()
+    resolver = resolver or default_resolver()
+    results = {}
+    missing = []
+    for domain in dict.fromkeys(domains):
+        cached = cache.get(domain)
+        if cached is None:
+            missing.append(domain)
+        else:
+            results[domain] = cached
+    count("domain_cache_hits", len(results))
+
+    if missing:
+        with span("resolve_domains", rows=len(missing)):
+            with ThreadPoolExecutor(max_workers=min(workers, len(missing)), thread_name_prefix="dns") as pool:
+                for domain, result in zip(missing, pool.map(lambda name: check_domain(name, resolver), missing)):
+                    cache.put(domain, result)
+                    results[domain] = result
+    return results
+
+
+def verify_emails(emails, check_deliverability=True, resolver=None, cache=None, processes=None,
+                  dns_workers=DEFAULT_DNS_WORKERS):
+    """
+    Verify a list of addresses in bulk
+
+    Args:
+        emails (list): Addresses to verify (None/NaN entries are reported as invalid)
+        check_deliverability (bool): Also resolve each domain's mail servers
+        resolver: dnspython-compatible resolver, defaults to default_resolver()
+        cache (DomainCache): Domain results cache, defaults to the shared one
+        processes (int): Worker processes for the syntax pass (see check_syntax)
+        dns_workers (int): Concurrent DNS lookups
+
+    Returns:
+        list: One dict per input address, in input order: email, normalized, domain,
+        valid, syntax_valid, deliverable (None when not checked or inconclusive), mx and reason
+    """
+    emails = [email if isinstance(email, str) else "" for email in emails]
+    with span("verify_syntax", rows=len(emails)):
+        syntax = check_syntax(emails, processes)
+
+    domains = {}
+    if check_deliverability:
+        domains = check_domains([domain for _, domain, error in syntax.values() if error is None],
+                                resolver, cache, dns_workers)
+
+    results = []
+    for email in emails:
+        normalized, domain, error = syntax[email]
+        result = {"email": email, "normalized": normalized, "domain": domain, "valid": error is None,
+                  "syntax_valid": error is None, "deliverable": None, "mx": [], "reason": error}
+        if error is None and check_deliverability:
+            dns_result = domains[domain]
+            result["deliverable"] = dns_result["deliverable"]
+            result["mx"] = dns_result["mx"]
+            result["reason"] = dns_result["reason"]
+            # Only a definite "does not accept mail" fails the address; timeouts give the benefit of the doubt
+            result["valid"] = dns_result["deliverable"] is not False
+        results.append(result)
+    return results
+
+
+def verify_email(email, check_deliverability=True, resolver=None):
+    """True if `email` is a valid address (and, by default, its domain accepts mail)"""
+    return verify_emails([email], check_deliverability, resolver, processes=1)[0]["valid"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verify the addresses in one column of a CSV file")
+    parser.add_argument("csv_path")
+    parser.add_argument("--column", default="email")
+    parser.add_argument("--output", default="data/emails_verified.csv")
+    parser.add_argument("--syntax-only", action="store_true")
+    args = parser.parse_args()
+
+    contacts = pd.read_csv(args.csv_path)
+    start = time.perf_counter()
+    verified = pd.DataFrame(verify_emails(contacts[args.column].tolist(), not args.syntax_only))
+    verified["mx"] = verified["mx"].str.join(" ")
+    verified.to_csv(args.output, index=False)
+    print(f"[SUCCESS] Verified {len(verified)} addresses ({int(verified['valid'].sum())} valid) in "
+          f"{time.perf_counter() - start:.1f}s → {args.output}")
+    print(f"[INFO] Domain cache: {get_default_domain_cache().stats()}")